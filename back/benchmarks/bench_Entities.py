@@ -0,0 +1,83 @@
+"""
+Compares the memory and the build time of the slotted entities with the same dataclasses backed by an instance
+dict, as they were before, when built from cursor rows.
+
+Run it from the back folder with:
+    python -m benchmarks.bench_Entities
+"""
+import sys
+import os
+from dataclasses import fields, field, make_dataclass, MISSING
+from datetime import datetime, timedelta
+from itertools import starmap
+import time
+import tracemalloc
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+parent_dir = os.path.dirname(current_dir)
+
+sys.path.append(parent_dir)
+
+from src.entities.Risk import Risk
+from src.entities.Provider import Provider
+from src.entities.User import User
+from src.entities.Role import Role
+
+SIZE = 100_000
+
+def _dictBacked(entity_type: type) -> type:
+    # The same fields and defaults in a plain dataclass
+    return make_dataclass(
+        entity_type.__name__,
+        [(item.name, item.type) if item.default is MISSING else (item.name, item.type, field(default=item.default)) for item in fields(entity_type)]
+    )
+
+def _buildRows(entity_type: type) -> list[tuple]:
+    created_at = datetime(2023, 1, 1, 10)
+    levels = ['VERY_LOW', 'LOW', 'MEDIUM', 'HIGH', 'VERY_HIGH']
+
+    if entity_type is Risk:
+        return [(id, id % 100, f'risk {id}', f'description of the risk {id}', levels[id % 5], levels[id % 3], created_at + timedelta(minutes=id), created_at) for id in range(1, SIZE + 1)]
+    elif entity_type is Provider:
+        return [(id, f'provider {id}', f'description of the provider {id}', 'ESP', created_at, created_at) for id in range(1, SIZE + 1)]
+    elif entity_type is User:
+        return [(id, f'user{id}@mail.com', None, None, f'user {id}', created_at, created_at) for id in range(1, SIZE + 1)]
+
+    return [(id, f'role {id}', created_at, created_at) for id in range(1, SIZE + 1)]
+
+def _measure(entity_type: type, rows: list[tuple], build) -> tuple[float,float]:
+    # The best of three runs for the time, tracemalloc slows the builds down so the memory is a separate run
+    elapsed = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        entities = build(entity_type, rows)
+        elapsed = min(elapsed, time.perf_counter() - start)
+        del entities
+
+    tracemalloc.start()
+    entities = build(entity_type, rows)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del entities
+    return elapsed, size / len(rows)
+
+def main() -> None:
+    builds = {
+        'unpacked': lambda entity_type, rows: [entity_type(*row) for row in rows],
+        'starmap': lambda entity_type, rows: list(starmap(entity_type, rows))
+    }
+
+    print(f'{SIZE} entities built from rows, bytes per entity without its values')
+    print(f'{"entity":<10}{"layout":<8}{"build":<10}{"ms":>10}{"bytes":>10}')
+
+    for entity_type in (Risk, Provider, User, Role):
+        rows = _buildRows(entity_type)
+
+        for layout, built_type in (('dict', _dictBacked(entity_type)), ('slots', entity_type)):
+            for name, build in builds.items():
+                elapsed, size = _measure(built_type, rows, build)
+                print(f'{entity_type.__name__:<10}{layout:<8}{name:<10}{elapsed * 1000:>10.1f}{size:>10.1f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Compares the serialization of risks lists by jsonify over asDict with the JSONSerializer, with orjson and with its
+json module fallback.
+
+Run it from the back folder with:
+    python -m benchmarks.bench_JSONSerializer
+"""
+import sys
+import os
+from datetime import datetime, timedelta
+import time
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+parent_dir = os.path.dirname(current_dir)
+
+sys.path.append(parent_dir)
+
+from flask import Flask, jsonify
+from src.entities.Risk import Risk
+from src.gateways.JSONSerializer import JSONSerializer
+import src.gateways.JSONSerializer as serializer_module
+
+SIZES = [1_000, 10_000, 100_000]
+
+def _buildRisks(size:int) -> list[Risk]:
+    levels = ['VERY_LOW', 'LOW', 'MEDIUM', 'HIGH', 'VERY_HIGH']
+    created_at = datetime(2023, 1, 1, 10)
+
+    return [
+        Risk(id, id % 100, f'risk {id}', f'description of the risk {id} found in the last audit', levels[id % 5], levels[id % 3], created_at + timedelta(minutes=id), created_at + timedelta(minutes=id))
+        for id in range(1, size + 1)
+    ]
+
+def _measure(function) -> tuple[float,int]:
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, len(result)
+
+def main() -> None:
+    app = Flask(__name__)
+    serializer = JSONSerializer()
+    orjson = serializer_module.orjson
+
+    print(f'{"implementation":<20}{"size":>10}{"bytes":>12}{"seconds":>10}')
+
+    with app.app_context():
+        for size in SIZES:
+            risks = _buildRisks(size)
+
+            elapsed, length = _measure(lambda: jsonify([risk.asDict() for risk in risks]).get_data())
+            print(f'{"jsonify":<20}{size:>10}{length:>12}{elapsed:>10.4f}')
+
+            if orjson is not None:
+                elapsed, length = _measure(lambda: serializer.dumps(risks))
+                print(f'{"serializer orjson":<20}{size:>10}{length:>12}{elapsed:>10.4f}')
+
+            serializer_module.orjson = None
+            elapsed, length = _measure(lambda: serializer.dumps(risks))
+            print(f'{"serializer json":<20}{size:>10}{length:>12}{elapsed:>10.4f}')
+            serializer_module.orjson = orjson
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+"""
+Measures the time of a bcrypt hash at every cost factor on this machine and the cost that BCRYPT_TARGET_MS would
+calibrate, to choose the settings of the password hasher.
+
+Run it from the back folder with:
+    python -m benchmarks.bench_PasswordHasher [target_ms]
+"""
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+parent_dir = os.path.dirname(current_dir)
+
+sys.path.append(parent_dir)
+
+from src.gateways.PasswordHasher import PasswordHasher
+
+COSTS = range(10, 15)
+
+def main() -> None:
+    target_ms = int(sys.argv[1]) if len(sys.argv) > 1 else 250
+
+    for cost in COSTS:
+        print(f'cost {cost:>2}: {PasswordHasher.measureCost(cost) * 1000:8.1f} ms per hash')
+
+    print(f'calibrated cost for {target_ms} ms: {PasswordHasher.calibrateCost(target_ms / 1000)}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Measures the bytes saved and the CPU time spent per response by every available encoding of the response
+compressor, over risks lists of the size the list endpoints return, to choose COMPRESS_MIN_SIZE and the levels.
+
+Run it from the back folder with:
+    python -m benchmarks.bench_ResponseCompressor
+"""
+import sys
+import os
+import json
+import random
+import time
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+parent_dir = os.path.dirname(current_dir)
+
+sys.path.append(parent_dir)
+
+from src.entities.Risk import Risk
+from src.gateways.ResponseCompressor import ResponseCompressor
+
+SIZES = [100, 1_000, 10_000, 50_000]
+LEVELS = {'gzip': [1, 3, 6, 9], 'br': [1, 4, 6], 'zstd': [1, 3, 9]}
+ROUNDS = 5
+
+WORDS = ['vendor', 'outage', 'breach', 'contract', 'supplier', 'delay', 'audit', 'license', 'data', 'access', 'network', 'payment']
+
+def _buildPayload(size:int) -> bytes:
+    # A risks list as jsonify writes it, with descriptions of a few dozen words
+    levels = ['VERY_LOW', 'LOW', 'MEDIUM', 'HIGH', 'VERY_HIGH']
+    risks = [
+        Risk(id, id % 100, f'risk {id}', ' '.join(random.choices(WORDS, k=30)), levels[id % 5], levels[id % 3], '2023-01-01 10:00:00', '2023-01-01 10:00:00')
+        for id in range(1, size + 1)
+    ]
+
+    return json.dumps([risk.asDict() for risk in risks]).encode('utf-8')
+
+def _measure(compressor:ResponseCompressor, payload:bytes, encoding:str) -> tuple[float,int]:
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        compressed = compressor.compress(payload, encoding)
+        timings.append(time.perf_counter() - start)
+
+    return min(timings), len(compressed)
+
+def main() -> None:
+    random.seed(42)
+    print(f'{"risks":>8}{"encoding":>10}{"level":>7}{"bytes":>12}{"compressed":>12}{"saved":>8}{"ms":>10}{"MB/s":>9}')
+
+    for size in SIZES:
+        payload = _buildPayload(size)
+
+        for encoding, levels in LEVELS.items():
+            for level in levels:
+                compressor = ResponseCompressor(levels={encoding: level})
+                if not compressor.isAvailable(encoding):
+                    continue
+
+                seconds, compressed = _measure(compressor, payload, encoding)
+                print(
+                    f'{size:>8}{encoding:>10}{level:>7}{len(payload):>12}{compressed:>12}'
+                    f'{1 - compressed / len(payload):>8.1%}{seconds * 1000:>10.2f}{len(payload) / seconds / 1e6:>9.1f}'
+                )
+
+    missing = [encoding for encoding in LEVELS if not ResponseCompressor().isAvailable(encoding)]
+    if missing:
+        print(f'not installed: {", ".join(missing)}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Compares counting the risks by provider, probability and impact by building and looping over Risk entities with
+the columnar RisksAnalytics snapshot, and the time of a full snapshot read with an incremental refresh of a few
+changed risks. The rows are generated in memory, the database reads are not timed.
+
+Run it from the back folder with:
+    python -m benchmarks.bench_RisksAnalytics
+"""
+import sys
+import os
+from collections import Counter
+from datetime import datetime, timedelta
+import time
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+parent_dir = os.path.dirname(current_dir)
+
+sys.path.append(parent_dir)
+
+from src.entities.Risk import Risk
+from src.gateways.RisksAnalytics import RisksAnalytics
+
+SIZES = [10_000, 100_000, 1_000_000]
+PROVIDERS = 500
+CHANGED = 100
+
+LEVELS = ['VERY_LOW', 'LOW', 'MEDIUM', 'HIGH', 'VERY_HIGH']
+START = datetime(2023, 1, 1, 10)
+
+class _Tables:
+    def __init__(self, size: int) -> None:
+        self.risks = [(id, id % PROVIDERS + 1, LEVELS[id % 5], LEVELS[id % 3], START) for id in range(1, size + 1)]
+        self.providers = [(id, f'C{id % 40:02d}', START) for id in range(1, PROVIDERS + 1)]
+        self.links = [(id, id, id % 1000 + 1) for id in range(1, size // 2 + 1)]
+
+    def getRiskChanges(self, risks_since=None, providers_since=None, links_after=0) -> dict:
+        return {
+            'risk': [row for row in self.risks if risks_since is None or row[4] >= risks_since],
+            'provider': [row for row in self.providers if providers_since is None or row[2] >= providers_since],
+            'risk_user': [row for row in self.links if row[0] > links_after],
+            'counts': {'risk': len(self.risks), 'provider': len(self.providers), 'risk_user': len(self.links)}
+        }
+
+def _measure(function) -> float:
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1000
+
+def main() -> None:
+    print(f'{"risks":>10}{"entities ms":>14}{"snapshot ms":>14}{"group ms":>12}{"refresh ms":>13}')
+
+    for size in SIZES:
+        tables = _Tables(size)
+
+        # The rows are read before timing, the database cost is the same for both approaches
+        rows = [(id, provider_id, f'risk {id}', 'description', probability, impact, updated_at, updated_at) for id, provider_id, probability, impact, updated_at in tables.risks]
+        loop = _measure(lambda: Counter((risk.provider_id, risk.probability, risk.impact) for risk in [Risk(*row) for row in rows]))
+
+        changes = tables.getRiskChanges()
+        analytics = RisksAnalytics(overlap=0)
+        full = _measure(lambda: analytics.refresh(lambda **since: changes))
+        group = _measure(lambda: analytics.groupBy(['provider', 'probability', 'impact']))
+
+        # A few updated risks, as the updated_at index returns them
+        changed = START + timedelta(minutes=1)
+        tables.risks[:CHANGED] = [(id, provider, 'HIGH', impact, changed) for id, provider, _, impact, _ in tables.risks[:CHANGED]]
+        changes = tables.getRiskChanges(risks_since=changed, providers_since=changed, links_after=len(tables.links))
+        refresh = _measure(lambda: analytics.refresh(lambda **since: changes))
+
+        print(f'{size:>10}{loop:>14.1f}{full:>14.1f}{group:>12.1f}{refresh:>13.1f}')
+
+if __name__ == '__main__':
+    main()
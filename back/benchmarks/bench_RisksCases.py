@@ -0,0 +1,63 @@
+"""
+Micro-benchmark for the risks list intersection used by getFilteredRisksUseCase when the repository cannot
+compile the filters into a single query.
+
+Run it from the back folder with:
+    python -m benchmarks.bench_RisksCases [--legacy]
+"""
+import sys
+import os
+import random
+import time
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+parent_dir = os.path.dirname(current_dir)
+
+sys.path.append(parent_dir)
+
+from src.entities.Risk import Risk
+from src.use_cases.RisksCases import _joinRisksLists
+
+SIZES = [10_000, 100_000, 1_000_000]
+LEGACY_SIZES = [1_000, 5_000, 10_000]
+
+def _legacyJoinRisksLists(placeholder:list[Risk], new:list[Risk]) -> list[Risk]:
+    # The previous O(n*m) implementation, kept only for comparison
+    if not isinstance(new, list) or len(new) < 1:
+        return []
+
+    def select(risk1:Risk, risk2:Risk) -> Risk:
+        return risk1 if len(risk1.asDict()) > len(risk2.asDict()) else risk2
+
+    return [select(risk, new[new.index(risk)]) for risk in placeholder if risk in new]
+
+def _buildRisks(size:int) -> tuple[list[Risk],list[Risk]]:
+    # The full table and a filter result holding half of it with the provider country attached
+    levels = ['VERY_LOW', 'LOW', 'MEDIUM', 'HIGH', 'VERY_HIGH']
+    all_risks = [Risk(id, id % 100, f'risk {id}', f'description {id}', levels[id % 5], levels[id % 3], '2023-01-01', '2023-01-01') for id in range(1, size + 1)]
+    filtered = [Risk(risk.id, risk.provider_id, risk.name, risk.description, risk.probability, risk.impact, risk.created_at, risk.updated_at, 'COL') for risk in random.sample(all_risks, size // 2)]
+
+    return all_risks, filtered
+
+def _measure(function, placeholder:list[Risk], new:list[Risk]) -> tuple[float,int]:
+    start = time.perf_counter()
+    result = function(placeholder, new)
+    return time.perf_counter() - start, len(result)
+
+def main(legacy:bool = False) -> None:
+    random.seed(42)
+    print(f'{"implementation":<16}{"size":>12}{"matches":>12}{"seconds":>12}')
+
+    for size in SIZES:
+        placeholder, new = _buildRisks(size)
+        elapsed, matches = _measure(_joinRisksLists, placeholder, new)
+        print(f'{"hash join":<16}{size:>12}{matches:>12}{elapsed:>12.4f}')
+
+    if legacy:
+        for size in LEGACY_SIZES:
+            placeholder, new = _buildRisks(size)
+            elapsed, matches = _measure(_legacyJoinRisksLists, placeholder, new)
+            print(f'{"legacy":<16}{size:>12}{matches:>12}{elapsed:>12.4f}')
+
+if __name__ == '__main__':
+    main('--legacy' in sys.argv)
@@ -0,0 +1,88 @@
+"""
+Benchmark comparing the LIKE scan of the risks free text filter against a FULLTEXT word prefix search. The
+row counts show the substring matches the index misses, which is why MySQLRepository._compileSearch filters
+with LIKE and only ranks with the index.
+
+It needs a MySQL server, configured with the same .env variables of the application (the docker-compose db
+service works). The rows are generated in a scratch table that is dropped at the end, the application tables
+are not touched. Run it from the back folder with:
+    python -m benchmarks.bench_RisksSearch [rows ...]
+"""
+import sys
+import os
+import random
+import time
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+parent_dir = os.path.dirname(current_dir)
+
+sys.path.append(parent_dir)
+
+import mysql.connector
+from dotenv import dotenv_values
+
+SIZES = [100_000, 1_000_000]
+TERMS = ['sql', 'injection', 'xss', 'leak', 'credential', 'phishing', 'ransomware', 'misconfiguration']
+WORDS = ['vendor', 'server', 'access', 'network', 'policy', 'storage', 'backup', 'token', 'audit', 'update', 'firewall', 'payment', 'customer', 'report', 'contract']
+QUERIES = ['injection', 'sql injection', 'ransomware backup']
+BATCH_SIZE = 5_000
+REPETITIONS = 5
+
+def _sentence(words:int) -> str:
+    # Mostly filler words with a search term now and then, so the searches are selective
+    return ' '.join(random.choice(TERMS) if random.random() < 0.05 else random.choice(WORDS) for _ in range(words))
+
+def _populate(cursor, connection, size:int) -> None:
+    cursor.execute('DROP TABLE IF EXISTS `risk_search_bench`')
+    cursor.execute('CREATE TABLE `risk_search_bench` (`id` INT NOT NULL AUTO_INCREMENT, `name` VARCHAR(255) NOT NULL, `description` VARCHAR(255) NOT NULL, PRIMARY KEY (`id`)) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci')
+
+    for start in range(0, size, BATCH_SIZE):
+        rows = [(_sentence(4), _sentence(20)) for _ in range(min(BATCH_SIZE, size - start))]
+        cursor.executemany('INSERT INTO `risk_search_bench` (`name`, `description`) VALUES (%s, %s)', rows)
+        connection.commit()
+
+    # Built after the load as a production table would already have it
+    cursor.execute('ALTER TABLE `risk_search_bench` ADD FULLTEXT KEY `risk_search` (`name`, `description`)')
+
+def _measure(cursor, query:str, params:tuple) -> tuple[float,int]:
+    timings = []
+    for _ in range(REPETITIONS):
+        start = time.perf_counter()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        timings.append(time.perf_counter() - start)
+
+    return sorted(timings)[len(timings) // 2], len(rows)
+
+def main(sizes:list[int]) -> None:
+    random.seed(42)
+    config = dotenv_values(os.path.join(parent_dir, '.env'))
+    connection = mysql.connector.connect(
+        host=config['MYSQL_HOST'],
+        port=int(config['MYSQL_PORT']) if 'MYSQL_PORT' in config else 3306,
+        user=config['MYSQL_USER'],
+        password=config['MYSQL_PASS'],
+        database=config['MYSQL_NAME']
+    )
+    cursor = connection.cursor()
+
+    print(f'{"rows":>10}  {"query":<20}{"like (s)":>12}{"fulltext (s)":>14}{"like rows":>11}{"ft rows":>9}')
+
+    try:
+        for size in sizes:
+            _populate(cursor, connection, size)
+
+            for search in QUERIES:
+                like_time, like_rows = _measure(cursor, 'SELECT `id` FROM `risk_search_bench` WHERE `name` LIKE %s OR `description` LIKE %s', (f'%{search}%', f'%{search}%'))
+
+                terms = ' '.join(f'+{term}*' for term in search.split())
+                match = 'MATCH(`name`, `description`) AGAINST (%s IN BOOLEAN MODE)'
+                fulltext_time, fulltext_rows = _measure(cursor, f'SELECT `id` FROM `risk_search_bench` WHERE {match} ORDER BY {match} DESC, `id`', (terms, terms))
+
+                print(f'{size:>10}  {search:<20}{like_time:>12.4f}{fulltext_time:>14.4f}{like_rows:>11}{fulltext_rows:>9}')
+    finally:
+        cursor.execute('DROP TABLE IF EXISTS `risk_search_bench`')
+        connection.close()
+
+if __name__ == '__main__':
+    main([int(size) for size in sys.argv[1:]] or SIZES)
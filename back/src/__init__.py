@@ -12,6 +12,12 @@ def create_app() -> Flask:
     app.config.from_pyfile("settings.py")
     app.register_blueprint(bp)
 
+    # Keep the countries snapshot fresh in the background
+    app.config["COUNTRY_API"].startRefresher()
+
+    # Compress the large responses with the best encoding the client accepts
+    app.config["COMPRESSOR"].init_app(app)
+
     # Load the swagger file
     with open('src/static/swagger.json', 'r') as f:
         swagger_file = json.load(f)
@@ -3,7 +3,8 @@ from src.entities.User import User, Role
 from src.entities.Risk import Risk
 from src.entities.Provider import Provider
 from src.entities.Classification import Classification
-from typing import Union
+from datetime import datetime
+from typing import Union, Iterator
 
 class Repository(ABC):
     @abstractmethod
@@ -30,6 +31,22 @@ class Repository(ABC):
     def getAllUsers(self) -> Union[list[User],str]:
         pass
 
+    @abstractmethod
+    def streamUsers(self) -> Union[Iterator[User],str]:
+        pass
+
+    @abstractmethod
+    def getUsersByIds(self, ids: list[int]) -> Union[list[User],str]:
+        pass
+
+    @abstractmethod
+    def getUsersPage(self, after: int, limit: int) -> Union[list[User],str]:
+        pass
+
+    @abstractmethod
+    def countUsers(self) -> Union[int,str]:
+        pass
+
     @abstractmethod
     def updateUserData(self, user: User) -> Union[bool,str]:
         pass
@@ -46,6 +63,10 @@ class Repository(ABC):
     def validateUser(self, user: User) -> Union[bool,str]:
         pass
 
+    @abstractmethod
+    def verifyCredentials(self, email: str, password: str) -> Union[User,str]:
+        pass
+
     @abstractmethod
     def linkRoleToUser(self, user_id: int, role_id: int) -> Union[bool,str]:
         pass
@@ -53,11 +74,27 @@ class Repository(ABC):
     @abstractmethod
     def unlinkRoleToUser(self, user_id: int, role_id: int) -> Union[bool,str]:
         pass
+
+    @abstractmethod
+    def linkRolesToUsers(self, role_id: int, user_ids: list[int]) -> Union[int,str]:
+        pass
+
+    @abstractmethod
+    def unlinkRolesToUsers(self, role_id: int, user_ids: list[int]) -> Union[int,str]:
+        pass
     
     @abstractmethod
     def getAllRoles(self) -> Union[list[Role],str]:
         pass
 
+    @abstractmethod
+    def getRolesPage(self, after: int, limit: int) -> Union[list[Role],str]:
+        pass
+
+    @abstractmethod
+    def countRoles(self) -> Union[int,str]:
+        pass
+
     @abstractmethod
     def createRole(self, name: str) -> Union[int,str]:
         pass
@@ -90,10 +127,34 @@ class Repository(ABC):
     def getProviderByName(self, name: str) -> Union[str,Provider]:
         pass
 
+    @abstractmethod
+    def getProvidersByIds(self, ids: list[int]) -> Union[list[Provider],str]:
+        pass
+
+    @abstractmethod
+    def getProvidersByNames(self, names: list[str]) -> Union[list[Provider],str]:
+        pass
+
+    @abstractmethod
+    def createProviders(self, providers: list[tuple[str,str,str]], *, chunk_size: int = 500) -> Union[tuple[int,list[int]],str]:
+        pass
+
     @abstractmethod
     def getAllProviders(self) -> Union[list[Provider],str]:
         pass
 
+    @abstractmethod
+    def streamProviders(self) -> Union[Iterator[Provider],str]:
+        pass
+
+    @abstractmethod
+    def getProvidersPage(self, after: int, limit: int) -> Union[list[Provider],str]:
+        pass
+
+    @abstractmethod
+    def countProviders(self) -> Union[int,str]:
+        pass
+
     @abstractmethod
     def updateProvider(self, Provider) -> Union[bool,str]:
         pass
@@ -106,6 +167,10 @@ class Repository(ABC):
     def createRisk(self, provider_id:int, name: str, description: str, probability: Classification, impact: Classification) -> Union[int,str]:
         pass
 
+    @abstractmethod
+    def createRisks(self, risks: list[tuple[int,str,str,str,str]], user_id: int) -> Union[int,str]:
+        pass
+
     @abstractmethod
     def getRiskById(self, id: int) -> Union[Risk,str]:
         pass
@@ -138,6 +203,36 @@ class Repository(ABC):
     def getAllRisks(self) -> Union[list[Risk],str]:
         pass
 
+    @abstractmethod
+    def streamRisks(self, filters: dict = None, *, with_country: bool = False) -> Union[Iterator[Risk],str]:
+        pass
+
+    @abstractmethod
+    def getRisksPage(self, after: int, limit: int) -> Union[list[Risk],str]:
+        pass
+
+    @abstractmethod
+    def countRisks(self, filters: dict = None) -> Union[int,str]:
+        pass
+
+    def queryRisks(self, filters: dict, *, after: int = None, limit: int = None) -> Union[list[Risk],str,None]:
+        """
+        Gets the risks matching all the given filters in a single query, ordered by id.
+        Repositories that cannot evaluate the filters together keep this default returning None, and the risks
+        use cases fall back to intersecting the single filter queries.
+
+        Positional arguments:
+            filters {dict} -- The filters to apply, with keys in provider_id, user_id, string, probability, impact or country
+
+        Keyword arguments:
+            after {int} -- Only return risks with an id greater than this one. Default is None
+            limit {int} -- The maximum amount of risks to return. Default is None
+
+        Returns:
+            Union[list[Risk],str,None] -- The matching risks, an error message, or None if the repository does not support compiled risk queries
+        """
+        return None
+
     @abstractmethod
     def getAllRisksWithUser(self) -> Union[list[Risk],str]:
         pass
@@ -156,4 +251,41 @@ class Repository(ABC):
 
     @abstractmethod
     def unrelateRiskToUser(self, risk_id: int, user_id: int) -> Union[bool,str]:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def relateRisksToUsers(self, risk_id: int, user_ids: list[int]) -> Union[int,str]:
+        pass
+
+    @abstractmethod
+    def unrelateRisksToUsers(self, risk_id: int, user_ids: list[int]) -> Union[int,str]:
+        pass
+
+    def getFingerprint(self, resource: str) -> Union[str,None]:
+        """
+        Gets a cheap version of a resource, that changes whenever any of the rows it is built from changes, without
+        loading them. Repositories that cannot compute it keep this default and the resource is never validated.
+
+        Positional arguments:
+            resource {str} -- The resource to fingerprint, one of roles, providers or risks
+
+        Returns:
+            Union[str,None] -- The fingerprint, or None if it cannot be computed
+        """
+        return None
+
+    def getRiskChanges(self, risks_since: datetime = None, providers_since: datetime = None, links_after: int = 0) -> Union[dict,str]:
+        """
+        Gets the raw rows of the risk, provider and risk_user tables changed since a previous read, with only the
+        columns the risks analytics group by, and the current row count of the three tables so the deleted rows
+        can be detected. Repositories that do not track the changes keep this default.
+
+        Keyword arguments:
+            risks_since {datetime} -- Only the risks updated at or after this time. Default is None (every risk)
+            providers_since {datetime} -- Only the providers updated at or after this time. Default is None (every provider)
+            links_after {int} -- Only the risk_user links with a greater id. Default is 0 (every link)
+
+        Returns:
+            Union[dict,str] -- The 'risk' rows (id, provider_id, probability, impact, updated_at), the 'provider' rows (id, country, updated_at), the 'risk_user' rows (id, risk_id, user_id) and the 'counts' per table, or an error message
+        """
+        return 'The repository does not support the risks analytics'
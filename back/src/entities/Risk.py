@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from typing import Optional
 
-@dataclass
+@dataclass(slots=True)
 class Risk:
     id: int
     provider_id: int
@@ -24,4 +24,4 @@ class Risk:
         return self.id == __value.id
     
     def asDict(self) -> dict:
-        return {key: value for key, value in self.__dict__.items() if value is not None}
\ No newline at end of file
+        return {key: value for key in self.__slots__ if (value := getattr(self, key)) is not None}
\ No newline at end of file
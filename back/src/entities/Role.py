@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from typing import Optional
 
-@dataclass
+@dataclass(slots=True)
 class Role:
     id: int
     name: str
@@ -12,4 +12,4 @@ class Role:
         return f'{self.id} - {self.name}'
     
     def asDict(self) -> dict:
-        return {key: value for key, value in self.__dict__.items() if value is not None}
\ No newline at end of file
+        return {key: value for key in self.__slots__ if (value := getattr(self, key)) is not None}
\ No newline at end of file
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import Optional
 from src.entities.Role import Role
 
-@dataclass
+@dataclass(slots=True)
 class User:
     id: int
     email: str
@@ -12,10 +12,14 @@ class User:
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
     password: Optional[str] = None
-    roles: Optional[list[Role]] = None
+    # The names of the roles, loaded by getUserWithRoles and verifyCredentials
+    roles: Optional[list[str]] = None
+
+    # Never sent to the clients
+    PRIVATE_FIELDS = ('password', 'hashed_password', 'salt')
 
     def __str__(self) -> str:
         return f'{self.id} - {self.email}{f" - {self.name}" if self.name is not None else ""}'
     
     def asDict(self) -> dict:
-        return {key:value for key, value in self.__dict__.items() if value is not None and key not in ['password', 'hashed_password', 'salt']}
\ No newline at end of file
+        return {key: value for key in self.__slots__ if key not in self.PRIVATE_FIELDS and (value := getattr(self, key)) is not None}
\ No newline at end of file
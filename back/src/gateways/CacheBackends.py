@@ -0,0 +1,222 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Hashable
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+class CacheBackend(ABC):
+    """
+    Bounded key value store used by the caches. The implementations decide where the entries live: in the memory of
+    the process or somewhere every worker process of the host can read them
+    """
+
+    @abstractmethod
+    def get(self, key: Hashable) -> tuple[bool, any]:
+        pass
+
+    @abstractmethod
+    def set(self, key: Hashable, value: any) -> None:
+        pass
+
+    @abstractmethod
+    def pop(self, key: Hashable) -> None:
+        pass
+
+    @abstractmethod
+    def popWhere(self, predicate: Callable[[any], bool]) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+    @abstractmethod
+    def getStats(self) -> dict:
+        pass
+
+class LRUCache(CacheBackend):
+    def __init__(self, max_size: int, ttl: float = None) -> None:
+        """
+        Thread safe bounded map in the memory of the process that evicts the least recently used entries, and
+        optionally expires them after ttl seconds
+
+        Arguments:
+            max_size {int} -- The maximum amount of entries
+
+        Keyword arguments:
+            ttl {float} -- The seconds an entry is valid. Default is None (no expiration)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> tuple[bool, any]:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or (entry[1] is not None and entry[1] <= time.monotonic()):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return (False, None)
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return (True, entry[0])
+
+    def set(self, key: Hashable, value: any) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl if self.ttl else None)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def popWhere(self, predicate: Callable[[any], bool]) -> None:
+        # Drops the entries whose value matches, for the keys that cannot be known from the write arguments
+        with self._lock:
+            for key in [key for key, (value, _) in self._entries.items() if predicate(value)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def getStats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+class FileCache(CacheBackend):
+    def __init__(self, path: str, name: str, max_size: int, ttl: float = None) -> None:
+        """
+        Bounded map stored in a local SQLite file, so every worker process of the host reads the entries warmed by
+        the others and sees the invalidations made by the others. Several caches can share the file, each one under
+        its own name. The oldest written entries are evicted first and the values are pickled
+
+        Arguments:
+            path {str} -- The file of the store, created with its directory if missing
+            name {str} -- The name of this cache inside the file
+            max_size {int} -- The maximum amount of entries of this cache
+
+        Keyword arguments:
+            ttl {float} -- The seconds an entry is valid. Default is None (no expiration)
+        """
+        self.path = path
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+
+        # SQLite connections cannot cross threads nor forked processes, each thread of each process opens its own
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if dirname := os.path.dirname(path):
+            os.makedirs(dirname, exist_ok=True)
+
+        # The users are cached with their password hashes, so the file is only readable by its owner. SQLite
+        # creates the -wal and -shm files with the mode of the database, the ones left by older runs are fixed too
+        os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+        for file in [path, f'{path}-wal', f'{path}-shm']:
+            if os.path.exists(file):
+                os.chmod(file, 0o600)
+
+        with self._connect() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS `entry` (`cache` TEXT, `key` TEXT, `value` BLOB, `expires` REAL, `written` REAL, '
+                'PRIMARY KEY (`cache`, `key`))'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS `entry_written` ON `entry` (`cache`, `written`)')
+
+    def _connect(self) -> sqlite3.Connection:
+        if getattr(self._local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+
+        return self._local.connection
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: Hashable) -> tuple[bool, any]:
+        row = self._connect().execute(
+            'SELECT `value`, `expires` FROM `entry` WHERE `cache` = ? AND `key` = ?', (self.name, repr(key))
+        ).fetchone()
+
+        # Expired entries are left for the eviction or the next write of the key
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            self._count(False)
+            return (False, None)
+
+        self._count(True)
+
+        return (True, pickle.loads(row[0]))
+
+    def set(self, key: Hashable, value: any) -> None:
+        now = time.time()
+        connection = self._connect()
+
+        connection.execute(
+            'INSERT OR REPLACE INTO `entry` (`cache`, `key`, `value`, `expires`, `written`) VALUES (?, ?, ?, ?, ?)',
+            (self.name, repr(key), pickle.dumps(value), now + self.ttl if self.ttl else None, now)
+        )
+        connection.execute(
+            'DELETE FROM `entry` WHERE `cache` = ? AND `key` IN '
+            '(SELECT `key` FROM `entry` WHERE `cache` = ? ORDER BY `written` DESC LIMIT -1 OFFSET ?)',
+            (self.name, self.name, self.max_size)
+        )
+
+    def pop(self, key: Hashable) -> None:
+        self._connect().execute('DELETE FROM `entry` WHERE `cache` = ? AND `key` = ?', (self.name, repr(key)))
+
+    def popWhere(self, predicate: Callable[[any], bool]) -> None:
+        connection = self._connect()
+        rows = connection.execute('SELECT `key`, `value` FROM `entry` WHERE `cache` = ?', (self.name,)).fetchall()
+
+        keys = [(self.name, key) for key, value in rows if predicate(pickle.loads(value))]
+        connection.executemany('DELETE FROM `entry` WHERE `cache` = ? AND `key` = ?', keys)
+
+    def clear(self) -> None:
+        self._connect().execute('DELETE FROM `entry` WHERE `cache` = ?', (self.name,))
+
+    def getStats(self) -> dict:
+        size = self._connect().execute('SELECT COUNT(*) FROM `entry` WHERE `cache` = ?', (self.name,)).fetchone()[0]
+
+        with self._lock:
+            lookups = self.hits + self.misses
+
+            # The size is shared by the workers, the counters are of this process
+            return {
+                'size': size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
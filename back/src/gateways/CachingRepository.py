@@ -0,0 +1,242 @@
+from src.entities.Repositories import Repository
+from src.entities.User import User
+from src.entities.Role import Role
+from src.entities.Provider import Provider
+from src.gateways.CacheBackends import CacheBackend, LRUCache
+from src.gateways.GenerationCounter import GenerationCounter
+from typing import Union, Callable, Hashable
+import abc
+import copy
+
+class CachingRepository(Repository):
+    def __init__(self, repository: Repository, *, sizes: dict[str,int] = None, ttl: float = 300,
+                 backend: Callable[[str,int,float],CacheBackend] = None, generations: GenerationCounter = None) -> None:
+        """
+        Read through cache in front of any repository. The role, provider and user lookups are cached and the
+        writes that go through this repository invalidate exactly the entries they change, every other method is
+        delegated as is. Only entities are cached, error messages and missing entities always reach the repository
+
+        Arguments:
+            repository {Repository} -- The repository to wrap
+
+        Keyword arguments:
+            sizes {dict[str,int]} -- The maximum entries of the 'roles', 'providers' and 'users' caches. Default is 1000 each
+            ttl {float} -- The seconds an entry is valid, a bound for the writes made outside of this process. Default is 300
+            backend {Callable[[str,int,float],CacheBackend]} -- Builds the store of each cache from its name, size and ttl. Default is None (an LRUCache per process)
+            generations {GenerationCounter} -- The change counters bumped by the repository writers, entries loaded at an older generation are dropped. Default is None
+        """
+        sizes = {'roles': 1000, 'providers': 1000, 'users': 1000, **(sizes or {})}
+        backend = backend or (lambda name, max_size, ttl: LRUCache(max_size, ttl))
+
+        self._repository = repository
+        self._generations = generations
+        self._caches = {
+            'roles_by_id': backend('roles_by_id', sizes['roles'], ttl),
+            'roles_by_name': backend('roles_by_name', sizes['roles'], ttl),
+            'all_roles': backend('all_roles', 1, ttl),
+            'providers_by_id': backend('providers_by_id', sizes['providers'], ttl),
+            'providers_by_name': backend('providers_by_name', sizes['providers'], ttl),
+            'all_providers': backend('all_providers', 1, ttl),
+            'users_by_email': backend('users_by_email', sizes['users'], ttl),
+            'users_with_roles': backend('users_with_roles', sizes['users'], ttl)
+        }
+
+        # The generations each cache depends on, the users embed the names of their roles
+        self._namespaces = {
+            'roles_by_id': ('roles',),
+            'roles_by_name': ('roles',),
+            'all_roles': ('roles',),
+            'providers_by_id': ('providers',),
+            'providers_by_name': ('providers',),
+            'all_providers': ('providers',),
+            'users_by_email': ('users', 'roles'),
+            'users_with_roles': ('users', 'roles')
+        }
+
+    def _generation(self, cache: str) -> tuple[int,...]:
+        if self._generations is None:
+            return ()
+
+        return tuple(self._generations.current(namespace) for namespace in self._namespaces[cache])
+
+    def _cached(self, cache: str, key: Hashable, load: Callable[[], any], entity: type) -> any:
+        """
+        Returns a copy of the cached value, or loads it and caches it if it is an entity or a list of entities.
+        Copies are returned because the use cases modify the entities they get before updating them. The entries
+        are stored with the generation read before loading them, so a write committed meanwhile makes them stale
+        """
+        generation = self._generation(cache)
+        hit, entry = self._caches[cache].get(key)
+
+        if hit and entry[0] == generation:
+            value = entry[1]
+        else:
+            value = load()
+
+            if isinstance(value, entity) or (isinstance(value, list) and all(isinstance(item, entity) for item in value)):
+                self._caches[cache].set(key, (generation, value))
+            else:
+                return value
+
+        return [self._copy(item) for item in value] if isinstance(value, list) else self._copy(value)
+
+    def _copy(self, entity: any) -> any:
+        entity = copy.copy(entity)
+
+        # The roles list of a user is shared by the shallow copy
+        if isinstance(entity, User) and entity.roles is not None:
+            entity.roles = list(entity.roles)
+
+        return entity
+
+    def _forgetUser(self, user_id: int) -> None:
+        self._caches['users_by_email'].popWhere(lambda entry: entry[1].id == user_id)
+        self._caches['users_with_roles'].pop(user_id)
+
+    def _forgetRole(self, role_id: int = None) -> None:
+        if role_id is not None:
+            self._caches['roles_by_id'].pop(role_id)
+
+        # The old name is not known and the users embed the role names
+        self._caches['roles_by_name'].clear()
+        self._caches['all_roles'].clear()
+        self._caches['users_with_roles'].clear()
+
+    def _forgetProvider(self, provider_id: int = None) -> None:
+        if provider_id is not None:
+            self._caches['providers_by_id'].pop(provider_id)
+            self._caches['providers_by_name'].popWhere(lambda entry: entry[1].id == provider_id)
+
+        self._caches['all_providers'].clear()
+
+    def getStats(self) -> dict:
+        """
+        Returns the counters of every cache for monitoring
+
+        Returns:
+            dict -- The size, hits, misses and hit ratio per cache, and the current generations if they are shared
+        """
+        stats = {name: cache.getStats() for name, cache in self._caches.items()}
+
+        if self._generations is not None:
+            stats['generations'] = self._generations.getAll()
+
+        return stats
+
+    # Cached reads
+
+    def getUserByEmail(self, email: str) -> Union[User,str]:
+        return self._cached('users_by_email', email, lambda: self._repository.getUserByEmail(email), User)
+
+    def getUserWithRoles(self, id: int) -> Union[User,str]:
+        return self._cached('users_with_roles', id, lambda: self._repository.getUserWithRoles(id), User)
+
+    def getAllRoles(self) -> Union[list[Role],str]:
+        return self._cached('all_roles', None, self._repository.getAllRoles, Role)
+
+    def getRoleById(self, id: int) -> Union[Role,str]:
+        return self._cached('roles_by_id', id, lambda: self._repository.getRoleById(id), Role)
+
+    def getRoleByName(self, name: str) -> Union[Role,str]:
+        return self._cached('roles_by_name', name, lambda: self._repository.getRoleByName(name), Role)
+
+    def getAllProviders(self) -> Union[list[Provider],str]:
+        return self._cached('all_providers', None, self._repository.getAllProviders, Provider)
+
+    def getProviderById(self, id: int) -> Union[Provider,str]:
+        return self._cached('providers_by_id', id, lambda: self._repository.getProviderById(id), Provider)
+
+    def getProviderByName(self, name: str) -> Union[Provider,str]:
+        return self._cached('providers_by_name', name, lambda: self._repository.getProviderByName(name), Provider)
+
+    # Invalidating writes
+
+    def updateUserData(self, user: User) -> Union[bool,str]:
+        result = self._repository.updateUserData(user)
+        if user:
+            self._forgetUser(user.id)
+        return result
+
+    def updateUserPassword(self, user: User) -> Union[bool,str]:
+        result = self._repository.updateUserPassword(user)
+        if user:
+            self._forgetUser(user.id)
+        return result
+
+    def deleteUser(self, id: int) -> Union[bool,str]:
+        result = self._repository.deleteUser(id)
+        self._forgetUser(id)
+        return result
+
+    def linkRoleToUser(self, user_id: int, role_id: int) -> Union[bool,str]:
+        result = self._repository.linkRoleToUser(user_id, role_id)
+        self._caches['users_with_roles'].pop(user_id)
+        return result
+
+    def unlinkRoleToUser(self, user_id: int, role_id: int) -> Union[bool,str]:
+        result = self._repository.unlinkRoleToUser(user_id, role_id)
+        self._caches['users_with_roles'].pop(user_id)
+        return result
+
+    def linkRolesToUsers(self, role_id: int, user_ids: list[int]) -> Union[int,str]:
+        result = self._repository.linkRolesToUsers(role_id, user_ids)
+        for user_id in user_ids:
+            self._caches['users_with_roles'].pop(user_id)
+        return result
+
+    def unlinkRolesToUsers(self, role_id: int, user_ids: list[int]) -> Union[int,str]:
+        result = self._repository.unlinkRolesToUsers(role_id, user_ids)
+        for user_id in user_ids:
+            self._caches['users_with_roles'].pop(user_id)
+        return result
+
+    def createRole(self, name: str) -> Union[int,str]:
+        result = self._repository.createRole(name)
+        self._caches['all_roles'].clear()
+        return result
+
+    def updateRole(self, role: Role) -> Union[bool,str]:
+        result = self._repository.updateRole(role)
+        self._forgetRole(role.id if role else None)
+        return result
+
+    def deleteRole(self, id: int) -> Union[bool,str]:
+        result = self._repository.deleteRole(id)
+        self._forgetRole(id)
+        return result
+
+    def createProvider(self, name: str, description: str, country: str) -> Union[int,str]:
+        result = self._repository.createProvider(name, description, country)
+        self._forgetProvider()
+        return result
+
+    def createProviders(self, providers: list[tuple[str,str,str]], *, chunk_size: int = 500) -> Union[tuple[int,list[int]],str]:
+        result = self._repository.createProviders(providers, chunk_size=chunk_size)
+        self._forgetProvider()
+        return result
+
+    def updateProvider(self, provider: Provider) -> Union[bool,str]:
+        result = self._repository.updateProvider(provider)
+        if provider:
+            self._forgetProvider(provider.id)
+            self._caches['providers_by_name'].pop(provider.name)
+        return result
+
+    def deleteProvider(self, id: int) -> Union[bool,str]:
+        result = self._repository.deleteProvider(id)
+        self._forgetProvider(id)
+        return result
+
+def _delegate(name: str) -> Callable:
+    def method(self, *args, **kwargs):
+        return getattr(self._repository, name)(*args, **kwargs)
+
+    method.__name__ = name
+    return method
+
+# Every other repository method goes straight to the wrapped repository
+for _name, _member in vars(Repository).items():
+    if callable(_member) and not _name.startswith('_') and _name not in vars(CachingRepository):
+        setattr(CachingRepository, _name, _delegate(_name))
+
+abc.update_abstractmethods(CachingRepository)
@@ -0,0 +1,123 @@
+from collections import deque
+import threading
+import time
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, *, window: int = 20, failure_rate: float = 0.5, minimum_calls: int = 5, open_seconds: float = 30) -> None:
+        """
+        Thread safe circuit breaker over the outcome of the last calls. It opens when the failure rate of the window
+        reaches the threshold, rejects calls while open, and lets a single trial call through once open_seconds
+        have passed (half open) to decide if it closes again
+
+        Keyword arguments:
+            window {int} -- The amount of recent calls used to compute the failure rate. Default is 20
+            failure_rate {float} -- The failure rate, between 0 and 1, that opens the circuit. Default is 0.5
+            minimum_calls {int} -- The calls needed in the window before the rate is evaluated. Default is 5
+            open_seconds {float} -- The seconds the circuit stays open before a trial call. Default is 30
+        """
+        self.failure_rate = failure_rate
+        self.minimum_calls = minimum_calls
+        self.open_seconds = open_seconds
+
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trial_running = False
+
+        # Monitoring counters
+        self._calls = 0
+        self._failures = 0
+        self._rejected = 0
+        self._last_latency = None
+        self._average_latency = None
+
+    def allowRequest(self) -> bool:
+        """
+        Checks if a call can be made now, moving an expired open circuit to half open. Every allowed call must end in
+        recordSuccess or recordFailure, also when it raises, or the half open trial is never released
+
+        Returns:
+            bool -- True if the call can be made, False if it must fail fast
+        """
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self._state = self.HALF_OPEN
+                self._trial_running = False
+
+            if self._state == self.CLOSED:
+                return True
+
+            # Only one trial call at a time while half open
+            if self._state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+
+            self._rejected += 1
+            return False
+
+    def recordSuccess(self, latency: float) -> None:
+        with self._lock:
+            self._calls += 1
+            self._recordLatency(latency)
+            self._outcomes.append(True)
+
+            if self._state == self.HALF_OPEN:
+                self._state = self.CLOSED
+                self._outcomes.clear()
+
+    def recordFailure(self, latency: float = None) -> None:
+        with self._lock:
+            self._calls += 1
+            self._failures += 1
+            if latency is not None:
+                self._recordLatency(latency)
+            self._outcomes.append(False)
+
+            if self._state == self.HALF_OPEN or self._shouldOpen():
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_running = False
+
+    def _shouldOpen(self) -> bool:
+        if len(self._outcomes) < self.minimum_calls:
+            return False
+
+        return self._outcomes.count(False) / len(self._outcomes) >= self.failure_rate
+
+    def _recordLatency(self, latency: float) -> None:
+        # Exponentially weighted average, so the value follows recent behaviour
+        self._last_latency = latency
+        self._average_latency = latency if self._average_latency is None else 0.8 * self._average_latency + 0.2 * latency
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                return self.HALF_OPEN
+
+            return self._state
+
+    def getStats(self) -> dict:
+        """
+        Returns the breaker state and counters for monitoring
+
+        Returns:
+            dict -- The state, the calls, failures and rejected counters and the last and average latency in milliseconds
+        """
+        state = self.state
+
+        with self._lock:
+            return {
+                'state': state,
+                'calls': self._calls,
+                'failures': self._failures,
+                'rejected': self._rejected,
+                'window_failure_rate': (self._outcomes.count(False) / len(self._outcomes)) if self._outcomes else 0.0,
+                'last_latency_ms': round(self._last_latency * 1000, 2) if self._last_latency is not None else None,
+                'average_latency_ms': round(self._average_latency * 1000, 2) if self._average_latency is not None else None
+            }
@@ -1,45 +1,313 @@
 from src.entities.Country import Country
+from src.gateways.CountryCatalog import CountryCatalog
+from src.gateways.CircuitBreaker import CircuitBreaker
+from src.gateways.SingleFlight import SingleFlight
+from src.static.country_codes import ISO_ALPHA3
 from typing import Union
+from datetime import datetime, timezone
+from collections import OrderedDict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import requests as req
+import threading
+import time
+import tempfile
 import json
+import os
 
 class CountryAPI:
-    def __init__(self, url: str) -> None:
+    def __init__(self, url: str, *, snapshot_path: str = None, snapshot_ttl: int = 86400, retry_interval: int = 300, connect_timeout: float = 3.05, read_timeout: float = 10, retries: int = 2, backoff_factor: float = 0.5, pool_size: int = 10, breaker: CircuitBreaker = None, negative_ttl: int = 300, negative_cache_size: int = 1024) -> None:
+        """
+        Client for the countries API. When a snapshot path is given, the full list of countries is kept in a local
+        file and in memory, and the lookups are answered from it instead of querying the API every time
+
+        Positional arguments:
+            url {str} -- The base url of the countries API
+
+        Keyword arguments:
+            snapshot_path {str} -- The file to persist the countries snapshot. Default is None (no snapshot)
+            snapshot_ttl {int} -- The seconds a snapshot is considered fresh before refreshing it. Default is 86400
+            retry_interval {int} -- The seconds to wait before retrying a failed refresh. Default is 300
+            connect_timeout {float} -- The seconds to wait for the connection to the API. Default is 3.05
+            read_timeout {float} -- The seconds to wait for the API response. Default is 10
+            retries {int} -- The retries of a request that failed to connect or got a 502, 503 or 504. Default is 2
+            backoff_factor {float} -- The exponential backoff factor between retries, in seconds. Default is 0.5
+            pool_size {int} -- The keep alive connections kept open with the API. Default is 10
+            breaker {CircuitBreaker} -- The circuit breaker guarding the API. Default is a CircuitBreaker with its default settings
+            negative_ttl {int} -- The seconds a country code reported as not found is remembered. Default is 300
+            negative_cache_size {int} -- The maximum amount of not found country codes remembered. Default is 1024
+        """
         self.url = url
         self.filters = ["cca3", "capital", "region", "subregion", "population", "names", "languages", "currencies", "timezones"]
 
+        self.snapshot_path = snapshot_path
+        self.snapshot_ttl = snapshot_ttl
+        self.retry_interval = retry_interval
+
+        # The snapshot is swapped as a whole, so readers never see a partially refreshed one
+        self._catalog = None
+        self._snapshot_data = []
+        self._snapshot_meta = {}
+        self._refresher = None
+        self._stop_refresher = threading.Event()
+
+        # A single keep alive session shared by every thread, requests sessions are safe for concurrent GETs
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self._session = req.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=retries,
+                backoff_factor=backoff_factor,
+                status_forcelist=[502, 503, 504],
+                allowed_methods=['GET'],
+                raise_on_status=False
+            )
+        )
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+        # Concurrent lookups of the same code share one request, and codes the API does not know are remembered
+        # for a while so retyping a bad code does not reach the API every time
+        self.negative_ttl = negative_ttl
+        self.negative_cache_size = negative_cache_size
+        self._not_found = OrderedDict()
+        self._lookups = SingleFlight()
+        self._lookups_lock = threading.Lock()
+        self._lookup_stats = {'hits': 0, 'negative_hits': 0, 'misses': 0, 'coalesced': 0}
+
+        if snapshot_path:
+            self._loadSnapshot()
+
     def _cleanCountryData(self, country_data: dict) -> Country:
         return Country(
             cca3=country_data['cca3'],
-            capital=country_data['capital'][0] if country_data['capital'] else None,
+            capital=country_data['capital'][0] if country_data.get('capital') else None,
             region=country_data['region'],
-            subregion=country_data['subregion'],
+            subregion=country_data.get('subregion'),
             population=country_data['population'],
             names={
                 'common': country_data['name']['common'],
                 'official': country_data['name']['official']
             },
-            languages=country_data['languages'],
+            languages=country_data.get('languages', {}),
             currencies={
-                currency: (country_data['currencies'][currency]['name'], country_data['currencies'][currency]['symbol'])
-                for currency in country_data['currencies']
+                currency: (country_data['currencies'][currency].get('name'), country_data['currencies'][currency].get('symbol'))
+                for currency in country_data.get('currencies', {})
             },
             timezones=country_data['timezones']
         )
-    
+
+    def _setSnapshot(self, countries_data: list[dict], meta: dict) -> None:
+        """
+        Builds the in memory snapshot from the raw countries data
+
+        Arguments:
+            countries_data {list[dict]} -- The countries as returned by the API
+            meta {dict} -- The snapshot metadata: fetched_at timestamp, etag and last_modified headers
+        """
+        self._catalog = CountryCatalog([self._cleanCountryData(country_data) for country_data in countries_data])
+        self._snapshot_data = countries_data
+        self._snapshot_meta = meta
+
+    def _loadSnapshot(self) -> bool:
+        """
+        Loads the snapshot file into memory, without any network call
+
+        Returns:
+            bool -- True if a valid snapshot was loaded
+        """
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+
+            self._setSnapshot(snapshot['countries'], {key: snapshot.get(key) for key in ['fetched_at', 'etag', 'last_modified']})
+            return True
+        except Exception:
+            return False
+
+    def _saveSnapshot(self) -> None:
+        """
+        Persists the snapshot, writing a temporary file first so a crash never leaves a truncated snapshot. Every
+        worker refreshes its own snapshot, so each write gets a unique temporary file in the same folder
+        """
+        descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(self.snapshot_path) or '.', suffix='.tmp')
+
+        try:
+            with os.fdopen(descriptor, 'w') as f:
+                json.dump({**self._snapshot_meta, 'countries': self._snapshot_data}, f)
+
+            os.replace(temporary_path, self.snapshot_path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    def refreshSnapshot(self) -> Union[bool,str]:
+        """
+        Refreshes the snapshot with a conditional request to the API. The last good snapshot is kept if the
+        request fails
+
+        Returns:
+            bool -- True if the snapshot is up to date
+            str -- The error message if the API could not be queried
+        """
+        headers = {}
+        if self._catalog is not None and self._snapshot_meta.get('etag'):
+            headers['If-None-Match'] = self._snapshot_meta['etag']
+        if self._catalog is not None and self._snapshot_meta.get('last_modified'):
+            headers['If-Modified-Since'] = self._snapshot_meta['last_modified']
+
+        response = self._request(f'{self.url}/all?filter={",".join(self.filters)}', headers=headers)
+        if isinstance(response, str):
+            return f'Error refreshing the countries snapshot: {response}'
+
+        try:
+            if response.status_code == 304:
+                self._snapshot_meta = {**self._snapshot_meta, 'fetched_at': datetime.now(tz=timezone.utc).timestamp()}
+            elif response.status_code == 200:
+                self._setSnapshot(response.json(), {
+                    'fetched_at': datetime.now(tz=timezone.utc).timestamp(),
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified')
+                })
+            else:
+                return f'Error refreshing the countries snapshot, the API answered {response.status_code}'
+
+            if self.snapshot_path:
+                self._saveSnapshot()
+
+            return True
+        except Exception as e:
+            return f'Error refreshing the countries snapshot: {e}'
+
+    def _refreshLoop(self) -> None:
+        while not self._stop_refresher.is_set():
+            fetched_at = self._snapshot_meta.get('fetched_at') or 0
+            wait = fetched_at + self.snapshot_ttl - datetime.now(tz=timezone.utc).timestamp()
+
+            if self._catalog is None or wait <= 0:
+                refreshed = self.refreshSnapshot()
+                wait = self.snapshot_ttl if refreshed is True else self.retry_interval
+
+            self._stop_refresher.wait(wait)
+
+    def startRefresher(self) -> None:
+        """
+        Starts a daemon thread that refreshes the snapshot every time it gets older than the ttl
+        """
+        if not self.snapshot_path or (self._refresher is not None and self._refresher.is_alive()):
+            return
+
+        self._stop_refresher.clear()
+        self._refresher = threading.Thread(target=self._refreshLoop, name='country-snapshot-refresher', daemon=True)
+        self._refresher.start()
+
+    def stopRefresher(self) -> None:
+        self._stop_refresher.set()
+
+    def _request(self, url: str, *, headers: dict = None) -> Union[req.Response, str]:
+        """
+        Sends a GET request through the pooled session, guarded by the circuit breaker. Any exception raised while
+        sending, not only the connection errors and timeouts, and the server errors count as failures, client errors
+        such as a 404 are valid answers. The outcome is always recorded, so a half open trial is never left running
+
+        Positional arguments:
+            url {str} -- The url to request
+
+        Keyword arguments:
+            headers {dict} -- The headers to send. Default is None
+
+        Returns:
+            Response -- The API response
+            str -- The error message if the breaker is open or the request failed
+        """
+        if not self.breaker.allowRequest():
+            return 'The countries API is unavailable, try again later'
+
+        start = time.perf_counter()
+        succeeded = False
+        try:
+            response = self._session.get(url, headers=headers, timeout=self.timeout)
+            if response.status_code >= 500:
+                return f'The countries API answered {response.status_code}'
+
+            succeeded = True
+            return response
+        except Exception as e:
+            return f'Error connecting to the countries API: {e.__class__.__name__}'
+        finally:
+            latency = time.perf_counter() - start
+            if succeeded:
+                self.breaker.recordSuccess(latency)
+            else:
+                self.breaker.recordFailure(latency)
+
     def _queryAPI(self, path: str, *, error_message = None) -> Union[dict, str]:
         if not error_message:
             error_message = f'Error querying the API at {self.url}/{path}'
 
         query_url = f'{self.url}/{path}?filter={",".join(self.filters)}'
-        request = req.get(query_url).json()
+        response = self._request(query_url)
+        if isinstance(response, str):
+            return response
+
+        try:
+            request = response.json()
+        except ValueError:
+            return error_message
 
         if 'status' in request and request['status'] != 200:
             return error_message
 
         return request
 
+    def getStats(self) -> dict:
+        """
+        Returns the state of the client for monitoring: the circuit breaker, the country code lookups and the
+        loaded snapshot
+
+        Returns:
+            dict -- The breaker stats, the lookup counters and the snapshot size and age
+        """
+        fetched_at = self._snapshot_meta.get('fetched_at')
+
+        with self._lookups_lock:
+            lookups = {**self._lookup_stats, 'not_found_cached': len(self._not_found)}
+
+        return {
+            'breaker': self.breaker.getStats(),
+            'lookups': lookups,
+            'snapshot': {
+                'loaded': self._catalog is not None,
+                'countries': len(self._catalog) if self._catalog is not None else 0,
+                'age_seconds': round(datetime.now(tz=timezone.utc).timestamp() - fetched_at) if fetched_at else None
+            }
+        }
+
+    def getCatalog(self) -> Union[CountryCatalog,None]:
+        """
+        Returns the catalog of the current snapshot, or None if no snapshot is loaded yet
+        """
+        return self._catalog
+
+    def getCountryCodes(self) -> frozenset[str]:
+        """
+        Returns the set of valid country codes without querying the API: the codes of the snapshot when it is loaded,
+        which the background refresher keeps up to date, or the ISO 3166-1 alpha-3 table otherwise
+
+        Returns:
+            frozenset[str] -- The upper case cca3 codes
+        """
+        catalog = self._catalog
+
+        return catalog.codes if catalog is not None else ISO_ALPHA3
+
     def getAllCountries(self) -> list[Country]:
+        if self._catalog is not None:
+            return list(self._catalog.countries)
+
         countries_data = self._queryAPI('all')
 
         if isinstance(countries_data, str):
@@ -48,15 +316,62 @@ class CountryAPI:
         countries = [self._cleanCountryData(country_data) for country_data in countries_data]
         return countries
     
-    def getCountryByCCA3(self, cca3: str) -> Country:
+    def _countLookup(self, counter: str) -> None:
+        with self._lookups_lock:
+            self._lookup_stats[counter] += 1
+
+    def _isNotFound(self, cca3: str) -> bool:
+        with self._lookups_lock:
+            expires_at = self._not_found.get(cca3)
+            if expires_at is None:
+                return False
+
+            if expires_at <= time.monotonic():
+                del self._not_found[cca3]
+                return False
+
+            return True
+
+    def _rememberNotFound(self, cca3: str) -> None:
+        with self._lookups_lock:
+            self._not_found.pop(cca3, None)
+            self._not_found[cca3] = time.monotonic() + self.negative_ttl
+
+            # Evict the oldest codes first, they are also the first to expire
+            while len(self._not_found) > self.negative_cache_size:
+                self._not_found.popitem(last=False)
+
+    def _fetchCountry(self, cca3: str) -> Union[Country, str]:
         country_data = self._queryAPI(f'alpha/{cca3}', error_message='Country Code not found')
 
         if isinstance(country_data, str):
+            # Only the codes the API answered as unknown are cached, not the failures to reach it
+            if country_data == 'Country Code not found':
+                self._rememberNotFound(cca3)
             return country_data
 
         return self._cleanCountryData(country_data[0])
+
+    def getCountryByCCA3(self, cca3: str) -> Country:
+        if self._catalog is not None:
+            self._countLookup('hits')
+            country = self._catalog.getByCCA3(cca3)
+            return country if country is not None else 'Country Code not found'
+
+        cca3 = cca3.upper()
+        if self._isNotFound(cca3):
+            self._countLookup('negative_hits')
+            return 'Country Code not found'
+
+        country, shared = self._lookups.do(cca3, lambda: self._fetchCountry(cca3))
+        self._countLookup('coalesced' if shared else 'misses')
+
+        return country
     
     def getCountriesByListOfCCA3(self, cca3_list: list[str]) -> list[Country]:
+        if self._catalog is not None:
+            return self._catalog.getByListOfCCA3(cca3_list)
+
         countries_data = self._queryAPI(f'alpha?codes={",".join(cca3_list)}')
 
         if isinstance(countries_data, str):
@@ -66,6 +381,9 @@ class CountryAPI:
         return countries
     
     def getCountriesByCurrency(self, currency: str) -> list[Country]:
+        if self._catalog is not None:
+            return self._catalog.getByCurrency(currency)
+
         countries_data = self._queryAPI(f'currency/{currency}')
 
         if isinstance(countries_data, str):
@@ -75,6 +393,9 @@ class CountryAPI:
         return countries
     
     def getCountriesByLanguage(self, language: str) -> list[Country]:
+        if self._catalog is not None:
+            return self._catalog.getByLanguage(language)
+
         countries_data = self._queryAPI(f'lang/{language}')
 
         if isinstance(countries_data, str):
@@ -84,6 +405,9 @@ class CountryAPI:
         return countries
     
     def getCountriesByCapital(self, capital: str) -> list[Country]:
+        if self._catalog is not None:
+            return self._catalog.getByCapital(capital)
+
         countries_data = self._queryAPI(f'capital/{capital}')
 
         if isinstance(countries_data, str):
@@ -93,6 +417,9 @@ class CountryAPI:
         return countries
     
     def getCountriesByRegion(self, region: str) -> list[Country]:
+        if self._catalog is not None:
+            return self._catalog.getByRegion(region)
+
         countries_data = self._queryAPI(f'region/{region}')
 
         if isinstance(countries_data, str):
@@ -102,6 +429,9 @@ class CountryAPI:
         return countries
     
     def getCountriesBySubregion(self, subregion: str) -> list[Country]:
+        if self._catalog is not None:
+            return self._catalog.getBySubregion(subregion)
+
         countries_data = self._queryAPI(f'subregion/{subregion}')
 
         if isinstance(countries_data, str):
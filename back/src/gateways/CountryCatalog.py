@@ -0,0 +1,77 @@
+from src.entities.Country import Country
+from typing import Union
+import hashlib
+import json
+
+class CountryCatalog:
+    def __init__(self, countries: list[Country]) -> None:
+        """
+        Immutable in memory catalog of countries, indexed once by every attribute the countries API can be queried
+        with. All the keys are case insensitive
+
+        Arguments:
+            countries {list[Country]} -- The countries of the catalog
+        """
+        self.countries = countries
+        self.by_cca3 = {}
+        self.by_currency = {}
+        self.by_language = {}
+        self.by_capital = {}
+        self.by_region = {}
+        self.by_subregion = {}
+
+        for country in countries:
+            self.by_cca3[country.cca3.upper()] = country
+
+            # Currencies and languages can be searched by code or by name, as the API does
+            for code, (name, _) in country.currencies.items():
+                self._index(self.by_currency, [code, name], country)
+
+            for code, name in country.languages.items():
+                self._index(self.by_language, [code, name], country)
+
+            self._index(self.by_capital, [country.capital], country)
+            self._index(self.by_region, [country.region], country)
+            self._index(self.by_subregion, [country.subregion], country)
+
+        # Every known code, swapped with the catalog on each refresh
+        self.codes = frozenset(self.by_cca3)
+
+        # A strong validator of the catalog content, used as the ETag of the countries endpoints
+        content = json.dumps([country.asDict() for country in countries], sort_keys=True, ensure_ascii=False)
+        self.etag = hashlib.sha256(content.encode('utf-8')).hexdigest()[:32]
+
+    def _index(self, index: dict, keys: list[str], country: Country) -> None:
+        for key in {key.lower() for key in keys if key}:
+            index.setdefault(key, []).append(country)
+
+    def _lookup(self, index: dict, key: str) -> list[Country]:
+        return list(index.get(key.lower(), [])) if key else []
+
+    def getByCCA3(self, cca3: str) -> Union[Country,None]:
+        return self.by_cca3.get(cca3.upper()) if cca3 else None
+
+    def getByListOfCCA3(self, cca3_list: list[str]) -> list[Country]:
+        countries = (self.getByCCA3(cca3) for cca3 in dict.fromkeys(cca3_list))
+        return [country for country in countries if country is not None]
+
+    def getByCurrency(self, currency: str) -> list[Country]:
+        return self._lookup(self.by_currency, currency)
+
+    def getByLanguage(self, language: str) -> list[Country]:
+        return self._lookup(self.by_language, language)
+
+    def getByCapital(self, capital: str) -> list[Country]:
+        return self._lookup(self.by_capital, capital)
+
+    def getByRegion(self, region: str) -> list[Country]:
+        return self._lookup(self.by_region, region)
+
+    def getBySubregion(self, subregion: str) -> list[Country]:
+        return self._lookup(self.by_subregion, subregion)
+
+    def __contains__(self, cca3: str) -> bool:
+        return isinstance(cca3, str) and cca3.upper() in self.by_cca3
+
+    def __len__(self) -> int:
+        return len(self.countries)
@@ -0,0 +1,59 @@
+import fcntl
+import mmap
+import os
+import struct
+import threading
+
+# Every namespace is an unsigned 64 bits counter at a fixed offset of the file
+SLOT = struct.Struct('<Q')
+
+class GenerationCounter:
+    def __init__(self, path: str, namespaces: list[str]) -> None:
+        """
+        Counters of the changes made to each kind of data, kept in a small memory mapped file so every worker
+        process of the host reads the same values. Writers bump the namespaces they change after committing, and
+        the caches compare the generation an entry was loaded at with the current one to drop stale entries
+
+        Arguments:
+            path {str} -- The file of the counters, created with its directory if missing
+            namespaces {list[str]} -- The names of the counters, the order must be the same in every process
+        """
+        self.path = path
+        self._offsets = {namespace: index * SLOT.size for index, namespace in enumerate(namespaces)}
+        self._lock = threading.Lock()
+
+        if dirname := os.path.dirname(path):
+            os.makedirs(dirname, exist_ok=True)
+
+        size = SLOT.size * len(namespaces)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        # A shared mapping, the processes forked after this point keep seeing the same pages
+        self._map = mmap.mmap(self._fd, size)
+
+    def current(self, namespace: str) -> int:
+        return SLOT.unpack_from(self._map, self._offsets[namespace])[0]
+
+    def bump(self, *namespaces: str) -> None:
+        """
+        Increments the counters of the given namespaces. The file lock serializes the processes and the thread
+        lock the threads of this process, which share the lock of the file
+        """
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                for namespace in namespaces:
+                    offset = self._offsets[namespace]
+                    SLOT.pack_into(self._map, offset, SLOT.unpack_from(self._map, offset)[0] + 1)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def getAll(self) -> dict[str,int]:
+        return {namespace: self.current(namespace) for namespace in self._offsets}
@@ -0,0 +1,123 @@
+from collections import OrderedDict
+from typing import Union
+import threading
+import time
+
+class SlidingWindowCounter:
+    def __init__(self, limit: int, window_seconds: float, max_keys: int) -> None:
+        """
+        Approximated sliding window rate counter. Every key only keeps the index of its current fixed window and the
+        counts of that window and the previous one, the previous count is weighted by how much of it still overlaps
+        the sliding window. Keys are evicted least recently used first, so memory is bounded by max_keys
+
+        Arguments:
+            limit {int} -- The attempts allowed per window
+            window_seconds {float} -- The length of the window in seconds
+            max_keys {int} -- The maximum amount of keys tracked
+        """
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+
+        self._counters = OrderedDict()
+        self.evicted = 0
+
+    def _current(self, key: str, now: float) -> tuple[int,int,int]:
+        window = int(now // self.window_seconds)
+        index, previous, current = self._counters.get(key, (window, 0, 0))
+
+        if index == window - 1:
+            return (window, current, 0)
+        elif index != window:
+            return (window, 0, 0)
+
+        return (index, previous, current)
+
+    def estimate(self, key: str, now: float) -> float:
+        index, previous, current = self._current(key, now)
+        overlap = 1 - (now % self.window_seconds) / self.window_seconds
+
+        return previous * overlap + current
+
+    def add(self, key: str, now: float) -> None:
+        index, previous, current = self._current(key, now)
+
+        self._counters[key] = (index, previous, current + 1)
+        self._counters.move_to_end(key)
+
+        while len(self._counters) > self.max_keys:
+            self._counters.popitem(last=False)
+            self.evicted += 1
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+class LoginThrottle:
+    def __init__(self, *, email_limit: int = 5, ip_limit: int = 20, window_seconds: float = 60, max_keys: int = 100000) -> None:
+        """
+        Thread safe in process throttle of the login attempts, by email and by client address, checked before any
+        database or password work is done
+
+        Keyword arguments:
+            email_limit {int} -- The attempts allowed per email in a window. Default is 5
+            ip_limit {int} -- The attempts allowed per client address in a window. Default is 20
+            window_seconds {float} -- The length of the sliding window in seconds. Default is 60
+            max_keys {int} -- The maximum amount of emails and of addresses tracked. Default is 100000
+        """
+        self.window_seconds = window_seconds
+
+        self._lock = threading.Lock()
+        self._emails = SlidingWindowCounter(email_limit, window_seconds, max_keys)
+        self._ips = SlidingWindowCounter(ip_limit, window_seconds, max_keys)
+
+        # Monitoring counters
+        self._allowed = 0
+        self._throttled_email = 0
+        self._throttled_ip = 0
+
+    def allowAttempt(self, email: str, ip: str) -> Union[bool,str]:
+        """
+        Counts a login attempt if both the email and the address are under their limits
+
+        Arguments:
+            email {str} -- The email of the attempt
+            ip {str} -- The client address of the attempt
+
+        Returns:
+            bool -- True if the attempt is allowed
+            str -- The error message if the attempt is throttled, rejected attempts are not counted
+        """
+        email = str(email).strip().lower()
+        now = time.time()
+
+        with self._lock:
+            if self._ips.estimate(ip, now) >= self._ips.limit:
+                self._throttled_ip += 1
+                return 'Too many login attempts from this address, try again later'
+
+            if self._emails.estimate(email, now) >= self._emails.limit:
+                self._throttled_email += 1
+                return 'Too many login attempts for this user, try again later'
+
+            self._ips.add(ip, now)
+            self._emails.add(email, now)
+            self._allowed += 1
+
+            return True
+
+    def getStats(self) -> dict:
+        """
+        Returns the throttle decisions for monitoring
+
+        Returns:
+            dict -- The allowed and throttled attempts, and the tracked and evicted keys
+        """
+        with self._lock:
+            return {
+                'allowed': self._allowed,
+                'throttled_email': self._throttled_email,
+                'throttled_ip': self._throttled_ip,
+                'tracked_emails': len(self._emails),
+                'tracked_ips': len(self._ips),
+                'evicted': self._emails.evicted + self._ips.evicted
+            }
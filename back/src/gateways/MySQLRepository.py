@@ -4,17 +4,49 @@ from src.entities.User import User
 from src.entities.Role import Role
 from src.entities.Risk import Risk
 from src.entities.Provider import Provider
-from typing import Union
+from src.gateways.PasswordHasher import PasswordHasher, HashingError, HasherBusyError, BUSY_MESSAGE
+from src.gateways.GenerationCounter import GenerationCounter
+from typing import Union, Iterator, Callable
+from itertools import starmap
+from datetime import datetime
 import bcrypt
-
-class HashingError(Exception):
-    pass
+import hashlib
+import uuid
+import time
+
+# Boolean mode operators removed from the search terms and the default InnoDB minimum token size
+FULLTEXT_OPERATORS = '+-<>()~*"@'
+FULLTEXT_MIN_TOKEN_SIZE = 3
+
+# The tables each resource is built from and if they have an updated_at column. The risks show the country of their
+# provider and can be filtered by their users
+FINGERPRINT_TABLES = {
+    'roles': [('role', True)],
+    'providers': [('provider', True)],
+    'risks': [('risk', True), ('risk_user', False), ('provider', True)]
+}
 
 class MySQLRepository(Repository):
-    def __init__(self, config):
+    def __init__(self, config, *, hasher: PasswordHasher = None, generations: GenerationCounter = None, fingerprint_ttl: float = 1):
         self._pool = mysql.connector.pooling.MySQLConnectionPool(pool_name="mysql-pool",
                                                                 pool_size=5,
                                                                 **config)
+
+        # When given, bcrypt runs on the hasher process pool instead of the request thread
+        self._hasher = hasher
+
+        # When given, the writes bump the generation of the data they change, so the caches of every worker drop it
+        self._generations = generations
+
+        # The last fingerprint of each resource, with the generation and the time it was computed at
+        self.fingerprint_ttl = fingerprint_ttl
+        self._fingerprints = {}
+
+    def _changed(self, result: any, *namespaces: str) -> any:
+        if self._generations is not None and not isinstance(result, str):
+            self._generations.bump(*namespaces)
+
+        return result
         
     def _hashPassword(self, clear_text: str, *, salt:any = None, salt_difficulty: int = 12) -> tuple[str,str]:
         """
@@ -32,9 +64,13 @@ class MySQLRepository(Repository):
 
         Raises:
             HashingError -- If the password is empty or if an error ocurred while hashing the password
+            HasherBusyError -- If the hasher pool is saturated
         """
         if not clear_text:
             raise HashingError('Password cannot be empty')
+
+        if self._hasher is not None and not salt:
+            return self._hasher.hash(clear_text)
         
         try:
             # Use bcrypt to hash the password
@@ -57,9 +93,13 @@ class MySQLRepository(Repository):
 
         Raises:
             HashingError -- If the password or the hash are empty or if an error ocurred while hashing the password
+            HasherBusyError -- If the hasher pool is saturated
         """
         if not plain_Text or not stored_hash:
             raise HashingError('Provided hashes cannot be empty')
+
+        if self._hasher is not None:
+            return self._hasher.check(plain_Text, stored_hash)
         
         try:
             # Compare the hashes
@@ -67,6 +107,16 @@ class MySQLRepository(Repository):
         except Exception as e:
             raise HashingError(e.args[0])
         
+    def _getConnection(self) -> Union[mysql.connector.pooling.PooledMySQLConnection,str]:
+        """
+        Takes a connection from the pool. The streams hold theirs while they are consumed, so the pool can be
+        exhausted by long downloads, which is reported as busy instead of raising
+        """
+        try:
+            return self._pool.get_connection()
+        except mysql.connector.errors.PoolError:
+            return BUSY_MESSAGE
+
     def _queryDB(self, query: str, params: tuple = None, *, error_message:str = None, fetch_all: bool = False, fetch_one: bool = False, get_last_id:bool = False) -> Union[bool,int,str,list[tuple],tuple]:
         """
         Executes a query in the database and returns the result, properly managing the connection pool
@@ -93,7 +143,10 @@ class MySQLRepository(Repository):
         if not error_message:
             error_message = 'An error ocurred while executing the query in the database'
 
-        connection = self._pool.get_connection()
+        connection = self._getConnection()
+        if isinstance(connection, str):
+            return connection
+
         cursor = connection.cursor()
 
         try:
@@ -113,6 +166,144 @@ class MySQLRepository(Repository):
         finally:
             connection.close()
     
+    def _executeMany(self, query: str, rows: list[tuple], *, chunk_size: int = 500, error_message: str = None, duplicates: list[int] = None) -> Union[int,str]:
+        """
+        Executes a query once per row in chunks of chunk_size rows, all of them in a single transaction on one pooled
+        connection. INSERT queries are sent as a multi-row INSERT per chunk by the connector. InnoDB rolls back only
+        the statement that hits a duplicate key, so when duplicates are collected that chunk is sent again row by
+        row and only the rows the unique keys reject, as compared by the column collation, are left out
+
+        Positional arguments:
+            query {str} -- The query to execute
+            rows {list[tuple]} -- The parameters of every execution
+
+        Keyword arguments:
+            chunk_size {int} -- The amount of rows sent on each statement. Default is 500
+            error_message {str} -- The error message to return if the query fails. Default is 'An error ocurred while executing the query in the database'
+            duplicates {list[int]} -- If given, the positions of the rows rejected by a unique key are appended to it instead of failing. Default is None
+
+        Returns:
+            String -- The error message if any chunk fails, nothing is committed in that case
+            Integer -- The amount of affected rows
+        """
+        if not query:
+            return 'It is required to provide a query to execute'
+
+        if not error_message:
+            error_message = 'An error ocurred while executing the query in the database'
+
+        if not rows:
+            return 0
+
+        connection = self._getConnection()
+        if isinstance(connection, str):
+            return connection
+
+        cursor = connection.cursor()
+        affected = 0
+
+        try:
+            connection.start_transaction()
+
+            for start in range(0, len(rows), chunk_size):
+                try:
+                    cursor.executemany(query, rows[start:start + chunk_size])
+                    affected += cursor.rowcount
+                    continue
+                except mysql.connector.errors.IntegrityError as e:
+                    if duplicates is None or e.errno != mysql.connector.errorcode.ER_DUP_ENTRY:
+                        raise
+
+                for position in range(start, min(start + chunk_size, len(rows))):
+                    try:
+                        cursor.execute(query, rows[position])
+                        affected += cursor.rowcount
+                    except mysql.connector.errors.IntegrityError as e:
+                        if e.errno != mysql.connector.errorcode.ER_DUP_ENTRY:
+                            raise
+                        duplicates.append(position)
+
+            connection.commit()
+            return affected
+        except Exception as e:
+            connection.rollback()
+            return error_message
+        finally:
+            connection.close()
+
+    def _iterateQuery(self, query: str, params: tuple, factory: Callable, batch_size: int) -> Iterator:
+        """
+        Generator behind _streamDB, it first yields whether the query could be executed and then the rows built
+        with the factory. The pooled connection is only taken when the generator starts and is returned when it
+        is exhausted, closed or garbage collected
+        """
+        connection = self._pool.get_connection()
+
+        try:
+            cursor = connection.cursor(buffered=False)
+
+            try:
+                cursor.execute(query, params)
+            except Exception:
+                yield False
+                return
+
+            yield True
+
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+
+                yield from starmap(factory, rows)
+        finally:
+            # Drain the rows left on an early close so the connection goes back to the pool clean
+            try:
+                connection.consume_results()
+            except Exception:
+                pass
+
+            connection.close()
+
+    def _streamDB(self, query: str, params: tuple = None, *, factory: Callable, error_message: str = None, batch_size: int = 1000) -> Union[Iterator,str]:
+        """
+        Executes a query in the database with an unbuffered cursor and returns an iterator that fetches the rows
+        in batches, building each one lazily. The connection stays checked out of the pool until the iterator is
+        exhausted or closed, so consumers should not hold it longer than needed
+
+        Positional arguments:
+            query {str} -- The query to execute
+            params {tuple} -- The parameters to pass to the query. Default is None
+
+        Keyword arguments:
+            factory {Callable} -- The callable used to build every row, called with the row values as arguments
+            error_message {str} -- The error message to return if the query fails. Default is 'An error ocurred while executing the query in the database'
+            batch_size {int} -- The amount of rows to fetch from the server on each round. Default is 1000
+
+        Returns:
+            String -- The error message if the query fails
+            Iterator -- The lazily built rows
+        """
+        if not query:
+            return 'It is required to provide a query to execute'
+
+        if not error_message:
+            error_message = 'An error ocurred while executing the query in the database'
+
+        try:
+            stream = self._iterateQuery(query, params, factory, batch_size)
+
+            # Run the generator up to the query execution so failures are reported as the other queries do
+            if not next(stream):
+                stream.close()
+                return error_message
+        except mysql.connector.errors.PoolError:
+            return BUSY_MESSAGE
+        except Exception:
+            return error_message
+
+        return stream
+    
     def createUser(self, email: str, password: str, name: str) -> Union[int,str]:
         if not email or not password or not name:
             return 'Any of the required fields is empty, please fill all the fields'
@@ -121,7 +312,9 @@ class MySQLRepository(Repository):
         try:
             hashed_password, salt = self._hashPassword(password)
             
-            return self._queryDB(query, (email, hashed_password, salt, name), get_last_id=True, error_message='Error creating user')
+            return self._changed(self._queryDB(query, (email, hashed_password, salt, name), get_last_id=True, error_message='Error creating user'), 'users')
+        except HasherBusyError:
+            return BUSY_MESSAGE
         except HashingError as e:
             return 'An error ocurred while hashing the password'
 
@@ -170,14 +363,43 @@ class MySQLRepository(Repository):
 
         results = self._queryDB(query, (role,), fetch_all=True, error_message='Error obtaining users')
         
-        return results if isinstance(results, str) else [User(*result) for result in results]
+        return results if isinstance(results, str) else list(starmap(User, results))
 
     def getAllUsers(self) -> Union[list[User],str]:
         query = 'SELECT `id`, `email`, `hash`, `salt`, `name`, `created_at`, `updated_at` FROM `user`'
 
         results = self._queryDB(query, fetch_all=True, error_message='Error obtaining users')
         
-        return results if isinstance(results, str) else [User(*result) for result in results]
+        return results if isinstance(results, str) else list(starmap(User, results))
+
+    def streamUsers(self) -> Union[Iterator[User],str]:
+        query = 'SELECT `id`, `email`, `hash`, `salt`, `name`, `created_at`, `updated_at` FROM `user` ORDER BY `id`'
+
+        return self._streamDB(query, factory=User, error_message='Error obtaining users')
+
+    def getUsersByIds(self, ids: list[int]) -> Union[list[User],str]:
+        if not ids:
+            return []
+
+        query = f'SELECT `id`, `email`, `hash`, `salt`, `name`, `created_at`, `updated_at` FROM `user` WHERE `id` IN ({", ".join(["%s"] * len(ids))})'
+
+        results = self._queryDB(query, tuple(ids), fetch_all=True, error_message='Error obtaining users')
+
+        return results if isinstance(results, str) else list(starmap(User, results))
+
+    def getUsersPage(self, after: int, limit: int) -> Union[list[User],str]:
+        query = 'SELECT `id`, `email`, `hash`, `salt`, `name`, `created_at`, `updated_at` FROM `user` WHERE `id` > %s ORDER BY `id` LIMIT %s'
+
+        results = self._queryDB(query, (after, limit), fetch_all=True, error_message='Error obtaining users')
+        
+        return results if isinstance(results, str) else list(starmap(User, results))
+
+    def countUsers(self) -> Union[int,str]:
+        query = 'SELECT COUNT(*) FROM `user`'
+
+        result = self._queryDB(query, fetch_one=True, error_message='Error counting users')
+
+        return result if isinstance(result, str) else result[0]
 
     def updateUserData(self, user: User) -> Union[bool,str]:
         if not user:
@@ -185,7 +407,7 @@ class MySQLRepository(Repository):
 
         query = 'UPDATE `user` SET `email` = %s, `name` = %s WHERE `id` = %s'
 
-        return self._queryDB(query, (user.email, user.name, user.id), error_message='Error updating user')
+        return self._changed(self._queryDB(query, (user.email, user.name, user.id), error_message='Error updating user'), 'users')
 
     def updateUserPassword(self, user:User) -> Union[bool,str]:
         if not user:
@@ -198,14 +420,16 @@ class MySQLRepository(Repository):
 
         try:
             hashed_password, salt = self._hashPassword(user.password)
-            return self._queryDB(query, (hashed_password, salt, user.id), error_message='Error updating user')
+            return self._changed(self._queryDB(query, (hashed_password, salt, user.id), error_message='Error updating user'), 'users')
+        except HasherBusyError:
+            return BUSY_MESSAGE
         except HashingError as e:
             return 'An error ocurred while hashing the password'
 
     def deleteUser(self, id: int) -> Union[bool,str]:
         query = 'DELETE FROM `user` WHERE `id` = %s'
 
-        return self._queryDB(query, (id,), error_message='Error deleting user')
+        return self._changed(self._queryDB(query, (id,), error_message='Error deleting user'), 'users', 'risks')
         
     def validateUser(self, user:User) -> Union[bool,str]:
         if not user:
@@ -224,30 +448,130 @@ class MySQLRepository(Repository):
                 return 'The user cannot be validated'
 
             return True
+        except HasherBusyError:
+            return BUSY_MESSAGE
+        except HashingError:
+            return 'The user cannot be validated'
+
+    def verifyCredentials(self, email: str, password: str) -> Union[User,str]:
+        """
+        Fetches the user with the names of its roles, as getUserWithRoles does, in a single query and checks the
+        password against the stored hash
+
+        Arguments:
+            email {str} -- The email of the user
+            password {str} -- The password to check
+
+        Returns:
+            String -- The error message if the user does not exist or the password does not match
+            User -- The verified user with its roles
+        """
+        if not password:
+            return 'User password cannot be empty'
+
+        query = 'SELECT `user`.`id`, `email`, `hash`, `salt`, `user`.`name`, `user`.`created_at`, `user`.`updated_at`, `role`.`name` FROM `user` LEFT JOIN `user_role` ON `user`.`id` = `user_role`.`user_id` LEFT JOIN `role` ON `user_role`.`role_id` = `role`.`id` WHERE `user`.`email` = %s'
+
+        results = self._queryDB(query, (email,), fetch_all=True, error_message='The user cannot be validated')
+
+        if isinstance(results, str):
+            return results
+
+        if not results:
+            return 'User not found'
+
+        user = User(*results[0][:-1])
+        user.roles = [result[-1] for result in results if result[-1] is not None]
+
+        try:
+            if not self._checkPassword(password, user.hashed_password):
+                return 'The user cannot be validated'
+
+            return user
+        except HasherBusyError:
+            return BUSY_MESSAGE
         except HashingError:
             return 'The user cannot be validated'
 
     def linkRoleToUser(self, user_id: int, role_id: int) -> Union[bool,str]:
         query = 'INSERT INTO `user_role` (`user_id`, `role_id`) VALUES (%s, %s)'
 
-        return self._queryDB(query, (user_id, role_id), error_message='Error asigning role to user')
+        return self._changed(self._queryDB(query, (user_id, role_id), error_message='Error asigning role to user'), 'users')
 
     def unlinkRoleToUser(self, user_id: int, role_id: int) -> Union[bool,str]:
         query = 'DELETE FROM `user_role` WHERE `user_id` = %s AND `role_id` = %s'
 
-        return self._queryDB(query, (user_id, role_id), error_message='Error removing role to user')
+        return self._changed(self._queryDB(query, (user_id, role_id), error_message='Error removing role to user'), 'users')
+
+    def _linkMany(self, table: str, owner_column: str, owner_id: int, user_ids: list[int], *, delete: bool = False, error_message: str = None) -> Union[int,str]:
+        """
+        Inserts or deletes the links of one role or risk with many users with a single statement. The users that
+        are already linked are skipped, so repeating a batch does not duplicate links
+
+        Returns:
+            String -- The error message if the statement fails
+            Integer -- The amount of affected links
+        """
+        if not user_ids:
+            return 0
+
+        if delete:
+            query = f'DELETE FROM `{table}` WHERE `{owner_column}` = %s AND `user_id` IN ({", ".join(["%s"] * len(user_ids))})'
+            params = (owner_id, *user_ids)
+        else:
+            query = (
+                f'INSERT INTO `{table}` (`{owner_column}`, `user_id`) '
+                f'SELECT %s, `user`.`id` FROM `user` WHERE `user`.`id` IN ({", ".join(["%s"] * len(user_ids))}) '
+                f'AND NOT EXISTS (SELECT 1 FROM `{table}` AS `link` WHERE `link`.`{owner_column}` = %s AND `link`.`user_id` = `user`.`id`)'
+            )
+            params = (owner_id, *user_ids, owner_id)
+
+        connection = self._getConnection()
+        if isinstance(connection, str):
+            return connection
+
+        cursor = connection.cursor()
+
+        try:
+            cursor.execute(query, params)
+            connection.commit()
+            return cursor.rowcount
+        except Exception as e:
+            connection.rollback()
+            return error_message
+        finally:
+            connection.close()
+
+    def linkRolesToUsers(self, role_id: int, user_ids: list[int]) -> Union[int,str]:
+        return self._changed(self._linkMany('user_role', 'role_id', role_id, user_ids, error_message='Error asigning role to users'), 'users')
+
+    def unlinkRolesToUsers(self, role_id: int, user_ids: list[int]) -> Union[int,str]:
+        return self._changed(self._linkMany('user_role', 'role_id', role_id, user_ids, delete=True, error_message='Error removing role to users'), 'users')
 
     def getAllRoles(self) -> Union[list[Role],str]:
         query = 'SELECT `id`, `name`, `created_at`, `updated_at` FROM `role`'
 
         results = self._queryDB(query, fetch_all=True, error_message='Error obtaining roles')
         
-        return results if isinstance(results, str) else [Role(*result) for result in results]
+        return results if isinstance(results, str) else list(starmap(Role, results))
+
+    def getRolesPage(self, after: int, limit: int) -> Union[list[Role],str]:
+        query = 'SELECT `id`, `name`, `created_at`, `updated_at` FROM `role` WHERE `id` > %s ORDER BY `id` LIMIT %s'
+
+        results = self._queryDB(query, (after, limit), fetch_all=True, error_message='Error obtaining roles')
+        
+        return results if isinstance(results, str) else list(starmap(Role, results))
+
+    def countRoles(self) -> Union[int,str]:
+        query = 'SELECT COUNT(*) FROM `role`'
+
+        result = self._queryDB(query, fetch_one=True, error_message='Error counting roles')
+
+        return result if isinstance(result, str) else result[0]
 
     def createRole(self, name: str) -> Union[int,str]:
         query = 'INSERT INTO `role` (`name`) VALUES (%s)'
 
-        return self._queryDB(query, (name,), get_last_id=True, error_message='Error creating rol')
+        return self._changed(self._queryDB(query, (name,), get_last_id=True, error_message='Error creating rol'), 'roles')
 
     def getRoleById(self, id: int) -> Union[Role,str]:
         query = 'SELECT `id`, `name`, `created_at`, `updated_at` FROM `role` WHERE `id` = %s'
@@ -269,17 +593,17 @@ class MySQLRepository(Repository):
 
         query = 'UPDATE `role` SET `name` = %s WHERE `id` = %s'
 
-        return self._queryDB(query, (role.name, role.id), error_message='Error updating rol')
+        return self._changed(self._queryDB(query, (role.name, role.id), error_message='Error updating rol'), 'roles')
 
     def deleteRole(self, id: int) -> Union[bool,str]:
         query = 'DELETE FROM `role` WHERE `id` = %s'
 
-        return self._queryDB(query, (id,), error_message='Error deleting role')
+        return self._changed(self._queryDB(query, (id,), error_message='Error deleting role'), 'roles')
         
     def createProvider(self, name: str, description: str, country:str) -> Union[int,str]:
         query = 'INSERT INTO `provider` (`name`, `description`, `country`) VALUES (%s, %s, %s)'
 
-        return self._queryDB(query, (name, description, country), get_last_id=True, error_message='Error creating provider')
+        return self._changed(self._queryDB(query, (name, description, country), get_last_id=True, error_message='Error creating provider'), 'providers')
 
     def getProviderById(self, id: int) -> Union[Provider,str]:
         query = 'SELECT `id`, `name`, `description`, `created_at`, `updated_at` FROM `provider` WHERE `id` = %s'
@@ -295,30 +619,123 @@ class MySQLRepository(Repository):
         
         return result if isinstance(result, Union[str,None]) else Provider(*result)
     
+    def getProvidersByIds(self, ids: list[int]) -> Union[list[Provider],str]:
+        if not ids:
+            return []
+
+        query = f'SELECT `id`, `name`, `description`, `country`, `created_at`, `updated_at` FROM `provider` WHERE `id` IN ({", ".join(["%s"] * len(ids))})'
+
+        results = self._queryDB(query, tuple(ids), fetch_all=True, error_message='the users couldn\'t be retrieved')
+
+        return results if isinstance(results, str) else list(starmap(Provider, results))
+
+    def getProvidersByNames(self, names: list[str]) -> Union[list[Provider],str]:
+        if not names:
+            return []
+
+        query = f'SELECT `id`, `name`, `description`, `country`, `created_at`, `updated_at` FROM `provider` WHERE `name` IN ({", ".join(["%s"] * len(names))})'
+
+        results = self._queryDB(query, tuple(names), fetch_all=True, error_message='the users couldn\'t be retrieved')
+
+        return results if isinstance(results, str) else list(starmap(Provider, results))
+
+    def createProviders(self, providers: list[tuple[str,str,str]], *, chunk_size: int = 500) -> Union[tuple[int,list[int]],str]:
+        query = 'INSERT INTO `provider` (`name`, `description`, `country`) VALUES (%s, %s, %s)'
+
+        # The unique name is decided by the database, with its collation, and the taken names are reported per row
+        duplicates = []
+        created = self._executeMany(query, providers, chunk_size=chunk_size, error_message='Error creating providers', duplicates=duplicates)
+
+        return created if isinstance(created, str) else self._changed((created, duplicates), 'providers')
+
     def getAllProviders(self) -> Union[list[Provider],str]:
         query = 'SELECT `id`, `name`, `description`, `country`, `created_at`, `updated_at` FROM `provider`'
 
         results = self._queryDB(query, fetch_all=True, error_message='the users couldn\'t be retrieved')
         
-        return results if isinstance(results, str) else [Provider(*result) for result in results]
+        return results if isinstance(results, str) else list(starmap(Provider, results))
         
+    def streamProviders(self) -> Union[Iterator[Provider],str]:
+        query = 'SELECT `id`, `name`, `description`, `country`, `created_at`, `updated_at` FROM `provider` ORDER BY `id`'
+
+        return self._streamDB(query, factory=Provider, error_message='the users couldn\'t be retrieved')
+
+    def getProvidersPage(self, after: int, limit: int) -> Union[list[Provider],str]:
+        query = 'SELECT `id`, `name`, `description`, `country`, `created_at`, `updated_at` FROM `provider` WHERE `id` > %s ORDER BY `id` LIMIT %s'
+
+        results = self._queryDB(query, (after, limit), fetch_all=True, error_message='the users couldn\'t be retrieved')
+        
+        return results if isinstance(results, str) else list(starmap(Provider, results))
+
+    def countProviders(self) -> Union[int,str]:
+        query = 'SELECT COUNT(*) FROM `provider`'
+
+        result = self._queryDB(query, fetch_one=True, error_message='Error counting providers')
+
+        return result if isinstance(result, str) else result[0]
+
     def updateProvider(self, provider: Provider) -> Union[bool,str]:
         if not provider:
             return 'It is required to provide a provider to update'
 
         query = 'UPDATE `provider` SET `name` = %s, `description` = %s, `country`= %s WHERE `id` = %s'
 
-        return self._queryDB(query, (provider.name, provider.description, provider.country, provider.id), error_message='Error updating provider')
+        return self._changed(self._queryDB(query, (provider.name, provider.description, provider.country, provider.id), error_message='Error updating provider'), 'providers', 'risks')
         
     def deleteProvider(self, id: int) -> Union[bool,str]:
         query = 'DELETE FROM `provider` WHERE `id` = %s'
 
-        return self._queryDB(query, (id,), error_message='Error al eliminar proveedor')
+        return self._changed(self._queryDB(query, (id,), error_message='Error al eliminar proveedor'), 'providers', 'risks')
 
     def createRisk(self, provider_id:int, name: str, description: str, probability: Classification, impact: Classification) -> Union[int,str]:
         query = 'INSERT INTO `risk` (`provider_id`, `name`, `description`, `probability`, `impact`) VALUES (%s, %s, %s, %s, %s)'
 
-        return self._queryDB(query, (provider_id, name, description, probability, impact), get_last_id=True, error_message='Error creating risk')
+        return self._changed(self._queryDB(query, (provider_id, name, description, probability, impact), get_last_id=True, error_message='Error creating risk'), 'risks')
+
+    def createRisks(self, risks: list[tuple[int,str,str,str,str]], user_id: int) -> Union[int,str]:
+        """
+        Creates the risks with one multi-row INSERT and links all of them to the user with another, in a single
+        transaction, so either the whole batch is stored or none of it. The ids of a multi-row INSERT are neither
+        consecutive with innodb_autoinc_lock_mode=2 nor one apart with auto_increment_increment > 1, so the rows
+        are tagged with a random batch key and the links are selected back by it
+
+        Arguments:
+            risks {list[tuple[int,str,str,str,str]]} -- The provider_id, name, description, probability and impact of every risk
+            user_id {int} -- The user creating the risks
+
+        Returns:
+            String -- The error message if the batch could not be stored
+            Integer -- The amount of created risks
+        """
+        if not risks:
+            return 0
+
+        connection = self._getConnection()
+        if isinstance(connection, str):
+            return connection
+
+        cursor = connection.cursor()
+
+        try:
+            connection.start_transaction()
+
+            batch = uuid.uuid4().bytes
+            cursor.execute(
+                f'INSERT INTO `risk` (`provider_id`, `name`, `description`, `probability`, `impact`, `batch`) VALUES {", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(risks))}',
+                tuple(value for risk in risks for value in (*risk, batch))
+            )
+
+            cursor.execute('INSERT INTO `risk_user` (`risk_id`, `user_id`) SELECT `id`, %s FROM `risk` WHERE `batch` = %s', (user_id, batch))
+            if cursor.rowcount != len(risks):
+                raise Exception('The risks of the batch were not linked')
+
+            connection.commit()
+            return self._changed(len(risks), 'risks')
+        except Exception as e:
+            connection.rollback()
+            return 'Error creating risks'
+        finally:
+            connection.close()
 
     def getRiskById(self, id: int) -> Union[Risk,str]:
         query = 'SELECT `id`, `provider_id`, `name`, `description`, `probability`, `impact`, `created_at`, `updated_at` FROM `risk` WHERE `id` = %s'
@@ -327,60 +744,193 @@ class MySQLRepository(Repository):
         
         return result if isinstance(result, Union[str,None]) else Risk(*result)
 
+    def _compileSearch(self, string: str) -> tuple[str,list,Union[tuple[str,str],None]]:
+        """
+        Compiles a free text search over the risks name and description. The condition is a substring LIKE of the
+        whole string, the same results the filter always had: the FULLTEXT index only matches words by prefix and
+        drops stopwords, so it would miss mid-word hits like "sql" in "MySQL". The index ranks the results instead,
+        with every word matched by prefix, unless a word is shorter than its minimum token size
+        (innodb_ft_min_token_size) or nothing searchable is left after removing the operators
+
+        Arguments:
+            string {str} -- The text to search
+
+        Returns:
+            tuple[str,list,Union[tuple[str,str],None]] -- The WHERE condition, its parameters and the relevance
+            expression to order by with its parameter (None when the words cannot be ranked)
+        """
+        condition = '(`risk`.`name` LIKE %s OR `risk`.`description` LIKE %s)'
+        params = [f'%{string}%', f'%{string}%']
+
+        terms = ''.join(' ' if character in FULLTEXT_OPERATORS else character for character in string).split()
+        if not terms or any(len(term) < FULLTEXT_MIN_TOKEN_SIZE for term in terms):
+            return condition, params, None
+
+        relevance = ('MATCH(`risk`.`name`, `risk`.`description`) AGAINST (%s IN BOOLEAN MODE)', ' '.join(f'+{term}*' for term in terms))
+        return condition, params, relevance
+
     def getRisksByString(self, string: str) -> Union[list[Risk],str]:
-        query = 'SELECT `id`, `name`, `description`, `probability`, `impact`, `created_at`, `updated_at` FROM `risk` WHERE `name` LIKE %s OR `description` LIKE %s'
+        condition, params, relevance = self._compileSearch(string)
 
-        results = self._queryDB(query, (f'%{string}%', f'%{string}%'), fetch_all=True, error_message='Error obtaining risks')
+        query = f'SELECT `id`, `provider_id`, `name`, `description`, `probability`, `impact`, `created_at`, `updated_at` FROM `risk` WHERE {condition}'
+        if relevance:
+            query += f' ORDER BY {relevance[0]} DESC, `id`'
+            params = [*params, relevance[1]]
+
+        results = self._queryDB(query, tuple(params), fetch_all=True, error_message='Error obtaining risks')
         
-        return results if isinstance(results, str) else [Risk(*result) for result in results]
+        return results if isinstance(results, str) else list(starmap(Risk, results))
 
     def getRisksByProbability(self, probability: Classification) -> Union[list[Risk],str]:
         query = 'SELECT `id`, `name`, `description`, `probability`, `impact`, `created_at`, `updated_at` FROM `risk` WHERE `probability` = %s'
 
         results = self._queryDB(query, (probability,), fetch_all=True, error_message='Error obtaining risks')
-        return results if isinstance(results, str) else [Risk(*result) for result in results]
+        return results if isinstance(results, str) else list(starmap(Risk, results))
 
     def getRisksByImpact(self, impact: Classification) -> Union[list[Risk],str]:
         query = 'SELECT `id`, `name`, `description`, `probability`, `impact`, `created_at`, `updated_at` FROM `risk` WHERE `impact` = %s'
 
         results = self._queryDB(query, (impact,), fetch_all=True, error_message='Error obtaining risks')
         
-        return results if isinstance(results, str) else [Risk(*result) for result in results]
+        return results if isinstance(results, str) else list(starmap(Risk, results))
 
     def getRisksByUser(self, user: User) -> Union[list[Risk],str]:
         query = 'SELECT q.`id`, q.`name`, q.`description`, q.`probability`, q.`impact`, q.`created_at`, q.`updated_at` FROM (SELECT `risk`.`id`, `name`, `description`, `probability`, `impact`, `created_at`, `updated_at` FROM `risk`  INNER JOIN `risk_user` ON `risk`.`id` = `risk_user`.`risk_id` WHERE `risk_user`.`user_id` = %s) AS q'
 
         results = self._queryDB(query, (user.id,), fetch_all=True, error_message='Error obtaining risks')
         
-        return results if isinstance(results, str) else [Risk(*result) for result in results]
+        return results if isinstance(results, str) else list(starmap(Risk, results))
         
     def getRisksByProvider(self, provider: Provider) -> Union[list[Risk],str]:
         query = 'SELECT `id`, `name`, `description`, `probability`, `impact`, `created_at`, `updated_at` FROM `risk` WHERE `provider_id` = %s'
 
         results = self._queryDB(query, (provider.id,), fetch_all=True, error_message='Error obtaining risks')
         
-        return results if isinstance(results, str) else [Risk(*result) for result in results]
+        return results if isinstance(results, str) else list(starmap(Risk, results))
     
     def getRisksByCountry(self, country: str) -> Union[list[Risk],str]:
         query = 'SELECT q.`id`, q.`provider_id`, q.`name`, q.`description`, q.`probability`, q.`impact`, q.`created_at`, q.`updated_at`, q.`country` FROM (SELECT `risk`.`id`, `provider_id`, `risk`.`name`, `risk`.`description`, `probability`, `impact`, `risk`.`created_at`, `risk`.`updated_at`, `provider`.`country` FROM `risk`  INNER JOIN `provider` ON `risk`.`provider_id` = `provider`.`id` WHERE `provider`.`country` = %s) AS q'
 
         results = self._queryDB(query, (country,), fetch_all=True, error_message='Error obtaining risks')
 
-        return results if isinstance(results, str) else [Risk(*result) for result in results]
+        return results if isinstance(results, str) else list(starmap(Risk, results))
     
     def getAllRisks(self) -> Union[list[Risk],str]:
         query = 'SELECT `id`, `provider_id`, `name`, `description`, `probability`, `impact`, `created_at`, `updated_at` FROM `risk`'
 
         results = self._queryDB(query, fetch_all=True, error_message='Error obtaining risks')
         
-        return results if isinstance(results, str) else [Risk(*result) for result in results]
+        return results if isinstance(results, str) else list(starmap(Risk, results))
+
+    def _compileRisksQuery(self, filters: dict, *, after: int = None, limit: int = None, count: bool = False, with_country: bool = False) -> tuple[str,tuple]:
+        """
+        Compiles a risks filters dictionary into a single parameterized SELECT, joining the provider and risk_user
+        tables only when a filter needs them
+
+        Positional arguments:
+            filters {dict} -- The filters to apply, with keys in provider_id, user_id, string, probability, impact or country
+
+        Keyword arguments:
+            after {int} -- Only select risks with an id greater than this one (keyset pagination). Default is None
+            limit {int} -- The maximum amount of risks to select. Default is None
+            count {bool} -- If the query should count the matching risks instead of selecting them. Default is False
+            with_country {bool} -- If the provider country should be selected even without a country filter. Default is False
+
+        Returns:
+            tuple[str,tuple] -- The query to execute and its parameters
+        """
+        columns = ['`risk`.`id`', '`risk`.`provider_id`', '`risk`.`name`', '`risk`.`description`', '`risk`.`probability`', '`risk`.`impact`', '`risk`.`created_at`', '`risk`.`updated_at`']
+        joins = []
+        conditions = []
+        params = []
+
+        # The user join is deduplicated because risk_user allows repeated links
+        if 'user_id' in filters:
+            joins.append('INNER JOIN (SELECT DISTINCT `risk_id` FROM `risk_user` WHERE `user_id` = %s) AS `ru` ON `risk`.`id` = `ru`.`risk_id`')
+            params.append(filters['user_id'])
+
+        if 'country' in filters:
+            columns.append('`provider`.`country`')
+            joins.append('INNER JOIN `provider` ON `risk`.`provider_id` = `provider`.`id`')
+            conditions.append('`provider`.`country` = %s')
+            params.append(filters['country'])
+        elif with_country:
+            # Risks can lose their provider (ON DELETE SET NULL), so they are kept with a NULL country
+            columns.append('`provider`.`country`')
+            joins.append('LEFT JOIN `provider` ON `risk`.`provider_id` = `provider`.`id`')
+
+        if 'provider_id' in filters:
+            conditions.append('`risk`.`provider_id` = %s')
+            params.append(filters['provider_id'])
+
+        relevance = None
+        if 'string' in filters:
+            condition, search_params, relevance = self._compileSearch(filters['string'])
+            conditions.append(condition)
+            params.extend(search_params)
+
+        if 'probability' in filters:
+            conditions.append('`risk`.`probability` = %s')
+            params.append(filters['probability'])
+
+        if 'impact' in filters:
+            conditions.append('`risk`.`impact` = %s')
+            params.append(filters['impact'])
+
+        if after is not None:
+            conditions.append('`risk`.`id` > %s')
+            params.append(after)
+
+        query = f'SELECT {"COUNT(*)" if count else ", ".join(columns)} FROM `risk`'
+        if joins:
+            query += ' ' + ' '.join(joins)
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+
+        if count:
+            return query, tuple(params)
+
+        # Searches are ranked by relevance, except for pages that need the stable id order of the keyset
+        if relevance and after is None and limit is None:
+            query += f' ORDER BY {relevance[0]} DESC, `risk`.`id`'
+            params.append(relevance[1])
+        else:
+            query += ' ORDER BY `risk`.`id`'
+
+        if limit is not None:
+            query += ' LIMIT %s'
+            params.append(limit)
+
+        return query, tuple(params)
+
+    def queryRisks(self, filters: dict, *, after: int = None, limit: int = None) -> Union[list[Risk],str]:
+        query, params = self._compileRisksQuery(filters, after=after, limit=limit)
+
+        results = self._queryDB(query, params, fetch_all=True, error_message='Error obtaining risks')
+
+        return results if isinstance(results, str) else list(starmap(Risk, results))
+
+    def streamRisks(self, filters: dict = None, *, with_country: bool = False) -> Union[Iterator[Risk],str]:
+        query, params = self._compileRisksQuery(filters or {}, with_country=with_country)
+
+        return self._streamDB(query, params, factory=Risk, error_message='Error obtaining risks')
+
+    def getRisksPage(self, after: int, limit: int) -> Union[list[Risk],str]:
+        return self.queryRisks({}, after=after, limit=limit)
+
+    def countRisks(self, filters: dict = None) -> Union[int,str]:
+        query, params = self._compileRisksQuery(filters or {}, count=True)
+
+        result = self._queryDB(query, params, fetch_one=True, error_message='Error counting risks')
+
+        return result if isinstance(result, str) else result[0]
 
     def getAllRisksWithUser(self) -> Union[list[Risk],str]:
         query = 'SELECT q.`id`, q.`provider_id`, q.`name`, q.`description`, q.`probability`, q.`impact`, q.`created_at`, q.`updated_at`, q.`user_id` FROM (SELECT `id`, `provider_id`, `name`, `description`, `probability`, `impact`, `created_at`, `updated_at`, `user_id` FROM `risk`  INNER JOIN `risk_user` ON `risk`.`id` = `risk_user`.`risk_id`) AS q'
 
         results = self._queryDB(query, fetch_all=True, error_message='Error obtaining risks')
         
-        return results if isinstance(results, str) else [Risk(*result) for result in results]
+        return results if isinstance(results, str) else list(starmap(Risk, results))
 
     def updateRisk(self, risk: Risk) -> Union[bool,str]:
         if not Risk:
@@ -388,19 +938,98 @@ class MySQLRepository(Repository):
 
         query = 'UPDATE `risk` SET `name` = %s, `description` = %s, `probability` = %s, `impact` = %s, `provider_id` = %s WHERE `id` = %s'
 
-        return self._queryDB(query, (risk.name, risk.description, risk.probability, risk.impact, risk.provider_id, risk.id), error_message='Error updating risk')
+        return self._changed(self._queryDB(query, (risk.name, risk.description, risk.probability, risk.impact, risk.provider_id, risk.id), error_message='Error updating risk'), 'risks')
 
     def deleteRisk(self, id: int) -> Union[bool,str]:
         query = 'DELETE FROM `risk` WHERE `id` = %s'
 
-        return self._queryDB(query, (id,), error_message='Error deleting risk')
+        return self._changed(self._queryDB(query, (id,), error_message='Error deleting risk'), 'risks')
 
     def relateRiskToUser(self, risk_id:int, user_id:int) -> Union[bool,str]:
         query = 'INSERT INTO `risk_user` (`risk_id`, `user_id`) VALUES (%s, %s)'
 
-        return self._queryDB(query, (risk_id, user_id), error_message='Error relating risk with user')
+        return self._changed(self._queryDB(query, (risk_id, user_id), error_message='Error relating risk with user'), 'risks')
+
+    def relateRisksToUsers(self, risk_id: int, user_ids: list[int]) -> Union[int,str]:
+        return self._changed(self._linkMany('risk_user', 'risk_id', risk_id, user_ids, error_message='Error relating risk with users'), 'risks')
+
+    def unrelateRisksToUsers(self, risk_id: int, user_ids: list[int]) -> Union[int,str]:
+        return self._changed(self._linkMany('risk_user', 'risk_id', risk_id, user_ids, delete=True, error_message='Error unrelating risk with users'), 'risks')
 
     def unrelateRiskToUser(self, risk_id:int, user_id:int) -> Union[bool,str]:
         query = 'DELETE FROM `risk_user` WHERE `risk_id` = %s AND `user_id` = %s'
 
-        return self._queryDB(query, (risk_id, user_id), error_message='Error unrelating risk with user')
\ No newline at end of file
+        return self._changed(self._queryDB(query, (risk_id, user_id), error_message='Error unrelating risk with user'), 'risks')
+
+    def getFingerprint(self, resource: str) -> Union[str,None]:
+        """
+        Computes the version of a resource from the count, the highest id and the last update of each of its tables
+        in a single query, without reading any row. The DATETIME columns only have seconds, so the generation of the
+        resource is part of the version too and catches the writes made in the same second. While the generation
+        does not change, the version is reused for fingerprint_ttl seconds, which bounds how late the writes made
+        outside of this host are seen
+
+        Positional arguments:
+            resource {str} -- The resource to fingerprint, one of roles, providers or risks
+
+        Returns:
+            String -- The fingerprint of the resource
+            None -- If the resource is unknown or the query fails
+        """
+        if resource not in FINGERPRINT_TABLES:
+            return None
+
+        generation = self._generations.current(resource) if self._generations is not None else None
+
+        cached = self._fingerprints.get(resource)
+        if generation is not None and cached is not None and cached[0] == generation and cached[1] > time.monotonic():
+            return cached[2]
+
+        query = ' UNION ALL '.join(
+            f'SELECT COUNT(*), MAX(`id`), {"MAX(`updated_at`)" if updated else "NULL"} FROM `{table}`'
+            for table, updated in FINGERPRINT_TABLES[resource]
+        )
+
+        rows = self._queryDB(query, fetch_all=True, error_message='Error obtaining the fingerprint')
+        if isinstance(rows, str):
+            return None
+
+        fingerprint = hashlib.sha256(repr((resource, generation, rows)).encode('utf-8')).hexdigest()[:32]
+        self._fingerprints[resource] = (generation, time.monotonic() + self.fingerprint_ttl, fingerprint)
+
+        return fingerprint
+
+    def getRiskChanges(self, risks_since: datetime = None, providers_since: datetime = None, links_after: int = 0) -> Union[dict,str]:
+        """
+        Reads the changed rows of every table with the updated_at and primary keys indexes. The counts are read
+        first, so a row written meanwhile can only make the rows read outnumber them, which the caller detects
+        """
+        counts = self._queryDB(
+            'SELECT (SELECT COUNT(*) FROM `risk`), (SELECT COUNT(*) FROM `provider`), (SELECT COUNT(*) FROM `risk_user`)',
+            fetch_one=True,
+            error_message='Error obtaining the risk changes'
+        )
+        if isinstance(counts, str):
+            return counts
+
+        changes = {'counts': dict(zip(['risk', 'provider', 'risk_user'], counts))}
+
+        queries = {
+            'risk': ('SELECT `id`, `provider_id`, `probability`, `impact`, `updated_at` FROM `risk`', '`updated_at` >= %s', risks_since),
+            'provider': ('SELECT `id`, `country`, `updated_at` FROM `provider`', '`updated_at` >= %s', providers_since),
+            'risk_user': ('SELECT `id`, `risk_id`, `user_id` FROM `risk_user`', '`id` > %s', links_after or None)
+        }
+
+        for table, (query, condition, since) in queries.items():
+            rows = self._queryDB(
+                query if since is None else f'{query} WHERE {condition}',
+                None if since is None else (since,),
+                fetch_all=True,
+                error_message='Error obtaining the risk changes'
+            )
+            if isinstance(rows, str):
+                return rows
+
+            changes[table] = rows
+
+        return changes
@@ -0,0 +1,222 @@
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import threading
+import time
+import bcrypt
+
+# The error returned to the clients when the pool sheds a request
+BUSY_MESSAGE = 'The server is busy, try again later'
+
+class HashingError(Exception):
+    pass
+
+class HasherBusyError(Exception):
+    pass
+
+def _hashWorker(clear_text: bytes, cost: int) -> tuple[bytes,bytes]:
+    salt = bcrypt.gensalt(cost)
+    return (bcrypt.hashpw(clear_text, salt), salt)
+
+def _checkWorker(clear_text: bytes, stored_hash: bytes) -> bool:
+    return bcrypt.checkpw(clear_text, stored_hash)
+
+class PasswordHasher:
+    def __init__(self, *, workers: int = 2, max_pending: int = 16, cost: int = 12, timeout: float = 30) -> None:
+        """
+        Runs bcrypt on a dedicated pool of processes, so hashing and verifying passwords does not hold the CPU of
+        the request threads. The requests that find the pool and its queue full are rejected instead of waiting
+
+        Keyword arguments:
+            workers {int} -- The amount of processes hashing in parallel. Default is 2
+            max_pending {int} -- The amount of requests that can wait for a free process. Default is 16
+            cost {int} -- The bcrypt cost factor of the new hashes (2**cost iterations). Default is 12
+            timeout {float} -- The seconds a request waits for its result before giving up. Default is 30
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self.cost = cost
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._executor = None
+
+        # Monitoring counters
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._busy_seconds = 0.0
+
+    def _getExecutor(self) -> ProcessPoolExecutor:
+        # The processes are spawned on the first use, never at import time, and not forked from a threaded server
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+
+            return self._executor
+
+    def _resetExecutor(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        # Outside the lock, the cancelled jobs release their slots through _release
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self, future) -> None:
+        # The slot is held until the job leaves the pool, a request that timed out does not free it while its bcrypt still runs
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _run(self, function, *args) -> any:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HasherBusyError(BUSY_MESSAGE)
+
+        with self._lock:
+            self._in_flight += 1
+        start = time.perf_counter()
+
+        try:
+            future = self._getExecutor().submit(function, *args)
+        except Exception as e:
+            self._release(None)
+            raise HashingError(str(e))
+
+        future.add_done_callback(self._release)
+        timed_out = False
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # A job still waiting for a process is dropped, a running one keeps its slot until it ends
+            future.cancel()
+            timed_out = True
+            raise HasherBusyError(BUSY_MESSAGE)
+        except BrokenProcessPool:
+            # A worker died, the next request starts a new pool
+            self._resetExecutor()
+            raise HashingError('The password hashing pool stopped')
+        except Exception as e:
+            raise HashingError(str(e))
+        finally:
+            with self._lock:
+                if timed_out:
+                    self._timed_out += 1
+                else:
+                    self._completed += 1
+                    self._busy_seconds += time.perf_counter() - start
+
+    def hash(self, clear_text: str) -> tuple[bytes,bytes]:
+        """
+        Hashes a password with a new salt
+
+        Arguments:
+            clear_text {str} -- The password to hash
+
+        Returns:
+            tuple[bytes,bytes] -- The hashed password and the salt used to hash it
+
+        Raises:
+            HashingError -- If the password is empty or could not be hashed
+            HasherBusyError -- If the pool is saturated
+        """
+        if not clear_text:
+            raise HashingError('Password cannot be empty')
+
+        return self._run(_hashWorker, clear_text.encode('utf-8'), self.cost)
+
+    def check(self, clear_text: str, stored_hash: str) -> bool:
+        """
+        Checks a password against a stored hash, the salt and cost are read from the hash itself
+
+        Arguments:
+            clear_text {str} -- The password to check
+            stored_hash {str} -- The stored hash
+
+        Returns:
+            bool -- True if the password matches the hash
+
+        Raises:
+            HashingError -- If the password or the hash are empty or the hash is invalid
+            HasherBusyError -- If the pool is saturated
+        """
+        if not clear_text or not stored_hash:
+            raise HashingError('Provided hashes cannot be empty')
+
+        stored_hash = stored_hash.encode('utf-8') if isinstance(stored_hash, str) else stored_hash
+
+        return self._run(_checkWorker, clear_text.encode('utf-8'), stored_hash)
+
+    def shutdown(self) -> None:
+        self._resetExecutor()
+
+    def getStats(self) -> dict:
+        """
+        Returns the pool state for monitoring
+
+        Returns:
+            dict -- The cost, workers and queue limits, the requests in flight, completed, rejected and timed out and the average time per request in milliseconds
+        """
+        with self._lock:
+            return {
+                'cost': self.cost,
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'in_flight': self._in_flight,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'timed_out': self._timed_out,
+                'average_ms': round(self._busy_seconds / self._completed * 1000, 2) if self._completed else None
+            }
+
+    @staticmethod
+    def measureCost(cost: int, *, rounds: int = 3) -> float:
+        """
+        Measures the seconds a hash takes at the given cost on this machine, the best of a few rounds
+
+        Arguments:
+            cost {int} -- The bcrypt cost factor
+
+        Keyword arguments:
+            rounds {int} -- The amount of hashes measured. Default is 3
+
+        Returns:
+            float -- The seconds of the fastest hash
+        """
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            bcrypt.hashpw(b'calibration password', bcrypt.gensalt(cost))
+            timings.append(time.perf_counter() - start)
+
+        return min(timings)
+
+    @staticmethod
+    def calibrateCost(target_seconds: float, *, min_cost: int = 10, max_cost: int = 16) -> int:
+        """
+        Finds the highest cost whose hash takes at most the target time on this machine. Every extra cost unit
+        doubles the work, so a single measurement at min_cost is enough to estimate the rest
+
+        Arguments:
+            target_seconds {float} -- The desired time per hash
+
+        Keyword arguments:
+            min_cost {int} -- The lowest cost accepted, even if it is slower than the target. Default is 10
+            max_cost {int} -- The highest cost accepted. Default is 16
+
+        Returns:
+            int -- The calibrated cost factor
+        """
+        seconds = PasswordHasher.measureCost(min_cost)
+        cost = min_cost
+
+        while cost < max_cost and seconds * 2 <= target_seconds:
+            seconds *= 2
+            cost += 1
+
+        return cost
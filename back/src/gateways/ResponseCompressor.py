@@ -0,0 +1,151 @@
+from flask import Flask, Response, request
+from werkzeug.wsgi import ClosingIterator
+from typing import Iterable, Iterator
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# The responses worth compressing, the exports in columnar formats are left as they are
+COMPRESSIBLE_TYPES = {'application/json', 'application/x-ndjson', 'text/csv', 'text/plain', 'text/html', 'application/javascript'}
+
+class _GzipEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+class _BrotliEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+class _ZstdEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+class ResponseCompressor:
+    # Encoding, encoder and default level, in order of preference when the client accepts several equally. The
+    # levels favour the CPU time per request, gzip 3 saves almost as many bytes as 6 in a third of the time
+    ENCODINGS = {
+        'zstd': (_ZstdEncoder, 3),
+        'br': (_BrotliEncoder, 4),
+        'gzip': (_GzipEncoder, 3)
+    }
+
+    def __init__(self, *, min_size: int = 1024, levels: dict[str,int] = None) -> None:
+        """
+        Compresses the responses with the best encoding accepted by the client. Brotli and zstd are offered only
+        when their packages are installed, gzip always is. Streamed responses are compressed chunk by chunk and
+        every chunk is flushed, so the client still receives them as they are produced
+
+        Keyword arguments:
+            min_size {int} -- The bytes below which a complete response is sent as it is. Default is 1024
+            levels {dict[str,int]} -- The compression level per encoding. Default is zstd 3, br 4 and gzip 3
+        """
+        self.min_size = min_size
+        self.levels = {name: level for name, (_, level) in self.ENCODINGS.items()}
+        self.levels.update(levels or {})
+
+    def isAvailable(self, encoding: str) -> bool:
+        if encoding == 'zstd':
+            return zstandard is not None
+        elif encoding == 'br':
+            return brotli is not None
+
+        return encoding in self.ENCODINGS
+
+    def encoder(self, encoding: str) -> any:
+        encoder, _ = self.ENCODINGS[encoding]
+        return encoder(self.levels[encoding])
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        encoder = self.encoder(encoding)
+        return encoder.compress(data) + encoder.finish()
+
+    def _negotiate(self) -> str:
+        offered = [encoding for encoding in self.ENCODINGS if self.isAvailable(encoding)]
+        return request.accept_encodings.best_match(offered)
+
+    def _stream(self, chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+        encoder = self.encoder(encoding)
+
+        for chunk in chunks:
+            data = encoder.compress(chunk.encode('utf-8') if isinstance(chunk, str) else chunk) + encoder.flush()
+            if data:
+                yield data
+
+        yield encoder.finish()
+
+    def compressResponse(self, response: Response) -> Response:
+        if (
+            response.status_code < 200
+            or response.status_code in (204, 304)
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or 'Content-Range' in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES
+        ):
+            return response
+
+        # The representation depends on the request header, for any cache in between
+        response.vary.add('Accept-Encoding')
+
+        encoding = self._negotiate()
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            # Closing the response closes the source too, so a streamed query returns its connection even if the
+            # client goes away before the first chunk
+            response.response = ClosingIterator(self._stream(response.response, encoding), getattr(response.response, 'close', None))
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+
+            response.set_data(self.compress(data, encoding))
+
+        response.headers['Content-Encoding'] = encoding
+
+        # The compressed bytes differ from the identity ones, so a strong ETag becomes weak
+        etag, weak = response.get_etag()
+        if etag is not None and not weak:
+            response.set_etag(etag, weak=True)
+
+        return response
+
+    def init_app(self, app: Flask) -> None:
+        app.after_request(self.compressResponse)
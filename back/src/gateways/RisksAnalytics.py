@@ -0,0 +1,392 @@
+from src.entities.Classification import Classification
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from operator import itemgetter
+from typing import Callable, Union
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# The classifications are encoded as their position, so the codes keep the order of the levels
+LEVELS = [level.value for level in Classification]
+LEVEL_CODES = {level: code for code, level in enumerate(LEVELS)}
+
+class AnalyticsError(Exception):
+    pass
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """
+    The columns of the risk, provider and risk_user tables. Every table is sorted by id and the arrays are never
+    modified once published, a refresh publishes a new snapshot so the readers never need the lock
+    """
+    risk_ids: any
+    risk_providers: any
+    risk_probabilities: any
+    risk_impacts: any
+    provider_ids: any
+    provider_countries: any
+    link_ids: any
+    link_risks: any
+    link_users: any
+    risks_updated: Union[datetime,None] = None
+    providers_updated: Union[datetime,None] = None
+    version: Union[str,None] = None
+
+def _lookup(ids: any, values: any) -> tuple[any,any]:
+    """
+    Finds the values in the sorted ids, returning their positions and which of them were found
+    """
+    positions = np.searchsorted(ids, values)
+    found = np.zeros(len(values), bool)
+
+    inside = positions < len(ids)
+    found[inside] = ids[positions[inside]] == values[inside]
+
+    return positions, found
+
+def _column(rows: list[tuple], index: int, dtype: any, convert: Callable = None) -> any:
+    # One pass per column, unzipping the rows first costs more than all the passes together
+    values = map(itemgetter(index), rows)
+    return np.fromiter(values if convert is None else map(convert, values), dtype, len(rows))
+
+def _latest(current: Union[datetime,None], rows: list[tuple], index: int) -> Union[datetime,None]:
+    latest = max(map(itemgetter(index), rows), default=None)
+    return current if latest is None or (current is not None and current >= latest) else latest
+
+def _upsert(ids: any, columns: list, new_ids: any, new_columns: list) -> tuple[any,list]:
+    """
+    Replaces the rows of the known ids and adds the others, keeping the table sorted by id. The arrays given are
+    not modified
+    """
+    if len(new_ids) == 0:
+        return ids, columns
+
+    positions, found = _lookup(ids, new_ids)
+
+    if found.any():
+        columns = [column.copy() for column in columns]
+        for column, new_column in zip(columns, new_columns):
+            column[positions[found]] = new_column[found]
+
+    added = ~found
+    if added.any():
+        ids = np.concatenate([ids, new_ids[added]])
+        columns = [np.concatenate([column, new_column[added]]) for column, new_column in zip(columns, new_columns)]
+
+        order = np.argsort(ids, kind='stable')
+        ids = ids[order]
+        columns = [column[order] for column in columns]
+
+    return ids, columns
+
+class RisksAnalytics:
+    DIMENSIONS = ['provider', 'country', 'user', 'probability', 'impact']
+
+    def __init__(self, *, overlap: float = 60) -> None:
+        """
+        Columnar snapshot of the risks, their providers and their users held as NumPy arrays, to count the risks
+        grouped by any of the DIMENSIONS without building a single entity. The classifications are stored as small
+        ints and the countries as categorical codes. The snapshot is refreshed from the rows changed since the
+        previous refresh, and a table is read again completely only when its row count shows deleted rows
+
+        Keyword arguments:
+            overlap {float} -- The seconds the changes are read again before the last update seen, so the rows written by transactions committed late are not missed. Default is 60
+        """
+        self.overlap = timedelta(seconds=overlap)
+
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+        # Append only categories, the codes already published keep their meaning
+        self._countries = []
+        self._country_codes = {}
+
+        self.refreshes = 0
+        self.full_reads = 0
+        self.last_refresh_ms = 0.0
+
+    def isAvailable(self) -> bool:
+        return np is not None
+
+    @property
+    def version(self) -> Union[str,None]:
+        snapshot = self._snapshot
+        return snapshot.version if snapshot is not None else None
+
+    def _emptySnapshot(self) -> _Snapshot:
+        return _Snapshot(
+            risk_ids=np.empty(0, np.int64),
+            risk_providers=np.empty(0, np.int64),
+            risk_probabilities=np.empty(0, np.int8),
+            risk_impacts=np.empty(0, np.int8),
+            provider_ids=np.empty(0, np.int64),
+            provider_countries=np.empty(0, np.int32),
+            link_ids=np.empty(0, np.int64),
+            link_risks=np.empty(0, np.int64),
+            link_users=np.empty(0, np.int64)
+        )
+
+    def _countryCode(self, country: str) -> int:
+        code = self._country_codes.get(country)
+
+        if code is None:
+            code = len(self._countries)
+            self._countries.append(country)
+            self._country_codes[country] = code
+
+        return code
+
+    def _since(self, updated: Union[datetime,None]) -> Union[datetime,None]:
+        return updated - self.overlap if updated is not None else None
+
+    def _apply(self, snapshot: _Snapshot, changes: dict, tables: set[str], full: set[str] = frozenset()) -> _Snapshot:
+        """
+        Applies the rows of the given tables to the snapshot, the tables read completely replace the old ones
+        """
+        empty = self._emptySnapshot()
+        columns = {}
+
+        if 'risk' in tables:
+            rows = changes['risk']
+
+            base = empty if 'risk' in full else snapshot
+            risk_ids, (risk_providers, risk_probabilities, risk_impacts) = _upsert(
+                base.risk_ids,
+                [base.risk_providers, base.risk_probabilities, base.risk_impacts],
+                _column(rows, 0, np.int64),
+                [
+                    # The risks of deleted providers have no provider, 0 is never an id
+                    _column(rows, 1, np.int64, lambda provider_id: provider_id or 0),
+                    _column(rows, 2, np.int8, LEVEL_CODES.__getitem__),
+                    _column(rows, 3, np.int8, LEVEL_CODES.__getitem__)
+                ]
+            )
+
+            columns.update(
+                risk_ids=risk_ids,
+                risk_providers=risk_providers,
+                risk_probabilities=risk_probabilities,
+                risk_impacts=risk_impacts,
+                risks_updated=_latest(base.risks_updated, rows, 4)
+            )
+
+        if 'provider' in tables:
+            rows = changes['provider']
+
+            base = empty if 'provider' in full else snapshot
+            provider_ids, (provider_countries,) = _upsert(
+                base.provider_ids,
+                [base.provider_countries],
+                _column(rows, 0, np.int64),
+                [_column(rows, 1, np.int32, self._countryCode)]
+            )
+
+            columns.update(
+                provider_ids=provider_ids,
+                provider_countries=provider_countries,
+                providers_updated=_latest(base.providers_updated, rows, 2)
+            )
+
+        if 'risk_user' in tables:
+            rows = changes['risk_user']
+
+            base = empty if 'risk_user' in full else snapshot
+            link_ids, (link_risks, link_users) = _upsert(
+                base.link_ids,
+                [base.link_risks, base.link_users],
+                _column(rows, 0, np.int64),
+                [_column(rows, 1, np.int64), _column(rows, 2, np.int64)]
+            )
+
+            columns.update(link_ids=link_ids, link_risks=link_risks, link_users=link_users)
+
+        return replace(snapshot, **columns)
+
+    def refresh(self, load: Callable[..., Union[dict,str]], version: Union[str,None] = None) -> Union[bool,str]:
+        """
+        Brings the snapshot up to date. Nothing is read while the given version is the one of the snapshot, and
+        concurrent refreshes wait for the first one instead of reading the same rows again
+
+        Arguments:
+            load {Callable[..., Union[dict,str]]} -- The getRiskChanges method of a repository
+
+        Keyword arguments:
+            version {str} -- The current version of the risks. Default is None (always read the changes)
+
+        Returns:
+            Boolean -- True if the snapshot is up to date
+            String -- The error message of the repository
+
+        Raises:
+            AnalyticsError -- If numpy is not installed
+        """
+        if not self.isAvailable():
+            raise AnalyticsError('The risks analytics require numpy to be installed')
+
+        if version is not None and version == self.version:
+            return True
+
+        with self._lock:
+            snapshot = self._snapshot
+            if version is not None and snapshot is not None and version == snapshot.version:
+                return True
+
+            start = time.perf_counter()
+
+            if snapshot is None:
+                snapshot = self._emptySnapshot()
+                changes = load()
+            else:
+                changes = load(
+                    risks_since=self._since(snapshot.risks_updated),
+                    providers_since=self._since(snapshot.providers_updated),
+                    links_after=int(snapshot.link_ids[-1]) if len(snapshot.link_ids) else 0
+                )
+
+            if isinstance(changes, str):
+                return changes
+
+            snapshot = self._apply(snapshot, changes, {'risk', 'provider', 'risk_user'})
+
+            # Deleted rows are not in the changes, a table with more rows than the database is read again
+            stale = {
+                table for table, ids in [('risk', snapshot.risk_ids), ('provider', snapshot.provider_ids), ('risk_user', snapshot.link_ids)]
+                if len(ids) != changes['counts'][table]
+            }
+
+            if stale:
+                changes = load(
+                    risks_since=None if 'risk' in stale else snapshot.risks_updated,
+                    providers_since=None if 'provider' in stale else snapshot.providers_updated,
+                    links_after=0 if 'risk_user' in stale else int(snapshot.link_ids[-1]) if len(snapshot.link_ids) else 0
+                )
+                if isinstance(changes, str):
+                    return changes
+
+                snapshot = self._apply(snapshot, changes, stale, stale)
+                self.full_reads += len(stale)
+
+            self._snapshot = replace(snapshot, version=version)
+            self.refreshes += 1
+            self.last_refresh_ms = round((time.perf_counter() - start) * 1000, 3)
+
+        return True
+
+    def _groupCodes(self, snapshot: _Snapshot, dimension: str, rows: any, users: any) -> tuple[any,list]:
+        """
+        Returns the code of every row for the dimension and the label of every code, with the codes ordered as the
+        labels are
+        """
+        if dimension in ('probability', 'impact'):
+            column = snapshot.risk_probabilities if dimension == 'probability' else snapshot.risk_impacts
+            return column[rows].astype(np.int64), LEVELS
+
+        if dimension == 'user':
+            labels, codes = np.unique(users, return_inverse=True)
+            return codes.astype(np.int64), labels.tolist()
+
+        # Providers that are not in the snapshot anymore are grouped with the risks without provider, code 0
+        positions, exists = _lookup(snapshot.provider_ids, snapshot.risk_providers[rows])
+
+        if dimension == 'provider':
+            return np.where(exists, positions + 1, 0).astype(np.int64), [None, *snapshot.provider_ids.tolist()]
+
+        # The categories are ranked by name so the groups are ordered by country
+        countries = self._countries[:]
+        order = np.array(sorted(range(len(countries)), key=countries.__getitem__), np.int64)
+        ranks = np.empty(len(countries), np.int64)
+        ranks[order] = np.arange(len(countries))
+
+        codes = np.zeros(len(positions), np.int64)
+        codes[exists] = ranks[snapshot.provider_countries[positions[exists]]] + 1
+
+        return codes, [None, *[countries[code] for code in order.tolist()]]
+
+    def groupBy(self, dimensions: list[str]) -> dict:
+        """
+        Counts the risks of the snapshot grouped by the given dimensions. Grouping by user counts every distinct
+        risk and user pair, so the risks without users are left out and the ones with several users are counted
+        once per user
+
+        Arguments:
+            dimensions {list[str]} -- The DIMENSIONS to group by, in the order of the groups
+
+        Returns:
+            dict -- The counted 'total' and the 'groups', each with its value of every dimension and its 'count'
+
+        Raises:
+            AnalyticsError -- If numpy is not installed, a dimension is unknown or the snapshot was never refreshed
+        """
+        if not self.isAvailable():
+            raise AnalyticsError('The risks analytics require numpy to be installed')
+
+        unknown = [dimension for dimension in dimensions if dimension not in self.DIMENSIONS]
+        if unknown or len(set(dimensions)) != len(dimensions):
+            raise AnalyticsError(f'The dimensions must be distinct values in {", ".join(self.DIMENSIONS)}')
+
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise AnalyticsError('The risks analytics were never refreshed')
+
+        rows = slice(None)
+        users = None
+
+        if 'user' in dimensions:
+            # risk_user allows repeated links, every pair is counted once
+            pairs = np.unique((snapshot.link_risks << 32) | snapshot.link_users)
+            link_risks, users = pairs >> 32, pairs & 0xFFFFFFFF
+
+            positions, exists = _lookup(snapshot.risk_ids, link_risks)
+
+            rows = positions[exists]
+            users = users[exists]
+
+        total = len(snapshot.risk_ids[rows])
+        if not dimensions:
+            return {'total': total, 'groups': [{'count': total}] if total else []}
+
+        codes, labels = zip(*(self._groupCodes(snapshot, dimension, rows, users) for dimension in dimensions))
+        sizes = tuple(max(len(dimension_labels), 1) for dimension_labels in labels)
+
+        keys = np.ravel_multi_index(codes, sizes)
+
+        # Dense counting when the possible groups are few compared with the rows
+        size = int(np.prod(sizes, dtype=np.float64))
+        if size <= 4 * total + 1024:
+            counts = np.bincount(keys, minlength=size)
+            group_keys = np.flatnonzero(counts)
+            counts = counts[group_keys]
+        else:
+            group_keys, counts = np.unique(keys, return_counts=True)
+
+        group_codes = np.unravel_index(group_keys, sizes)
+        columns = [
+            [dimension_labels[code] for code in dimension_codes.tolist()]
+            for dimension_labels, dimension_codes in zip(labels, group_codes)
+        ]
+
+        return {
+            'total': total,
+            'groups': [
+                {**dict(zip(dimensions, values)), 'count': count}
+                for *values, count in zip(*columns, counts.tolist())
+            ]
+        }
+
+    def getStats(self) -> dict:
+        snapshot = self._snapshot
+
+        return {
+            'risks': len(snapshot.risk_ids) if snapshot is not None else 0,
+            'providers': len(snapshot.provider_ids) if snapshot is not None else 0,
+            'links': len(snapshot.link_ids) if snapshot is not None else 0,
+            'countries': len(self._countries),
+            'refreshes': self.refreshes,
+            'full_reads': self.full_reads,
+            'last_refresh_ms': self.last_refresh_ms
+        }
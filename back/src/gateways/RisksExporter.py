@@ -0,0 +1,179 @@
+from src.entities.Risk import Risk
+from typing import Iterator, Iterable
+from datetime import datetime
+import csv
+import io
+import json
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+class ExportError(Exception):
+    pass
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write only file object that keeps the written bytes until they are drained, so the columnar writers can be
+    streamed instead of building the whole file in memory
+    """
+    def __init__(self) -> None:
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+class RisksExporter:
+    COLUMNS = ['id', 'provider_id', 'country', 'name', 'description', 'probability', 'impact', 'created_at', 'updated_at']
+    FORMATS = {
+        'csv': 'text/csv',
+        'ndjson': 'application/x-ndjson',
+        'arrow': 'application/vnd.apache.arrow.stream',
+        'parquet': 'application/vnd.apache.parquet'
+    }
+
+    def __init__(self, chunk_size: int = 1000) -> None:
+        self.chunk_size = chunk_size
+
+    def _chunks(self, risks: Iterable[Risk]) -> Iterator[list[Risk]]:
+        """
+        Groups the risks in lists of chunk_size elements, always closing the source iterator so a streamed
+        repository query returns its connection even if the export is interrupted
+        """
+        chunk = []
+
+        try:
+            for risk in risks:
+                chunk.append(risk)
+
+                if len(chunk) >= self.chunk_size:
+                    yield chunk
+                    chunk = []
+
+            if chunk:
+                yield chunk
+        finally:
+            close = getattr(risks, 'close', None)
+            if close is not None:
+                close()
+
+    def _serializeValue(self, value: any) -> any:
+        return value.isoformat() if isinstance(value, datetime) else value
+
+    def isAvailable(self, format: str) -> bool:
+        """
+        Checks if the given format can be exported, the columnar formats require pyarrow to be installed
+
+        Arguments:
+            format {str} -- The export format
+
+        Returns:
+            bool -- True if the format is known and its dependencies are installed
+        """
+        if format not in self.FORMATS:
+            return False
+
+        return format in ['csv', 'ndjson'] or pa is not None
+
+    def export(self, risks: Iterable[Risk], format: str) -> Iterator[bytes]:
+        """
+        Serializes the risks in the given format as a stream of byte chunks
+
+        Arguments:
+            risks {Iterable[Risk]} -- The risks to export, usually a repository stream
+            format {str} -- The export format, one of csv, ndjson, arrow or parquet
+
+        Returns:
+            Iterator[bytes] -- The serialized chunks
+
+        Raises:
+            ExportError -- If the format is not available
+        """
+        if not self.isAvailable(format):
+            raise ExportError(f'The export format {format} is not available')
+
+        if format == 'csv':
+            return self.toCSV(risks)
+        elif format == 'ndjson':
+            return self.toNDJSON(risks)
+        elif format == 'arrow':
+            return self.toArrow(risks)
+
+        return self.toParquet(risks)
+
+    def toCSV(self, risks: Iterable[Risk]) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        writer.writerow(self.COLUMNS)
+        yield buffer.getvalue().encode('utf-8')
+
+        for chunk in self._chunks(risks):
+            buffer.seek(0)
+            buffer.truncate()
+
+            writer.writerows([self._serializeValue(getattr(risk, column)) for column in self.COLUMNS] for risk in chunk)
+            yield buffer.getvalue().encode('utf-8')
+
+    def toNDJSON(self, risks: Iterable[Risk]) -> Iterator[bytes]:
+        for chunk in self._chunks(risks):
+            lines = [json.dumps({column: self._serializeValue(getattr(risk, column)) for column in self.COLUMNS}) for risk in chunk]
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+    def _schema(self) -> 'pa.Schema':
+        return pa.schema([
+            ('id', pa.int64()),
+            ('provider_id', pa.int64()),
+            ('country', pa.string()),
+            ('name', pa.string()),
+            ('description', pa.string()),
+            ('probability', pa.dictionary(pa.int8(), pa.string())),
+            ('impact', pa.dictionary(pa.int8(), pa.string())),
+            ('created_at', pa.timestamp('s')),
+            ('updated_at', pa.timestamp('s'))
+        ])
+
+    def _recordBatch(self, chunk: list[Risk], schema: 'pa.Schema') -> 'pa.RecordBatch':
+        columns = {column: [getattr(risk, column) for risk in chunk] for column in self.COLUMNS}
+        return pa.RecordBatch.from_pydict(columns, schema=schema)
+
+    def toArrow(self, risks: Iterable[Risk]) -> Iterator[bytes]:
+        schema = self._schema()
+        sink = _ChunkSink()
+
+        with pa.ipc.new_stream(sink, schema) as writer:
+            for chunk in self._chunks(risks):
+                writer.write_batch(self._recordBatch(chunk, schema))
+                yield sink.drain()
+
+        yield sink.drain()
+
+    def toParquet(self, risks: Iterable[Risk]) -> Iterator[bytes]:
+        schema = self._schema()
+        sink = _ChunkSink()
+
+        # Every chunk is written as its own row group, so only one chunk is held in memory at a time
+        with pq.ParquetWriter(sink, schema) as writer:
+            for chunk in self._chunks(risks):
+                writer.write_batch(self._recordBatch(chunk, schema))
+                yield sink.drain()
+
+        yield sink.drain()
@@ -0,0 +1,55 @@
+from typing import Callable, Hashable
+import threading
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    def __init__(self) -> None:
+        """
+        Coalesces concurrent calls with the same key: the first caller runs the function and every caller that
+        arrives while it is running waits for it and gets the same result, so an expensive lookup is only made once
+        """
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key: Hashable, function: Callable[[], any]) -> tuple[any, bool]:
+        """
+        Runs the function for the key, or waits for the call already running for it
+
+        Arguments:
+            key {Hashable} -- The key that identifies the call
+            function {Callable} -- The function to run, without arguments
+
+        Returns:
+            tuple[any, bool] -- The result of the function and True if it was shared from another caller
+
+        Raises:
+            Exception -- The exception raised by the function, re-raised on every waiting caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = function()
+            except Exception as e:
+                call.error = e
+            finally:
+                # The next call for the key starts a new flight, callers already waiting keep this one
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+
+        return call.result, not leader
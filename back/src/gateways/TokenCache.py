@@ -0,0 +1,97 @@
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Union
+import hashlib
+import threading
+
+class TokenCache:
+    def __init__(self, max_size: int = 10000) -> None:
+        """
+        Thread safe LRU of verified JWT payloads, keyed by the SHA-256 digest of the token so the tokens themselves
+        are not kept in memory. Every entry expires at the exp claim of its token and is never served after it
+
+        Keyword arguments:
+            max_size {int} -- The maximum amount of tokens kept, the least recently used are evicted. Default is 10000
+        """
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+        # Monitoring counters
+        self._hits = 0
+        self._misses = 0
+        self._verify_seconds = 0.0
+
+    def _key(self, token: str) -> bytes:
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def get(self, token: str) -> Union[dict, None]:
+        """
+        Returns the payload of a token verified before, if its exp has not been reached
+
+        Arguments:
+            token {str} -- The encoded token
+
+        Returns:
+            dict -- A copy of the verified payload
+            None -- If the token is not cached or already expired
+        """
+        key = self._key(token)
+        now = datetime.now(tz=timezone.utc).timestamp()
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+
+            return dict(entry[0])
+
+    def put(self, token: str, payload: dict, verify_seconds: float) -> None:
+        """
+        Stores the payload of a verified token until its exp. Tokens without a numeric exp are not cached
+
+        Arguments:
+            token {str} -- The encoded token
+            payload {dict} -- The verified payload
+            verify_seconds {float} -- The time the verification took, used to report the time saved by the cache
+        """
+        expires_at = payload.get('exp')
+        if not isinstance(expires_at, (int, float)):
+            return
+
+        key = self._key(token)
+
+        with self._lock:
+            self._verify_seconds += verify_seconds
+            self._entries[key] = (dict(payload), expires_at)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def getStats(self) -> dict:
+        """
+        Returns the cache counters for monitoring
+
+        Returns:
+            dict -- The size, hits, misses, hit ratio and the estimated verification time saved in milliseconds
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            average_verify = self._verify_seconds / self._misses if self._misses else 0.0
+
+            return {
+                'size': len(self._entries),
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': round(self._hits / lookups, 4) if lookups else 0.0,
+                'saved_ms': round(self._hits * average_verify * 1000, 2)
+            }
@@ -1,18 +1,26 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response
 from src.use_cases.AuthCases import loginUseCase, registerUseCase, refreshUseCase, verifyTokenUseCase, generateJWTPairUseCase
-from src.use_cases.ProvidersCases import getProvidersUseCase, getProviderByIdUseCase, createProviderUseCase, updateProviderUseCase, deleteProviderUseCase, getProviderByNameUseCase
-from src.use_cases.RisksCases import getFilteredRisksUseCase, createRiskUseCase, updateRiskUseCase, deleteRiskUseCase
-from src.use_cases.UsersCases import getUserByEmailUseCase, getUserRolesUseCase, addRoleToUserUseCase, removeRoleFromUserUseCase, addUserToRiskUseCase, removeUserFromRiskUseCase
-from src.use_cases.CountryCases import getCountryByCCA3UseCase
-from src.use_cases.RolesCases import getRoleByIdUseCase, createRoleUseCase, updateRoleUseCase, deleteRoleUseCase, getRolesUseCase
+from src.use_cases.ProvidersCases import getProvidersUseCase, getProvidersPageUseCase, countProvidersUseCase, getProviderByIdUseCase, createProviderUseCase, updateProviderUseCase, deleteProviderUseCase, getProviderByNameUseCase, createProvidersBulkUseCase, getProvidersVersionUseCase
+from src.use_cases.RisksCases import getFilteredRisksUseCase, countFilteredRisksUseCase, exportRisksUseCase, ingestRisksUseCase, createRiskUseCase, updateRiskUseCase, deleteRiskUseCase, getRisksVersionUseCase, getRisksAnalyticsUseCase
+from src.use_cases.UsersCases import getUserByEmailUseCase, getUserRolesUseCase, addRoleToUserUseCase, removeRoleFromUserUseCase, addUserToRiskUseCase, removeUserFromRiskUseCase, addUsersToRoleUseCase, removeUsersFromRoleUseCase, addUsersToRiskUseCase, removeUsersFromRiskUseCase
+from src.use_cases.CountryCases import getCountryByCCA3UseCase, getCountriesUseCase, getCountriesVersionUseCase, getCountryCodesUseCase, getCountryAPIStatsUseCase
+from src.use_cases.RolesCases import getRoleByIdUseCase, createRoleUseCase, updateRoleUseCase, deleteRoleUseCase, getRolesUseCase, getRolesPageUseCase, countRolesUseCase, getRolesVersionUseCase
 from src.static.http_codes import HttpCodes
+from src.gateways.PasswordHasher import BUSY_MESSAGE
+from src.gateways.CachingRepository import CachingRepository
+from src.gateways.JSONSerializer import JSONSerializer
 
 from src.entities.Country import Country
 from src.entities.User import User
 from src.entities.Provider import Provider
 from src.entities.Risk import Risk
 
-from functools import wraps
+from functools import wraps, lru_cache
+from typing import Union
+import csv
+import hashlib
+import io
+import json
 
 bp = Blueprint("main_v1", __name__, url_prefix="/v1.1")
 
@@ -26,7 +34,7 @@ def secure_route(f):
         token = auth_header.split('Bearer ')[1]
 
         try:
-            payload = verifyTokenUseCase(current_app.config["SECRETS"]["jwt"], token)
+            payload = verifyTokenUseCase(current_app.config["SECRETS"]["jwt"], token, cache=current_app.config.get("TOKEN_CACHE"))
         except Exception as e:
             return jsonify({"error": str(e)}), HttpCodes.UNAUTHORIZED.value
 
@@ -37,42 +45,31 @@ def secure_route(f):
 
     return decorated_function
 
-def _extractFilters(filter_string: str) -> dict:
-    if not filter_string:
-        return {}
-    else:
-        filters = {}
+@lru_cache(maxsize=1024)
+def _parseFilters(filter_string: str, country_codes: frozenset[str]) -> tuple:
+    """
+    Parses a filter string into its (filter, value) pairs. It does not touch the repository nor the network, so
+    the result is cached per distinct filter string and set of country codes.
+
+    Parameters:
+        filter_string (str): The comma separated filters.
+        country_codes (frozenset[str]): The valid upper case country codes.
+
+    Returns:
+        tuple: Returns the parsed pairs, provider names and user emails are kept to be resolved on every request.
+    """
+    filters = {}
 
     for filter in filter_string.split(","):
-        # Check for a valid provider_id
+        # Check for a valid provider_id, names are resolved later
         if filter.startswith("provider"):
             data = filter.split(":")[1]
+            filters["provider_id"] = int(data) if data.isdigit() else data
 
-            if not data.isdigit():
-                query = getProviderByNameUseCase(current_app.config["REPOSITORY"], data)
-                if isinstance(query, str):
-                    return jsonify({"error": query}), HttpCodes.INTERNAL_SERVER_ERROR.value
-                elif isinstance(query, list[Provider]):
-                    data = query[0].id
-                else:
-                    return jsonify({"error": "The given provider does not exist"}), HttpCodes.NOT_FOUND.value
-
-            filters["provider_id"] = int(data)
-
-        # Check for a valid user_id
+        # Check for a valid user_id, emails are resolved later
         elif filter.startswith("user"):
             data = filter.split(":")[1]
-
-            if not data.isdigit():
-                query = getUserByEmailUseCase(current_app.config["REPOSITORY"], data)
-                if isinstance(query, str):
-                    return jsonify({"error": query}), HttpCodes.INTERNAL_SERVER_ERROR.value
-                elif isinstance(query, list[User]):
-                    data = query[0].id
-                else:
-                    return jsonify({"error": "The given user does not exist"}), HttpCodes.NOT_FOUND.value
-
-            filters["user_id"] = int(data)
+            filters["user_id"] = int(data) if data.isdigit() else data
 
         # Check for a valid probability
         elif filter.startswith("probability"):
@@ -83,19 +80,216 @@ def _extractFilters(filter_string: str) -> dict:
             filters["impact"] = filter.split(":")[1]
         
         # Check for a valid country CCA3 or string
-        elif len(filter) == 3:
-            query = getCountryByCCA3UseCase(current_app.config["COUNTRY_API"], filter)
-            if isinstance(query, Country):
-                filters["country"] = query.cca3
-            else:
-                filters["string"] = filter
+        elif len(filter) == 3 and filter.upper() in country_codes:
+            filters["country"] = filter.upper()
 
         # Add all the other filters to the string filter
         else:
             filters["string"] = filter
 
+    return tuple(filters.items())
+
+def _extractFilters(filter_string: str) -> dict:
+    if not filter_string:
+        return {}
+
+    filters = dict(_parseFilters(filter_string, getCountryCodesUseCase(current_app.config["COUNTRY_API"])))
+
+    # Resolve the provider name, providers can be renamed so it is not cached
+    if isinstance(filters.get("provider_id"), str):
+        query = getProviderByNameUseCase(current_app.config["REPOSITORY"], filters["provider_id"])
+        if isinstance(query, str):
+            return jsonify({"error": query}), HttpCodes.INTERNAL_SERVER_ERROR.value
+        elif isinstance(query, Provider):
+            filters["provider_id"] = query.id
+        else:
+            return jsonify({"error": "The given provider does not exist"}), HttpCodes.NOT_FOUND.value
+
+    # Resolve the user email
+    if isinstance(filters.get("user_id"), str):
+        query = getUserByEmailUseCase(current_app.config["REPOSITORY"], filters["user_id"])
+        if isinstance(query, str):
+            return jsonify({"error": query}), HttpCodes.INTERNAL_SERVER_ERROR.value
+        elif isinstance(query, User):
+            filters["user_id"] = query.id
+        else:
+            return jsonify({"error": "The given user does not exist"}), HttpCodes.NOT_FOUND.value
+
     return filters
 
+PAGINATION_ARGS = ["limit", "after", "count"]
+EXPORT_ARGS = ["format"]
+
+# Writes the entities of the responses without building their dicts first
+SERIALIZER = JSONSerializer()
+
+def _getFilterQuery(reserved_args: list[str]) -> Union[str, None]:
+    """
+    Gets the filter string of the current request, the first query parameter that is not a reserved one.
+
+    Parameters:
+        reserved_args (list[str]): The query parameters used by the endpoint itself.
+
+    Returns:
+        Union[str, None]: Returns the filter string or None if there is none.
+    """
+    filter_keys = [key for key in request.args.to_dict().keys() if key not in reserved_args]
+    return filter_keys[0] if len(filter_keys) > 0 else None
+
+def _extractPagination() -> Union[dict, str]:
+    """
+    Reads the keyset pagination query parameters of the current request.
+
+    Returns:
+        Union[dict, str]: Returns a error message or a dict with the limit, after and count values, limit is None if
+        the request is not paginated.
+    """
+    limit = request.args.get("limit")
+    after = request.args.get("after")
+
+    if limit is None and after is None:
+        return {"limit": None, "after": None, "count": "count" in request.args}
+
+    # A limit of 0 would return empty pages without a cursor
+    if (limit is not None and (not limit.isdigit() or int(limit) < 1)) or (after is not None and not after.isdigit()):
+        return "Pagination parameters must be positive integers"
+
+    config = current_app.config["PAGINATION"]
+    limit = min(int(limit), config["max_limit"]) if limit is not None else config["default_limit"]
+
+    return {"limit": limit, "after": int(after) if after is not None else 0, "count": "count" in request.args}
+
+def _entitiesResponse(payload) -> Response:
+    # Replaces jsonify for the payloads holding entities, with the same output
+    return Response(SERIALIZER.dumps(payload), mimetype="application/json")
+
+def _pagedResponse(items: list, page: dict, total: Union[int, None] = None, etag: Union[str, None] = None):
+    """
+    Builds the list response, wrapping paginated pages with the cursor of the next page.
+
+    Parameters:
+        items (list): The entities of the page.
+        page (dict): The pagination values from _extractPagination.
+        total (Union[int, None]): The total amount of entities for the X-Total-Count header.
+        etag (Union[str, None]): The strong ETag of the list, None if it cannot be validated.
+
+    Returns:
+        The response and its status code.
+    """
+    if page["limit"] is None:
+        response = _entitiesResponse(items)
+    else:
+        next_cursor = items[-1].id if len(items) == page["limit"] else None
+        response = _entitiesResponse({"data": items, "next": next_cursor})
+
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+
+    return _taggedResponse(response, etag)
+
+def _linkErrorStatus(error: str) -> int:
+    # An unknown role, risk or user in a batch link is a wrong id of the request, not a server error
+    if error in ("Role not found", "Risk not found") or error.startswith("Users not found"):
+        return HttpCodes.NOT_FOUND.value
+
+    return HttpCodes.INTERNAL_SERVER_ERROR.value
+
+def _busyResponse():
+    # The password hasher or the connection pool shed the request, the client should retry shortly
+    response = jsonify({"error": BUSY_MESSAGE})
+    response.headers["Retry-After"] = "1"
+    return response, HttpCodes.SERVICE_UNAVAILABLE.value
+
+def _readBulkRows() -> Union[list, str]:
+    """
+    Reads the rows of a bulk upload, a JSON array or a CSV with a header row, sent as the body or as the file field
+    of a form.
+
+    Returns:
+        Union[list, str]: Returns the rows or an error message if the upload is invalid or too big.
+    """
+    if request.is_json:
+        rows = request.get_json(silent=True)
+    else:
+        upload = request.files.get("file")
+        if upload is not None:
+            content = upload.read().decode("utf-8-sig")
+        elif request.mimetype == "text/csv":
+            content = request.get_data(as_text=True)
+        else:
+            return "The upload must be a JSON array or a CSV file"
+
+        rows = list(csv.DictReader(io.StringIO(content)))
+
+    if not isinstance(rows, list) or len(rows) < 1:
+        return "The upload must have at least one row"
+
+    if len(rows) > current_app.config["BULK"]["max_rows"]:
+        return f"The upload can have at most {current_app.config['BULK']['max_rows']} rows"
+
+    return rows
+
+def _readNDJSON():
+    """
+    Reads the request body line by line as NDJSON, without loading it whole. Blank lines are skipped and the lines
+    that are not valid JSON are yielded as None.
+
+    Returns:
+        Iterator: The parsed rows.
+    """
+    for line in iter(request.stream.readline, b""):
+        if not line.strip():
+            continue
+
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+def _notModified(etag: Union[str, None]):
+    """
+    Checks the If-None-Match header of the current request against the given ETag, with the weak comparison
+    If-None-Match requires, so the copies of compressed responses, tagged as weak, are validated too.
+
+    Parameters:
+        etag (Union[str, None]): The current ETag of the resource, None if it cannot be validated.
+
+    Returns:
+        The 304 response and its status code if the client copy is fresh, None otherwise.
+    """
+    if etag is None or not request.if_none_match.contains_weak(etag):
+        return None
+
+    response = Response(status=HttpCodes.NOT_MODIFIED.value)
+    response.set_etag(etag)
+
+    return response, HttpCodes.NOT_MODIFIED.value
+
+def _taggedResponse(response, etag: Union[str, None], status: int = HttpCodes.OK.value):
+    if etag is not None:
+        response.set_etag(etag)
+
+    return response, status
+
+def _resourceETag(version: Union[str, None], *variant) -> Union[str, None]:
+    """
+    Builds the strong ETag of a representation from the version of its data and the values that select it,
+    such as the id, the filters or the page, without loading any entity.
+
+    Parameters:
+        version (Union[str, None]): The version of the data, None if it cannot be computed.
+        variant: The values that select the representation.
+
+    Returns:
+        The ETag, or None if the version is unknown.
+    """
+    if version is None:
+        return None
+
+    content = json.dumps([version, *variant], sort_keys=True, default=str)
+
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
+
 
 @bp.route("/login", methods=["GET"])
 def login():
@@ -106,14 +300,29 @@ def login():
     if not "email" in data or not "password" in data:
         return jsonify({"error": "Invalid request"}), HttpCodes.BAD_REQUEST.value
 
+    # Reject the excess attempts before touching the database or bcrypt
+    throttle = current_app.config.get("LOGIN_THROTTLE")
+    if throttle is not None:
+        allowed = throttle.allowAttempt(data["email"], request.remote_addr)
+        if isinstance(allowed, str):
+            response = jsonify({"error": allowed})
+            response.headers["Retry-After"] = str(int(throttle.window_seconds))
+            return response, HttpCodes.TOO_MANY_REQUESTS.value
+
     login_result = loginUseCase(
         current_app.config["REPOSITORY"], data["email"], data["password"]
     )
+    if login_result == BUSY_MESSAGE:
+        return _busyResponse()
     if isinstance(login_result, str):
         return jsonify({"error": login_result}), HttpCodes.UNAUTHORIZED.value
 
+    # The verified user already has its roles, no further lookup is needed for the claims. The refresh token
+    # only keeps the email, the refreshes copy it and would carry revoked roles until it expires
     jwt_pair = generateJWTPairUseCase(
-        current_app.config["SECRETS"], {"email": data["email"]}
+        current_app.config["SECRETS"],
+        {"email": login_result.email, "roles": login_result.roles or []},
+        refresh_claims=["email"]
     )
     if isinstance(jwt_pair, str):
         return jsonify({"error": jwt_pair}), HttpCodes.INTERNAL_SERVER_ERROR.value
@@ -133,6 +342,8 @@ def register():
     register_result = registerUseCase(
         current_app.config["REPOSITORY"], data["email"], data["password"], data["name"]
     )
+    if register_result == BUSY_MESSAGE:
+        return _busyResponse()
     if isinstance(register_result, str):
         return jsonify({"error": register_result}), HttpCodes.CONFLICT.value
 
@@ -156,14 +367,27 @@ def refresh():
 @secure_route
 def roles(email):
     if request.method == "GET":
-        roles = getRolesUseCase(current_app.config["REPOSITORY"])
+        page = _extractPagination()
+        if isinstance(page, str):
+            return jsonify({"error": page}), HttpCodes.BAD_REQUEST.value
+
+        etag = _resourceETag(getRolesVersionUseCase(current_app.config["REPOSITORY"]), page)
+        not_modified = _notModified(etag)
+        if not_modified is not None:
+            return not_modified
+
+        if page["limit"] is None:
+            roles = getRolesUseCase(current_app.config["REPOSITORY"])
+        else:
+            roles = getRolesPageUseCase(current_app.config["REPOSITORY"], page["after"], page["limit"])
         if isinstance(roles, str):
             return jsonify({"error": roles}), HttpCodes.INTERNAL_SERVER_ERROR.value
 
-        return (
-            jsonify([role.asDict() for role in roles]),
-            HttpCodes.OK.value,
-        )
+        total = countRolesUseCase(current_app.config["REPOSITORY"]) if page["count"] else None
+        if isinstance(total, str):
+            return jsonify({"error": total}), HttpCodes.INTERNAL_SERVER_ERROR.value
+
+        return _pagedResponse(roles, page, total, etag)
     
     if request.method == "POST":
         data = request.get_json()
@@ -186,11 +410,16 @@ def roles(email):
 @secure_route
 def query_role(email, role_id):
     if request.method == "GET":
+        etag = _resourceETag(getRolesVersionUseCase(current_app.config["REPOSITORY"]), role_id)
+        not_modified = _notModified(etag)
+        if not_modified is not None:
+            return not_modified
+
         role = getRoleByIdUseCase(current_app.config["REPOSITORY"], role_id)
         if isinstance(role, str):
             return jsonify({"error": role}), HttpCodes.INTERNAL_SERVER_ERROR.value
 
-        return jsonify(role.asDict()), HttpCodes.OK.value
+        return _taggedResponse(_entitiesResponse(role), etag)
     
     if request.method == "PUT":
         data = request.get_json()
@@ -221,14 +450,27 @@ def query_role(email, role_id):
 @secure_route
 def providers(email):
     if request.method == "GET":
-        providers = getProvidersUseCase(current_app.config["REPOSITORY"])
+        page = _extractPagination()
+        if isinstance(page, str):
+            return jsonify({"error": page}), HttpCodes.BAD_REQUEST.value
+
+        etag = _resourceETag(getProvidersVersionUseCase(current_app.config["REPOSITORY"]), page)
+        not_modified = _notModified(etag)
+        if not_modified is not None:
+            return not_modified
+
+        if page["limit"] is None:
+            providers = getProvidersUseCase(current_app.config["REPOSITORY"])
+        else:
+            providers = getProvidersPageUseCase(current_app.config["REPOSITORY"], page["after"], page["limit"])
         if isinstance(providers, str):
             return jsonify({"error": providers}), HttpCodes.INTERNAL_SERVER_ERROR.value
 
-        return (
-            jsonify([provider.asDict() for provider in providers]),
-            HttpCodes.OK.value,
-        )
+        total = countProvidersUseCase(current_app.config["REPOSITORY"]) if page["count"] else None
+        if isinstance(total, str):
+            return jsonify({"error": total}), HttpCodes.INTERNAL_SERVER_ERROR.value
+
+        return _pagedResponse(providers, page, total, etag)
 
     if request.method == "POST":
         data = request.get_json()
@@ -250,15 +492,41 @@ def providers(email):
         
         return jsonify({"message": "Provider created", "id": operation}), HttpCodes.CREATED.value
 
+@bp.route("/providers/bulk", methods=["POST"])
+@secure_route
+def providers_bulk(email):
+    rows = _readBulkRows()
+    if isinstance(rows, str):
+        return jsonify({"error": rows}), HttpCodes.BAD_REQUEST.value
+
+    report = createProvidersBulkUseCase(
+        current_app.config["REPOSITORY"],
+        current_app.config["COUNTRY_API"],
+        rows,
+        chunk_size=current_app.config["BULK"]["chunk_size"]
+    )
+    if isinstance(report, str):
+        return jsonify({"error": report}), HttpCodes.INTERNAL_SERVER_ERROR.value
+
+    if report["created"] == 0:
+        return jsonify(report), HttpCodes.BAD_REQUEST.value
+
+    return jsonify(report), HttpCodes.CREATED.value
+
 @bp.route("/providers/<int:provider_id>", methods=["GET", "PUT", "DELETE"])
 @secure_route
 def query_provider(email, provider_id):
     if request.method == "GET":
+        etag = _resourceETag(getProvidersVersionUseCase(current_app.config["REPOSITORY"]), provider_id)
+        not_modified = _notModified(etag)
+        if not_modified is not None:
+            return not_modified
+
         provider = getProviderByIdUseCase(current_app.config["REPOSITORY"], provider_id)
         if not isinstance(provider, Provider):
             return jsonify({"error": provider}), HttpCodes.INTERNAL_SERVER_ERROR.value
 
-        return jsonify(provider.asDict()), HttpCodes.OK.value
+        return _taggedResponse(_entitiesResponse(provider), etag)
 
     if request.method == "PUT":
         data = request.get_json()
@@ -291,19 +559,28 @@ def query_provider(email, provider_id):
 @secure_route
 def risks(email):
     if request.method == "GET":
+        page = _extractPagination()
+        if isinstance(page, str):
+            return jsonify({"error": page}), HttpCodes.BAD_REQUEST.value
+
         # Get the query parameters filter, divide it by comma and construct the filters dictionary
-        filter_query = list(request.args.to_dict().keys())[0] if len(request.args.to_dict()) > 0 else None
-        
-        filters = _extractFilters(filter_query)
+        filters = _extractFilters(_getFilterQuery(PAGINATION_ARGS))
 
-        risks = getFilteredRisksUseCase(current_app.config["REPOSITORY"], filters)
+        # The filters are compared once resolved, so renaming a filtered provider or user changes the ETag
+        etag = _resourceETag(getRisksVersionUseCase(current_app.config["REPOSITORY"]), filters, page)
+        not_modified = _notModified(etag)
+        if not_modified is not None:
+            return not_modified
+
+        risks = getFilteredRisksUseCase(current_app.config["REPOSITORY"], filters, after=page["after"], limit=page["limit"])
         if not isinstance(risks, list):
             return jsonify({"error": risks}), HttpCodes.INTERNAL_SERVER_ERROR.value
+
+        total = countFilteredRisksUseCase(current_app.config["REPOSITORY"], filters) if page["count"] else None
+        if isinstance(total, str):
+            return jsonify({"error": total}), HttpCodes.INTERNAL_SERVER_ERROR.value
         
-        return (
-            jsonify([risk.asDict() for risk in risks]),
-            HttpCodes.OK.value,
-        )
+        return _pagedResponse(risks, page, total, etag)
     
     if request.method == "POST":
         data = request.get_json()
@@ -334,19 +611,90 @@ def risks(email):
         return jsonify({"message": "Risk created"}), HttpCodes.CREATED.value
 
 
+@bp.route("/risks/bulk", methods=["POST"])
+@secure_route
+def risks_bulk(email):
+    if request.mimetype != "application/x-ndjson":
+        return jsonify({"error": "The upload must be NDJSON, one risk per line"}), HttpCodes.BAD_REQUEST.value
+
+    report = ingestRisksUseCase(
+        current_app.config["REPOSITORY"],
+        _readNDJSON(),
+        email,
+        chunk_size=current_app.config["BULK"]["chunk_size"]
+    )
+    if isinstance(report, str):
+        return jsonify({"error": report}), HttpCodes.INTERNAL_SERVER_ERROR.value
+
+    if report["created"] == 0:
+        return jsonify(report), HttpCodes.BAD_REQUEST.value
+
+    return jsonify(report), HttpCodes.CREATED.value
+
+@bp.route("/risks/export", methods=["GET"])
+@secure_route
+def export_risks(email):
+    exporter = current_app.config["RISKS_EXPORTER"]
+
+    export_format = request.args.get("format", "csv")
+    if not exporter.isAvailable(export_format):
+        return jsonify({"error": f"Format must be in {', '.join(format for format in exporter.FORMATS if exporter.isAvailable(format))}"}), HttpCodes.BAD_REQUEST.value
+
+    filters = _extractFilters(_getFilterQuery(EXPORT_ARGS))
+
+    risks = exportRisksUseCase(current_app.config["REPOSITORY"], filters)
+    if risks == BUSY_MESSAGE:
+        # Every pooled connection is held by other streams
+        return _busyResponse()
+    if isinstance(risks, str):
+        return jsonify({"error": risks}), HttpCodes.INTERNAL_SERVER_ERROR.value
+
+    # The rows are pulled from the database while the response is written, one chunk at a time
+    return Response(
+        exporter.export(risks, export_format),
+        mimetype=exporter.FORMATS[export_format],
+        headers={"Content-Disposition": f"attachment; filename=risks.{export_format}"},
+        status=HttpCodes.OK.value,
+    )
+
+@bp.route("/analytics/risks", methods=["GET"])
+@secure_route
+def risks_analytics(email):
+    analytics = current_app.config.get("RISKS_ANALYTICS")
+    if analytics is None or not analytics.isAvailable():
+        return jsonify({"error": "The risks analytics require numpy to be installed"}), HttpCodes.NOT_IMPLEMENTED.value
+
+    group_by = [dimension.strip() for dimension in request.args.get("group_by", "probability,impact").split(",") if dimension.strip()]
+    if any(dimension not in analytics.DIMENSIONS for dimension in group_by) or len(set(group_by)) != len(group_by):
+        return jsonify({"error": f"group_by must be distinct values in {', '.join(analytics.DIMENSIONS)}"}), HttpCodes.BAD_REQUEST.value
+
+    version = getRisksVersionUseCase(current_app.config["REPOSITORY"])
+
+    etag = _resourceETag(version, "analytics", group_by)
+    not_modified = _notModified(etag)
+    if not_modified is not None:
+        return not_modified
+
+    result = getRisksAnalyticsUseCase(current_app.config["REPOSITORY"], analytics, group_by, version=version)
+    if isinstance(result, str):
+        return jsonify({"error": result}), HttpCodes.INTERNAL_SERVER_ERROR.value
+
+    return _taggedResponse(jsonify({"group_by": group_by, **result}), etag)
+
 @bp.route("/risks/<int:risk_id>", methods=["GET", "PUT", "DELETE"])
 @secure_route
 def query_risk(email, risk_id):
     if request.method == "GET":
+        etag = _resourceETag(getRisksVersionUseCase(current_app.config["REPOSITORY"]), risk_id)
+        not_modified = _notModified(etag)
+        if not_modified is not None:
+            return not_modified
 
         risks = getFilteredRisksUseCase(current_app.config["REPOSITORY"], {"id": risk_id})
         if not isinstance(risks, Risk):
             return jsonify({"error": "The given risk does not exist"}), HttpCodes.NOT_FOUND.value
         
-        return (
-            jsonify(risks.asDict()),
-            HttpCodes.OK.value,
-        )
+        return _taggedResponse(_entitiesResponse(risks), etag)
 
     if request.method == "PUT":
         data = request.get_json()
@@ -382,7 +730,7 @@ def users(email):
             return jsonify({"error": user}), HttpCodes.INTERNAL_SERVER_ERROR.value
 
         return (
-            jsonify(user.asDict()),
+            _entitiesResponse(user),
             HttpCodes.OK.value,
         )
     
@@ -395,7 +743,7 @@ def user_roles(email, user_id):
             return jsonify({"error": user}), HttpCodes.INTERNAL_SERVER_ERROR.value
         
         return (
-            jsonify(user.asDict()),
+            _entitiesResponse(user),
             HttpCodes.OK.value,
         )
     
@@ -430,13 +778,52 @@ def user_role(email, user_id, role_id):
     
     return jsonify({"message": "Role removed"}), HttpCodes.OK.value
     
-@bp.route("/risks/<int:risk_id>/users", methods=["POST"])
+@bp.route("/roles/<int:role_id>/users", methods=["POST", "DELETE"])
+@secure_route
+def role_users(email, role_id):
+    data = request.get_json(silent=True)
+    if not data or not "user_ids" in data:
+        return jsonify({"error": "Invalid request"}), HttpCodes.BAD_REQUEST.value
+
+    if request.method == "POST":
+        operation = addUsersToRoleUseCase(current_app.config["REPOSITORY"], role_id, data["user_ids"])
+        if isinstance(operation, str):
+            return jsonify({"error": operation}), _linkErrorStatus(operation)
+
+        return jsonify({"message": "Role added", "linked": operation}), HttpCodes.CREATED.value
+
+    if request.method == "DELETE":
+        operation = removeUsersFromRoleUseCase(current_app.config["REPOSITORY"], role_id, data["user_ids"])
+        if isinstance(operation, str):
+            return jsonify({"error": operation}), _linkErrorStatus(operation)
+
+        return jsonify({"message": "Role removed", "unlinked": operation}), HttpCodes.OK.value
+
+@bp.route("/risks/<int:risk_id>/users", methods=["POST", "DELETE"])
 @secure_route
 def user_risks(email, risk_id):
-    data = request.get_json()
+    data = request.get_json(silent=True)
     if not data:
         return jsonify({"error": "Invalid request"}), HttpCodes.BAD_REQUEST.value
 
+    if request.method == "DELETE":
+        if not "user_ids" in data:
+            return jsonify({"error": "Invalid request"}), HttpCodes.BAD_REQUEST.value
+
+        operation = removeUsersFromRiskUseCase(current_app.config["REPOSITORY"], risk_id, data["user_ids"])
+        if isinstance(operation, str):
+            return jsonify({"error": operation}), _linkErrorStatus(operation)
+
+        return jsonify({"message": "Risk removed", "unlinked": operation}), HttpCodes.OK.value
+
+    # Link many users at once
+    if "user_ids" in data:
+        operation = addUsersToRiskUseCase(current_app.config["REPOSITORY"], risk_id, data["user_ids"])
+        if isinstance(operation, str):
+            return jsonify({"error": operation}), _linkErrorStatus(operation)
+
+        return jsonify({"message": "Risk added", "linked": operation}), HttpCodes.CREATED.value
+
     if not "user_id" in data:
         return jsonify({"error": "Invalid request"}), HttpCodes.BAD_REQUEST.value
 
@@ -462,3 +849,57 @@ def user_risk(email, risk_id, user_id):
         return jsonify({"error": operation}), HttpCodes.INTERNAL_SERVER_ERROR.value
     
     return jsonify({"message": "Risk removed"}), HttpCodes.OK.value
+
+@bp.route("/countries", methods=["GET"])
+@secure_route
+def countries(email):
+    etag = getCountriesVersionUseCase(current_app.config["COUNTRY_API"])
+
+    not_modified = _notModified(etag)
+    if not_modified is not None:
+        return not_modified
+
+    countries = getCountriesUseCase(current_app.config["COUNTRY_API"], request.args.to_dict())
+    if isinstance(countries, str):
+        return jsonify({"error": countries}), HttpCodes.BAD_REQUEST.value
+
+    return _taggedResponse(jsonify([country.asDict() for country in countries]), etag)
+
+@bp.route("/countries/<string:cca3>", methods=["GET"])
+@secure_route
+def query_country(email, cca3):
+    etag = getCountriesVersionUseCase(current_app.config["COUNTRY_API"])
+
+    not_modified = _notModified(etag)
+    if not_modified is not None:
+        return not_modified
+
+    country = getCountryByCCA3UseCase(current_app.config["COUNTRY_API"], cca3)
+    if not isinstance(country, Country):
+        return jsonify({"error": country}), HttpCodes.NOT_FOUND.value
+
+    return _taggedResponse(jsonify(country.asDict()), etag)
+
+@bp.route("/metrics", methods=["GET"])
+@secure_route
+def metrics(email):
+    metrics = {
+        "country_api": getCountryAPIStatsUseCase(current_app.config["COUNTRY_API"])
+    }
+
+    if current_app.config.get("TOKEN_CACHE") is not None:
+        metrics["token_cache"] = current_app.config["TOKEN_CACHE"].getStats()
+
+    if current_app.config.get("LOGIN_THROTTLE") is not None:
+        metrics["login_throttle"] = current_app.config["LOGIN_THROTTLE"].getStats()
+
+    if current_app.config.get("PASSWORD_HASHER") is not None:
+        metrics["password_hasher"] = current_app.config["PASSWORD_HASHER"].getStats()
+
+    if current_app.config.get("RISKS_ANALYTICS") is not None:
+        metrics["risks_analytics"] = current_app.config["RISKS_ANALYTICS"].getStats()
+
+    if isinstance(current_app.config["REPOSITORY"], CachingRepository):
+        metrics["repository_cache"] = current_app.config["REPOSITORY"].getStats()
+
+    return jsonify(metrics), HttpCodes.OK.value
\ No newline at end of file
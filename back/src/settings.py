@@ -1,7 +1,17 @@
 from os.path import join, dirname
+from functools import partial
 from dotenv import dotenv_values
 from src.gateways.MySQLRepository import MySQLRepository
+from src.gateways.CachingRepository import CachingRepository
+from src.gateways.CacheBackends import FileCache
+from src.gateways.GenerationCounter import GenerationCounter
 from src.gateways.CountryAPI import CountryAPI
+from src.gateways.RisksExporter import RisksExporter
+from src.gateways.TokenCache import TokenCache
+from src.gateways.PasswordHasher import PasswordHasher
+from src.gateways.LoginThrottle import LoginThrottle
+from src.gateways.ResponseCompressor import ResponseCompressor
+from src.gateways.RisksAnalytics import RisksAnalytics
 
 src_dir:str = dirname(__file__)
 root_dir:str = dirname(src_dir)
@@ -13,14 +23,78 @@ SECRETS = {
     'refresh': config['REFRESH_SECRET']
 }
 
-# Database
-REPOSITORY = MySQLRepository({
+# Verified access tokens, so secure routes skip decoding a token already seen
+TOKEN_CACHE = TokenCache(int(config['TOKEN_CACHE_SIZE']) if 'TOKEN_CACHE_SIZE' in config else 10000)
+
+# Login attempts allowed per email and per client address in a sliding window
+LOGIN_THROTTLE = LoginThrottle(
+    email_limit=int(config['LOGIN_EMAIL_LIMIT']) if 'LOGIN_EMAIL_LIMIT' in config else 5,
+    ip_limit=int(config['LOGIN_IP_LIMIT']) if 'LOGIN_IP_LIMIT' in config else 20,
+    window_seconds=int(config['LOGIN_WINDOW_SECONDS']) if 'LOGIN_WINDOW_SECONDS' in config else 60
+)
+
+# Password hashing, the bcrypt cost is fixed with BCRYPT_COST or calibrated at startup to take BCRYPT_TARGET_MS
+if 'BCRYPT_COST' in config:
+    BCRYPT_COST = int(config['BCRYPT_COST'])
+elif 'BCRYPT_TARGET_MS' in config:
+    BCRYPT_COST = PasswordHasher.calibrateCost(int(config['BCRYPT_TARGET_MS']) / 1000)
+else:
+    BCRYPT_COST = 12
+
+PASSWORD_HASHER = PasswordHasher(
+    workers=int(config['HASHER_WORKERS']) if 'HASHER_WORKERS' in config else 2,
+    max_pending=int(config['HASHER_MAX_PENDING']) if 'HASHER_MAX_PENDING' in config else 16,
+    cost=BCRYPT_COST
+)
+
+# Change counters shared by the worker processes of the host, bumped by the database writes
+CACHE_DIR = config['CACHE_DIR'] if 'CACHE_DIR' in config else join(root_dir, '.cache')
+GENERATIONS = GenerationCounter(join(CACHE_DIR, 'generations'), ['users', 'roles', 'providers', 'risks'])
+
+# The cached entries live in each process, or in a file shared by the workers with the file backend
+CACHE_BACKEND = partial(FileCache, join(CACHE_DIR, 'repository.sqlite3')) if config.get('CACHE_BACKEND') == 'file' else None
+
+# Database, behind a read through cache of the roles, providers and users
+REPOSITORY = CachingRepository(MySQLRepository({
     'host': config['MYSQL_HOST'],
     'port': int(config['MYSQL_PORT']) if 'MYSQL_PORT' in config else 3306,
     'user': config['MYSQL_USER'],
     'password': config['MYSQL_PASS'],
     'database': config['MYSQL_NAME']
-})
+}, hasher=PASSWORD_HASHER, generations=GENERATIONS), sizes={
+    'roles': int(config['CACHE_ROLES_SIZE']) if 'CACHE_ROLES_SIZE' in config else 1000,
+    'providers': int(config['CACHE_PROVIDERS_SIZE']) if 'CACHE_PROVIDERS_SIZE' in config else 1000,
+    'users': int(config['CACHE_USERS_SIZE']) if 'CACHE_USERS_SIZE' in config else 1000
+}, ttl=int(config['CACHE_TTL']) if 'CACHE_TTL' in config else 300, backend=CACHE_BACKEND, generations=GENERATIONS)
 
 # Country API
-COUNTRY_API = CountryAPI(config['COUNTRY_API_URL'])
\ No newline at end of file
+COUNTRY_API = CountryAPI(
+    config['COUNTRY_API_URL'],
+    snapshot_path=config['COUNTRY_SNAPSHOT_PATH'] if 'COUNTRY_SNAPSHOT_PATH' in config else join(root_dir, 'countries_snapshot.json'),
+    snapshot_ttl=int(config['COUNTRY_SNAPSHOT_TTL']) if 'COUNTRY_SNAPSHOT_TTL' in config else 86400,
+    connect_timeout=float(config['COUNTRY_API_CONNECT_TIMEOUT']) if 'COUNTRY_API_CONNECT_TIMEOUT' in config else 3.05,
+    read_timeout=float(config['COUNTRY_API_READ_TIMEOUT']) if 'COUNTRY_API_READ_TIMEOUT' in config else 10,
+    retries=int(config['COUNTRY_API_RETRIES']) if 'COUNTRY_API_RETRIES' in config else 2,
+    negative_ttl=int(config['COUNTRY_NOT_FOUND_TTL']) if 'COUNTRY_NOT_FOUND_TTL' in config else 300
+)
+
+# Keyset pagination for the list endpoints
+PAGINATION = {
+    'default_limit': int(config['PAGE_DEFAULT_LIMIT']) if 'PAGE_DEFAULT_LIMIT' in config else 100,
+    'max_limit': int(config['PAGE_MAX_LIMIT']) if 'PAGE_MAX_LIMIT' in config else 1000
+}
+
+# Risks bulk export
+RISKS_EXPORTER = RisksExporter(int(config['EXPORT_CHUNK_SIZE']) if 'EXPORT_CHUNK_SIZE' in config else 1000)
+
+# Bulk uploads
+BULK = {
+    'chunk_size': int(config['BULK_CHUNK_SIZE']) if 'BULK_CHUNK_SIZE' in config else 500,
+    'max_rows': int(config['BULK_MAX_ROWS']) if 'BULK_MAX_ROWS' in config else 50000
+}
+
+# Response compression, negotiated with the Accept-Encoding header of each request
+COMPRESSOR = ResponseCompressor(min_size=int(config['COMPRESS_MIN_SIZE']) if 'COMPRESS_MIN_SIZE' in config else 1024)
+
+# Columnar snapshot of the risks for the grouped counts, refreshed from the rows changed since the last request
+RISKS_ANALYTICS = RisksAnalytics(overlap=int(config['ANALYTICS_OVERLAP']) if 'ANALYTICS_OVERLAP' in config else 60)
\ No newline at end of file
@@ -4,8 +4,12 @@ class HttpCodes(enum.Enum):
     OK = 200
     CREATED = 201
     NO_CONTENT = 204
+    NOT_MODIFIED = 304
     BAD_REQUEST = 400
     UNAUTHORIZED = 401
     NOT_FOUND = 404
     CONFLICT = 409
-    INTERNAL_SERVER_ERROR = 500
\ No newline at end of file
+    TOO_MANY_REQUESTS = 429
+    INTERNAL_SERVER_ERROR = 500
+    NOT_IMPLEMENTED = 501
+    SERVICE_UNAVAILABLE = 503
\ No newline at end of file
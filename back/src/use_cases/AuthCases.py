@@ -1,13 +1,15 @@
 from src.entities.Repositories import Repository
 from src.entities.User import User
+from src.gateways.TokenCache import TokenCache
 from typing import Union
 from datetime import datetime, timedelta, timezone
+import time
 import jwt
 import re
 
-def loginUseCase(repository: Repository, email:str, password:str) -> Union[str, bool]:
+def loginUseCase(repository: Repository, email:str, password:str) -> Union[str, User]:
     """
-    Validates the user credentials in the provided repository and returns a JWT token if valid.
+    Validates the user credentials in the provided repository with a single lookup.
     
     Parameters:
         repository (Repository): The repository to validate the user credentials.
@@ -15,21 +17,13 @@ def loginUseCase(repository: Repository, email:str, password:str) -> Union[str,
         password (str): The password to validate.
 
     Returns:
-        Union[str, bool]: Returns a error message or a true if user is valid.
+        Union[str, User]: Returns a error message or the verified user with its roles.
     """
     # check if email is valid
     if not re.match(r'[^@]+@[^@]+\.[^@]+', email):
         return 'Invalid email format'
     
-    stored_user = repository.getUserByEmail(email)
-    if not isinstance(stored_user, User):
-        return 'User not found'
-    
-    validate = repository.validateUser(User(id= 0, email= email, password= password))
-    if isinstance(validate, str):
-        return validate
-    
-    return True
+    return repository.verifyCredentials(email, password)
 
 def registerUseCase(repository: Repository, email:str, password:str, name:str) -> Union[str, bool]:
     """
@@ -73,7 +67,7 @@ def registerUseCase(repository: Repository, email:str, password:str, name:str) -
     
     return True
 
-def generateJWTPairUseCase(secrets: dict[str,str], payload: dict[str, str | int], *, expiracy_in_minutes: int = 30, expiracy_in_days: int = 1) -> Union[str, tuple[str,str]]:
+def generateJWTPairUseCase(secrets: dict[str,str], payload: dict[str, str | int], *, expiracy_in_minutes: int = 30, expiracy_in_days: int = 1, refresh_claims: list[str] = None) -> Union[str, tuple[str,str]]:
     """
     Generates a JWT token and a refresh token based on the provided secrets and payload.
     
@@ -84,6 +78,7 @@ def generateJWTPairUseCase(secrets: dict[str,str], payload: dict[str, str | int]
     Keyword Arguments:
         expiracy_in_minutes (int): The expiracy in minutes of the JWT token. Defaults to 30 minutes.
         expiracy_in_days (int): The expiracy in days of the refresh token. Defaults to 1 day.
+        refresh_claims (list[str]): The claims of the payload kept in the refresh token, the refreshes copy them to every new pair. Defaults to all of them.
 
     Returns:
         Union[str, tuple[str,str]]: Returns a error message or a tuple with the JWT token and the refresh token.
@@ -97,7 +92,7 @@ def generateJWTPairUseCase(secrets: dict[str,str], payload: dict[str, str | int]
     jwt_payload = payload.copy()
     jwt_payload['exp'] = datetime.now(tz=timezone.utc) + timedelta(minutes=expiracy_in_minutes)
 
-    refresh_payload = payload.copy()
+    refresh_payload = payload.copy() if refresh_claims is None else {key: payload[key] for key in refresh_claims if key in payload}
     refresh_payload['exp'] = datetime.now(tz=timezone.utc) + timedelta(days=expiracy_in_days)
     refresh_payload['exp'] = int(refresh_payload['exp'].timestamp())
 
@@ -136,20 +131,30 @@ def refreshUseCase(secrets: dict[str,str], refresh_token: str) -> Union[str, tup
     # Generate new tokens if valid
     return generateJWTPairUseCase(secrets, payload)
 
-def verifyTokenUseCase(secret:str, token:str) -> Union[str, dict[str,str]]:
+def verifyTokenUseCase(secret:str, token:str, *, cache:TokenCache = None) -> Union[str, dict[str,str]]:
     """
     Verifies if the provided token is valid.
 
     Parameters:
         secret (str): The secret to validate the token.
         token (str): The token to validate.
+        cache (TokenCache): The cache of tokens already verified with the same secret. Defaults to None.
 
     Returns:
         Union[str, dict[str,str]]: Returns a error message or the token payload if valid.
     """
+    if cache is not None:
+        payload = cache.get(token)
+        if payload is not None:
+            return payload
+
+    start = time.perf_counter()
     try:
         payload = jwt.decode(token, secret, algorithms=['HS256'], leeway=10)
     except Exception as e:
         return 'Invalid token'
+
+    if cache is not None:
+        cache.put(token, payload, time.perf_counter() - start)
     
     return payload
\ No newline at end of file
@@ -1,4 +1,5 @@
 from src.entities.User import User
+from src.entities.Country import Country
 from src.gateways.CountryAPI import CountryAPI
 from typing import Union
 
@@ -18,4 +19,81 @@ def getCountryByCCA3UseCase(country_api: CountryAPI, cca3:str) -> Union[User,str
         return 'cca3 must have 3 characters'
     
     # get the country
-    return country_api.getCountryByCCA3(cca3)
\ No newline at end of file
+    return country_api.getCountryByCCA3(cca3)
+
+def getCountriesUseCase(country_api: CountryAPI, filters: dict[str,str]) -> Union[list[Country],str]:
+    """
+    Gets the countries matching all the given filters.
+
+    Parameters:
+        country_api (CountryAPI): The country api to get the countries.
+        filters (dict[str,str]): The filters to apply, with keys in region, subregion, currency, language or capital.
+
+    Returns:
+        Union[list[Country],str]: Returns a error message or a list of countries.
+    """
+    lookups = {
+        'region': country_api.getCountriesByRegion,
+        'subregion': country_api.getCountriesBySubregion,
+        'currency': country_api.getCountriesByCurrency,
+        'language': country_api.getCountriesByLanguage,
+        'capital': country_api.getCountriesByCapital
+    }
+
+    # check if filters are valid
+    for key in filters:
+        if key not in lookups:
+            return 'Filter must be in region, subregion, currency, language or capital'
+
+    countries = country_api.getAllCountries()
+    if isinstance(countries, str):
+        return countries
+
+    # intersect the countries of every filter by cca3
+    for key, value in filters.items():
+        matches = lookups[key](value)
+        if isinstance(matches, str):
+            return matches
+
+        matching_codes = {country.cca3 for country in matches}
+        countries = [country for country in countries if country.cca3 in matching_codes]
+
+    return countries
+
+def getCountriesVersionUseCase(country_api: CountryAPI) -> Union[str,None]:
+    """
+    Gets the version of the local countries catalog, to be used as ETag.
+
+    Parameters:
+        country_api (CountryAPI): The country api to get the version.
+
+    Returns:
+        Union[str,None]: Returns the catalog version or None if there is no local catalog.
+    """
+    catalog = country_api.getCatalog()
+
+    return catalog.etag if catalog is not None else None
+
+def getCountryCodesUseCase(country_api: CountryAPI) -> frozenset[str]:
+    """
+    Gets the set of valid country codes, answered locally without querying the countries api.
+
+    Parameters:
+        country_api (CountryAPI): The country api to get the codes.
+
+    Returns:
+        frozenset[str]: Returns the upper case cca3 codes.
+    """
+    return country_api.getCountryCodes()
+
+def getCountryAPIStatsUseCase(country_api: CountryAPI) -> dict:
+    """
+    Gets the health of the country api client: the circuit breaker state, the request latency and the snapshot.
+
+    Parameters:
+        country_api (CountryAPI): The country api to get the stats.
+
+    Returns:
+        dict: Returns the country api stats.
+    """
+    return country_api.getStats()
@@ -37,6 +37,96 @@ def createProviderUseCase(repository:Repository, country_api:CountryAPI, name:st
     # create provider
     return repository.createProvider(name, description, country_cca3)
 
+def _validateProviderRow(row: any) -> Union[tuple[str,str,str],str]:
+    # check the row shape and the same lengths as createProviderUseCase
+    if not isinstance(row, dict) or not all(isinstance(row.get(key), str) for key in ['name', 'description', 'country']):
+        return 'Row must have a name, a description and a country'
+
+    if len(row['name']) < 5:
+        return 'Name must have at least 5 characters'
+
+    if len(row['description']) < 5:
+        return 'Description must have at least 5 characters'
+
+    if len(row['country']) != 3:
+        return 'Country Code must have 3 characters'
+
+    return (row['name'], row['description'], row['country'].upper())
+
+def createProvidersBulkUseCase(repository:Repository, country_api:CountryAPI, rows:list[dict], *, chunk_size:int = 500) -> Union[dict,str]:
+    """
+    Creates many providers in the provided repository. The countries of all the rows are validated with a single
+    lookup and the names with a single query, then the valid rows are inserted in chunks inside one transaction.
+    The rows whose name the database finds taken under its collation are reported without failing the others.
+
+    Parameters:
+        repository (Repository): The repository to create the providers.
+        country_api (CountryAPI): The country api to validate the countries.
+        rows (list[dict]): The providers to create, with a name, a description and a country.
+        chunk_size (int): The amount of providers inserted per statement.
+
+    Returns:
+        Union[dict,str]: Returns a error message or the amount of created providers and the errors of every rejected row.
+    """
+    if not isinstance(rows, list) or len(rows) < 1:
+        return 'At least one provider must be provided'
+
+    errors = {}
+    providers = {}
+
+    # check every row and the names repeated in the same upload
+    seen_names = set()
+    for index, row in enumerate(rows):
+        provider = _validateProviderRow(row)
+        if isinstance(provider, str):
+            errors[index] = provider
+        elif provider[0] in seen_names:
+            errors[index] = 'Provider repeated in the upload'
+        else:
+            seen_names.add(provider[0])
+            providers[index] = provider
+
+    # check the countries, every distinct code at once
+    if providers:
+        countries = country_api.getCountriesByListOfCCA3(list({provider[2] for provider in providers.values()}))
+        if isinstance(countries, str):
+            return countries
+
+        known_codes = {country.cca3.upper() for country in countries}
+        for index, provider in list(providers.items()):
+            if provider[2] not in known_codes:
+                errors[index] = 'Country Code not found'
+                del providers[index]
+
+    # check the providers already registered, every name at once. The database compares the names with the column
+    # collation, the names that only match that way are rejected per row by the insert below
+    if providers:
+        stored_providers = repository.getProvidersByNames([provider[0] for provider in providers.values()])
+        if isinstance(stored_providers, str):
+            return stored_providers
+
+        stored_names = {provider.name for provider in stored_providers}
+        for index, provider in list(providers.items()):
+            if provider[0] in stored_names:
+                errors[index] = 'Provider already registered'
+                del providers[index]
+
+    # create the valid providers
+    created = repository.createProviders(list(providers.values()), chunk_size=chunk_size) if providers else (0, [])
+    if isinstance(created, str):
+        return created
+
+    # the rows whose name was taken, by a stored provider or by an earlier row of the upload
+    created, duplicates = created
+    indexes = list(providers)
+    for position in duplicates:
+        errors[indexes[position]] = 'Provider already registered'
+
+    return {
+        'created': created,
+        'errors': [{'row': index, 'error': errors[index]} for index in sorted(errors)]
+    }
+
 def updateProviderUseCase(repository:Repository, country_api:CountryAPI, id:int, new_parameters:dict[str,str]) -> Union[bool,str]:
     """
     Updates a provider in the provided repository.
@@ -152,4 +242,51 @@ def getProvidersUseCase(repository:Repository) -> Union[list[Provider],str]:
         Union[list[Provider],str]: Returns a error message or a list of providers.
     """
     # get providers
-    return repository.getAllProviders()
\ No newline at end of file
+    return repository.getAllProviders()
+
+def getProvidersPageUseCase(repository:Repository, after:int, limit:int) -> Union[list[Provider],str]:
+    """
+    Gets a page of providers ordered by id in the provided repository.
+
+    Parameters:
+        repository (Repository): The repository to get the providers.
+        after (int): The id of the last provider of the previous page, 0 for the first page.
+        limit (int): The maximum amount of providers to get.
+
+    Returns:
+        Union[list[Provider],str]: Returns a error message or a list of providers.
+    """
+    # check if the page is valid
+    if after < 0:
+        return 'Cursor must be greater or equal to 0'
+    
+    if limit < 1:
+        return 'Limit must be greater than 0'
+
+    # get providers
+    return repository.getProvidersPage(after, limit)
+
+def countProvidersUseCase(repository:Repository) -> Union[int,str]:
+    """
+    Counts all providers in the provided repository.
+
+    Parameters:
+        repository (Repository): The repository to count the providers.
+
+    Returns:
+        Union[int,str]: Returns a error message or the amount of providers.
+    """
+    # count providers
+    return repository.countProviders()
+
+def getProvidersVersionUseCase(repository:Repository) -> Union[str,None]:
+    """
+    Gets the version of the providers, that changes with any write to them, to be used as ETag.
+
+    Parameters:
+        repository (Repository): The repository to get the version.
+
+    Returns:
+        Union[str,None]: Returns the providers version or None if it cannot be computed.
+    """
+    return repository.getFingerprint('providers')
\ No newline at end of file
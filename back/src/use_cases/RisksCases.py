@@ -1,6 +1,21 @@
 from src.entities.Risk import Risk
 from src.entities.Repositories import Repository
-from typing import Union
+from src.entities.Classification import Classification
+from src.gateways.RisksAnalytics import RisksAnalytics, AnalyticsError
+from typing import Union, Iterator, Iterable
+import time
+
+def _countRiskValues(risk:Risk) -> int:
+    """
+    Counts the fields of a risk that hold a value.
+
+    Parameters:
+        risk (Risk): The risk to count.
+
+    Returns:
+        int: Returns the amount of fields that are not None.
+    """
+    return sum(1 for key in risk.__slots__ if getattr(risk, key) is not None)
 
 def _selectBetterRisk(risk1:Risk, risk2:Risk) -> Risk:
     """
@@ -13,14 +28,14 @@ def _selectBetterRisk(risk1:Risk, risk2:Risk) -> Risk:
     Returns:
         Risk: Returns the risk with the higher amount of values.
     """
-    if len(risk1.asDict()) > len(risk2.asDict()):
+    if _countRiskValues(risk1) > _countRiskValues(risk2):
         return risk1
     
     return risk2
 
 def _joinRisksLists(placeholder:list[Risk], new:list[Risk]) -> list[Risk]:
     """
-    Joins two lists of risks.
+    Joins two lists of risks by id in linear time, keeping the placeholder order.
 
     Parameters:
         placeholder (list[Risk]): The placeholder list.
@@ -33,8 +48,19 @@ def _joinRisksLists(placeholder:list[Risk], new:list[Risk]) -> list[Risk]:
     if not isinstance(new, list) or len(new) < 1:
         return []
     
+    # Index the new list by id, the first occurrence wins as list.index did
+    indexed = {}
+    for risk in new:
+        indexed.setdefault(risk.id, risk)
+
     # Return the inner join of the two lists
-    return [_selectBetterRisk(risk, new[new.index(risk)]) for risk in placeholder if risk in new]
+    joined = []
+    for risk in placeholder:
+        match = indexed.get(risk.id)
+        if match is not None:
+            joined.append(_selectBetterRisk(risk, match))
+
+    return joined
 
 def createRiskUseCase(repository:Repository, provider_id:int, name:str, description:str, probability:str, impact:str, email:str) -> Union[bool,str]:
     """
@@ -87,6 +113,111 @@ def createRiskUseCase(repository:Repository, provider_id:int, name:str, descript
     # Create a link between the user and the risk
     return repository.relateRiskToUser(operation, user.id)
 
+CLASSIFICATIONS = [classification.value for classification in Classification]
+
+def _validateRiskRow(row: any) -> Union[tuple[int,str,str,str,str],str]:
+    # check the row shape and the same rules as createRiskUseCase
+    if not isinstance(row, dict):
+        return 'Row must be a JSON object'
+
+    if not isinstance(row.get('provider_id'), int) or isinstance(row.get('provider_id'), bool):
+        return 'Provider id must be an integer'
+
+    if not isinstance(row.get('name'), str) or len(row['name']) < 10:
+        return 'Name must have at least 10 character'
+
+    if not isinstance(row.get('description'), str) or len(row['description']) < 10:
+        return 'Description must have at least 10 character'
+
+    if row.get('probability') not in CLASSIFICATIONS:
+        return 'Probability must be in VERY_LOW, LOW, MEDIUM, HIGH or VERY_HIGH'
+
+    if row.get('impact') not in CLASSIFICATIONS:
+        return 'Impact must be in VERY_LOW, LOW, MEDIUM, HIGH or VERY_HIGH'
+
+    return (row['provider_id'], row['name'], row['description'], row['probability'], row['impact'])
+
+def ingestRisksUseCase(repository:Repository, rows:Iterable[any], email:str, *, chunk_size:int = 500, max_errors:int = 100) -> Union[dict,str]:
+    """
+    Creates the risks of a stream of rows, such as the findings of a scanner, in chunks. The providers of every chunk
+    are resolved with a single query and each chunk is stored with its links to the user in one transaction, so a
+    failing chunk does not stop the ones after it.
+
+    Parameters:
+        repository (Repository): The repository to create the risks.
+        rows (Iterable[any]): The risks to create, read lazily, each one with a provider_id, name, description, probability and impact.
+        email (str): The user email from the JWT.
+        chunk_size (int): The amount of risks stored per transaction.
+        max_errors (int): The maximum amount of row errors reported.
+
+    Returns:
+        Union[dict,str]: Returns a error message or the amount of created and rejected risks, the first row errors and the throughput.
+    """
+    start = time.perf_counter()
+
+    # Get the user creating the risks
+    user = repository.getUserByEmail(email)
+    if isinstance(user, str):
+        return user
+
+    report = {'created': 0, 'rejected': 0, 'errors': []}
+    known_providers = set()
+    missing_providers = set()
+
+    def reject(index: int, error: str) -> None:
+        report['rejected'] += 1
+        if len(report['errors']) < max_errors:
+            report['errors'].append({'row': index, 'error': error})
+
+    def flush(chunk: list[tuple[int,tuple]]) -> None:
+        # resolve only the providers not seen in previous chunks
+        unknown_ids = {risk[0] for _, risk in chunk} - known_providers - missing_providers
+        if unknown_ids:
+            providers = repository.getProvidersByIds(list(unknown_ids))
+            if isinstance(providers, str):
+                for index, _ in chunk:
+                    reject(index, providers)
+                return
+
+            known_providers.update(provider.id for provider in providers)
+            missing_providers.update(unknown_ids - known_providers)
+
+        valid = []
+        for index, risk in chunk:
+            if risk[0] in known_providers:
+                valid.append((index, risk))
+            else:
+                reject(index, 'Provider not found')
+
+        created = repository.createRisks([risk for _, risk in valid], user.id) if valid else 0
+        if isinstance(created, str):
+            for index, _ in valid:
+                reject(index, created)
+        else:
+            report['created'] += created
+
+    chunk = []
+    for index, row in enumerate(rows):
+        risk = _validateRiskRow(row)
+        if isinstance(risk, str):
+            reject(index, risk)
+            continue
+
+        chunk.append((index, risk))
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+
+    if chunk:
+        flush(chunk)
+
+    seconds = time.perf_counter() - start
+    total = report['created'] + report['rejected']
+    report['seconds'] = round(seconds, 3)
+    report['rows_per_second'] = round(total / seconds) if seconds > 0 else total
+
+    return report
+
 def updateRiskUseCase(repository:Repository, risk_id:int, new_parameters:dict) -> Union[bool,str]:
     """
     Updates a risk in the provided repository.
@@ -171,29 +302,23 @@ def deleteRiskUseCase(repository:Repository, risk_id:int) -> Union[bool,str]:
 
     return repository.deleteRisk(risk_id)
 
-def getFilteredRisksUseCase(repository:Repository, filters:dict) -> Union[list[Risk], str]:
+def _validateRisksFilters(repository:Repository, filters:dict) -> Union[dict,str]:
     """
-    Gets all risks in the provided repository.
+    Validates the risks filters and resolves the provider and user they reference.
 
     Parameters:
-        repository (Repository): The repository to get the risks.
-        filters (dict): The filters to apply.
+        repository (Repository): The repository to resolve the filters.
+        filters (dict): The filters to validate.
 
     Returns:
-        Union[list[Risk],str]: Returns a error message or a list of Risks if risks are found.
+        Union[dict,str]: Returns a error message or a dict with the stored provider and user, if filtered by them.
     """
+    resolved = {}
+
     # check if filters are valid
     for key in filters:
         if key not in ['id','provider_id', 'user_id', 'string', 'probability', 'impact', 'country']:
             return 'Filter must be in provider_id, user_id, string, probability, impact or country'
-        
-    results = repository.getAllRisks()
-    if isinstance(results, str):
-        return results
-
-    # check if id is valid
-    if 'id' in filters:
-        return repository.getRiskById(filters['id'])
 
     # check if provider_id is valid
     if 'provider_id' in filters:
@@ -201,7 +326,7 @@ def getFilteredRisksUseCase(repository:Repository, filters:dict) -> Union[list[R
         if isinstance(stored_provider, str):
             return stored_provider
         
-        results = _joinRisksLists(results, repository.getRisksByProvider(stored_provider))
+        resolved['provider'] = stored_provider
 
     # check if user_id is valid
     if 'user_id' in filters:
@@ -209,34 +334,164 @@ def getFilteredRisksUseCase(repository:Repository, filters:dict) -> Union[list[R
         if isinstance(stored_user, str):
             return stored_user
         
-        results = _joinRisksLists(results, repository.getRisksByUser(stored_user))
+        resolved['user'] = stored_user
 
     # check if string is valid
+    if 'string' in filters and len(filters['string']) < 1:
+        return 'String must have at least 1 character'
+
+    # check if probability is valid
+    if 'probability' in filters and filters['probability'] not in ['VERY_LOW', 'LOW', 'MEDIUM', 'HIGH', 'VERY_HIGH']:
+        return 'Probability must be in VERY_LOW, LOW, MEDIUM, HIGH or VERY_HIGH'
+
+    # check if impact is valid
+    if 'impact' in filters and filters['impact'] not in ['VERY_LOW', 'LOW', 'MEDIUM', 'HIGH', 'VERY_HIGH']:
+        return 'Impact must be in VERY_LOW, LOW, MEDIUM, HIGH or VERY_HIGH'
+
+    # check if country is valid
+    if 'country' in filters and len(filters['country']) != 3:
+        return 'Country must have 3 characters'
+
+    return resolved
+
+def getFilteredRisksUseCase(repository:Repository, filters:dict, *, after:int = None, limit:int = None) -> Union[list[Risk], str]:
+    """
+    Gets all risks in the provided repository.
+
+    Positional Parameters:
+        repository (Repository): The repository to get the risks.
+        filters (dict): The filters to apply.
+
+    Keyword Arguments:
+        after (int): The id of the last risk of the previous page. Defaults to None.
+        limit (int): The maximum amount of risks to get. Defaults to None, returning all the risks.
+
+    Returns:
+        Union[list[Risk],str]: Returns a error message or a list of Risks if risks are found.
+    """
+    # check if the page is valid
+    if after is not None and after < 0:
+        return 'Cursor must be greater or equal to 0'
+    
+    if limit is not None and limit < 1:
+        return 'Limit must be greater than 0'
+
+    resolved = _validateRisksFilters(repository, filters)
+    if isinstance(resolved, str):
+        return resolved
+
+    # check if id is valid
+    if 'id' in filters:
+        return repository.getRiskById(filters['id'])
+
+    # Unfiltered pages go straight to the keyset query
+    if not filters and limit is not None:
+        return repository.getRisksPage(after or 0, limit)
+
+    # Let the repository evaluate all the filters in a single query when it supports it
+    results = repository.queryRisks(filters, after=after, limit=limit)
+    if results is not None:
+        return results
+
+    # Fall back to intersecting the single filter queries
+    results = repository.getAllRisks()
+    if isinstance(results, str):
+        return results
+
+    if 'provider_id' in filters:
+        results = _joinRisksLists(results, repository.getRisksByProvider(resolved['provider']))
+
+    if 'user_id' in filters:
+        results = _joinRisksLists(results, repository.getRisksByUser(resolved['user']))
+
     if 'string' in filters:
-        if len(filters['string']) < 1:
-            return 'String must have at least 1 character'
-        
         results = _joinRisksLists(results, repository.getRisksByString(filters['string']))
 
-    # check if probability is valid
     if 'probability' in filters:
-        if filters['probability'] not in ['VERY_LOW', 'LOW', 'MEDIUM', 'HIGH', 'VERY_HIGH']:
-            return 'Probability must be in VERY_LOW, LOW, MEDIUM, HIGH or VERY_HIGH'
-        
         results = _joinRisksLists(results, repository.getRisksByProbability(filters['probability']))
 
-    # check if impact is valid
     if 'impact' in filters:
-        if filters['impact'] not in ['VERY_LOW', 'LOW', 'MEDIUM', 'HIGH', 'VERY_HIGH']:
-            return 'Impact must be in VERY_LOW, LOW, MEDIUM, HIGH or VERY_HIGH'
-        
         results = _joinRisksLists(results, repository.getRisksByImpact(filters['impact']))
 
-    # check if country is valid
     if 'country' in filters:
-        if len(filters['country']) != 3:
-            return 'Country must have 3 characters'
-        
         results = _joinRisksLists(results, repository.getRisksByCountry(filters['country']))
 
-    return results
\ No newline at end of file
+    if after is not None:
+        results = [risk for risk in results if risk.id > after]
+
+    return results if limit is None else results[:limit]
+
+def countFilteredRisksUseCase(repository:Repository, filters:dict) -> Union[int,str]:
+    """
+    Counts the risks matching the filters in the provided repository.
+
+    Parameters:
+        repository (Repository): The repository to count the risks.
+        filters (dict): The filters to apply.
+
+    Returns:
+        Union[int,str]: Returns a error message or the amount of risks.
+    """
+    resolved = _validateRisksFilters(repository, filters)
+    if isinstance(resolved, str):
+        return resolved
+
+    # A single risk can be counted by fetching it
+    if 'id' in filters:
+        return 0 if not isinstance(repository.getRiskById(filters['id']), Risk) else 1
+
+    return repository.countRisks(filters)
+
+def getRisksVersionUseCase(repository:Repository) -> Union[str,None]:
+    """
+    Gets the version of the risks, that changes with any write to them, their users or their providers, to be used as ETag.
+
+    Parameters:
+        repository (Repository): The repository to get the version.
+
+    Returns:
+        Union[str,None]: Returns the risks version or None if it cannot be computed.
+    """
+    return repository.getFingerprint('risks')
+
+def exportRisksUseCase(repository:Repository, filters:dict) -> Union[Iterator[Risk],str]:
+    """
+    Streams the risks matching the filters, with their provider country, from the provided repository.
+
+    Parameters:
+        repository (Repository): The repository to get the risks.
+        filters (dict): The filters to apply.
+
+    Returns:
+        Union[Iterator[Risk],str]: Returns a error message or an iterator over the risks.
+    """
+    resolved = _validateRisksFilters(repository, filters)
+    if isinstance(resolved, str):
+        return resolved
+
+    if 'id' in filters:
+        return 'Filter must be in provider_id, user_id, string, probability, impact or country'
+
+    return repository.streamRisks(filters, with_country=True)
+
+def getRisksAnalyticsUseCase(repository:Repository, analytics:RisksAnalytics, group_by:list[str], *, version:str = None) -> Union[dict,str]:
+    """
+    Counts the risks grouped by the given dimensions, refreshing the analytics snapshot with the changes of the provided repository first.
+
+    Parameters:
+        repository (Repository): The repository to read the changes.
+        analytics (RisksAnalytics): The analytics snapshot.
+        group_by (list[str]): The dimensions to group by, in provider, country, user, probability or impact.
+        version (str): The current risks version, the snapshot is not refreshed while it does not change.
+
+    Returns:
+        Union[dict,str]: Returns a error message or the total and the groups with their count.
+    """
+    try:
+        refreshed = analytics.refresh(repository.getRiskChanges, version)
+        if isinstance(refreshed, str):
+            return refreshed
+
+        return analytics.groupBy(group_by)
+    except AnalyticsError as e:
+        return str(e)
\ No newline at end of file
@@ -20,6 +20,53 @@ def getRolesUseCase(repository:Repository) -> Union[list[Role],str]:
     
     return roles
 
+def getRolesPageUseCase(repository:Repository, after:int, limit:int) -> Union[list[Role],str]:
+    """
+    Gets a page of roles ordered by id in the provided repository.
+
+    Parameters:
+        repository (Repository): The repository to get the roles.
+        after (int): The id of the last role of the previous page, 0 for the first page.
+        limit (int): The maximum amount of roles to get.
+
+    Returns:
+        Union[list[Role],str]: Returns a error message or a list of roles.
+    """
+    # check if the page is valid
+    if after < 0:
+        return 'Cursor must be greater or equal to 0'
+    
+    if limit < 1:
+        return 'Limit must be greater than 0'
+
+    # Get the roles
+    return repository.getRolesPage(after, limit)
+
+def countRolesUseCase(repository:Repository) -> Union[int,str]:
+    """
+    Counts all roles in the provided repository.
+
+    Parameters:
+        repository (Repository): The repository to count the roles.
+
+    Returns:
+        Union[int,str]: Returns a error message or the amount of roles.
+    """
+    # Count the roles
+    return repository.countRoles()
+
+def getRolesVersionUseCase(repository:Repository) -> Union[str,None]:
+    """
+    Gets the version of the roles, that changes with any write to them, to be used as ETag.
+
+    Parameters:
+        repository (Repository): The repository to get the version.
+
+    Returns:
+        Union[str,None]: Returns the roles version or None if it cannot be computed.
+    """
+    return repository.getFingerprint('roles')
+
 def getRoleByIdUseCase(repository:Repository, role_id:int) -> Union[Role,str]:
     """
     Gets a role by id in the provided repository.
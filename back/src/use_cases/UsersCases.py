@@ -1,4 +1,6 @@
 from src.entities.User import User
+from src.entities.Role import Role
+from src.entities.Risk import Risk
 from src.entities.Repositories import Repository
 from typing import Union
 
@@ -180,6 +182,143 @@ def removeUserFromRiskUseCase(repository:Repository, user_id:int, risk_id:int) -
     # remove risk from user
     return repository.unrelateRiskToUser(stored_risk.id, stored_user.id)
 
+def _validateUserIds(repository:Repository, user_ids:list[int]) -> Union[list[int],str]:
+    # check the ids and that every user exists, with a single query
+    if not isinstance(user_ids, list) or len(user_ids) < 1:
+        return 'At least one user id must be provided'
+
+    if not all(isinstance(user_id, int) and not isinstance(user_id, bool) and user_id > 0 for user_id in user_ids):
+        return 'User ids must be integers greater than 0'
+
+    user_ids = list(dict.fromkeys(user_ids))
+
+    stored_users = repository.getUsersByIds(user_ids)
+    if isinstance(stored_users, str):
+        return stored_users
+
+    stored_ids = {user.id for user in stored_users}
+    missing_ids = [str(user_id) for user_id in user_ids if user_id not in stored_ids]
+    if missing_ids:
+        return f'Users not found: {", ".join(missing_ids)}'
+
+    return user_ids
+
+def addUsersToRoleUseCase(repository:Repository, role_id:int, user_ids:list[int]) -> Union[int,str]:
+    """
+    Adds a role to many users in the provided repository.
+
+    Parameters:
+        repository (Repository): The repository to add the role.
+        role_id (int): The id of the role to add.
+        user_ids (list[int]): The ids of the users.
+
+    Returns:
+        Union[int,str]: Returns a error message or the amount of new links.
+    """
+    # check if role id is valid
+    if role_id < 1:
+        return 'Role id must be greater than 0'
+
+    # check if role exists
+    stored_role = repository.getRoleById(role_id)
+    if not isinstance(stored_role, Role):
+        return 'Role not found'
+
+    # check if users exist
+    user_ids = _validateUserIds(repository, user_ids)
+    if isinstance(user_ids, str):
+        return user_ids
+
+    # add role to users
+    return repository.linkRolesToUsers(stored_role.id, user_ids)
+
+def removeUsersFromRoleUseCase(repository:Repository, role_id:int, user_ids:list[int]) -> Union[int,str]:
+    """
+    Removes a role from many users in the provided repository.
+
+    Parameters:
+        repository (Repository): The repository to remove the role.
+        role_id (int): The id of the role to remove.
+        user_ids (list[int]): The ids of the users.
+
+    Returns:
+        Union[int,str]: Returns a error message or the amount of removed links.
+    """
+    # check if role id is valid
+    if role_id < 1:
+        return 'Role id must be greater than 0'
+
+    # check if role exists
+    stored_role = repository.getRoleById(role_id)
+    if not isinstance(stored_role, Role):
+        return 'Role not found'
+
+    # check if users exist
+    user_ids = _validateUserIds(repository, user_ids)
+    if isinstance(user_ids, str):
+        return user_ids
+
+    # remove role from users
+    return repository.unlinkRolesToUsers(stored_role.id, user_ids)
+
+def addUsersToRiskUseCase(repository:Repository, risk_id:int, user_ids:list[int]) -> Union[int,str]:
+    """
+    Adds many users to a risk in the provided repository.
+
+    Parameters:
+        repository (Repository): The repository to add the users.
+        risk_id (int): The id of the risk.
+        user_ids (list[int]): The ids of the users to add.
+
+    Returns:
+        Union[int,str]: Returns a error message or the amount of new links.
+    """
+    # check if risk id is valid
+    if risk_id < 1:
+        return 'Risk id must be greater than 0'
+
+    # check if risk exists
+    stored_risk = repository.getRiskById(risk_id)
+    if not isinstance(stored_risk, Risk):
+        return 'Risk not found'
+
+    # check if users exist
+    user_ids = _validateUserIds(repository, user_ids)
+    if isinstance(user_ids, str):
+        return user_ids
+
+    # add users to risk
+    return repository.relateRisksToUsers(stored_risk.id, user_ids)
+
+def removeUsersFromRiskUseCase(repository:Repository, risk_id:int, user_ids:list[int]) -> Union[int,str]:
+    """
+    Removes many users from a risk in the provided repository.
+
+    Parameters:
+        repository (Repository): The repository to remove the users.
+        risk_id (int): The id of the risk.
+        user_ids (list[int]): The ids of the users to remove.
+
+    Returns:
+        Union[int,str]: Returns a error message or the amount of removed links.
+    """
+    # check if risk id is valid
+    if risk_id < 1:
+        return 'Risk id must be greater than 0'
+
+    # check if risk exists
+    stored_risk = repository.getRiskById(risk_id)
+    if not isinstance(stored_risk, Risk):
+        return 'Risk not found'
+
+    # check if users exist
+    user_ids = _validateUserIds(repository, user_ids)
+    if isinstance(user_ids, str):
+        return user_ids
+
+    # remove users from risk
+    return repository.unrelateRisksToUsers(stored_risk.id, user_ids)
+
 def updateUserUseCase(repository: Repository, user_id:int, new_parameters:dict[str,str]) -> Union[bool,str]:
     """
     Updates a user in the provided repository.
@@ -4,8 +4,15 @@ from src.entities.Role import Role
 from src.entities.Risk import Risk
 from src.entities.Provider import Provider
 from datetime import datetime, timezone
+from typing import Iterator
+import unicodedata
 import bcrypt
 
+def _collationKey(name: str) -> str:
+    # Compares the names as utf8mb4_unicode_ci does: without case, accents nor trailing spaces
+    decomposed = unicodedata.normalize('NFKD', name.rstrip())
+    return ''.join(character for character in decomposed if not unicodedata.combining(character)).casefold()
+
 class MockRepository(Repository):
     pass
 
@@ -19,15 +26,15 @@ class MockRepository(Repository):
             email= 'test@test.com',
             password= 'test',
             name= 'test',
-            roles= [
-                Role(id= 1, name= 'test')
-            ],
+            roles= ['test'],
             created_at= datetime.now(tz= timezone.utc),
             updated_at= datetime.now(tz= timezone.utc),
             salt= salt,
             hashed_password= bcrypt.hashpw('test'.encode('utf-8'), salt),
         )
 
+        self.mock_Role = Role(id= 1, name= 'test')
+
         self.mock_Risk = Risk(
             id= 1,
             provider_id= 1,
@@ -77,6 +84,21 @@ class MockRepository(Repository):
     def getAllUsers(self) -> list[User] | str:
         return [self.mock_user] if not self._evaluateFail() else 'Error obtaining users'
     
+    def streamUsers(self) -> Iterator[User] | str:
+        return iter([self.mock_user]) if not self._evaluateFail() else 'Error obtaining users'
+    
+    def getUsersByIds(self, ids: list[int]) -> list[User] | str:
+        if self._evaluateFail():
+            return 'Error obtaining users'
+
+        return [self.mock_user] if self.mock_user.id in ids else []
+
+    def getUsersPage(self, after: int, limit: int) -> list[User] | str:
+        return [self.mock_user] if not self._evaluateFail() else 'Error obtaining users'
+    
+    def countUsers(self) -> int | str:
+        return 1 if not self._evaluateFail() else 'Error counting users'
+    
     def updateUserData(self, user: User) -> bool | str:
         return True if not self._evaluateFail() else 'Error updating user'
     
@@ -88,12 +110,27 @@ class MockRepository(Repository):
     
     def validateUser(self, user: User) -> bool | str:
         return True if not self._evaluateFail() else 'The user cannot be validated'
+
+    def verifyCredentials(self, email: str, password: str) -> User | str:
+        if self._evaluateFail() or email != self.mock_user.email:
+            return 'User not found'
+
+        if not bcrypt.checkpw(password.encode('utf-8'), self.mock_user.hashed_password):
+            return 'The user cannot be validated'
+
+        return self.mock_user
     
     def linkRoleToUser(self, user_id: int, role_id: int) -> bool | str:
         return True if not self._evaluateFail() else 'Error asigning role to user'
     
     def unlinkRoleToUser(self, user_id: int, role_id: int) -> bool | str:
         return True if not self._evaluateFail() else 'Error removing role to user'
+
+    def linkRolesToUsers(self, role_id: int, user_ids: list[int]) -> int | str:
+        return len(user_ids) if not self._evaluateFail() else 'Error asigning role to users'
+
+    def unlinkRolesToUsers(self, role_id: int, user_ids: list[int]) -> int | str:
+        return len(user_ids) if not self._evaluateFail() else 'Error removing role to users'
     
     def getAllRoles(self) -> list[Role] | str:
         if self._evaluateFail():
@@ -101,16 +138,30 @@ class MockRepository(Repository):
         elif self.empty:
             return []
         else:
-            return [self.mock_user.roles[0]]
+            return [self.mock_Role]
+    
+    def getRolesPage(self, after: int, limit: int) -> list[Role] | str:
+        if self._evaluateFail():
+            return 'Error obtaining roles'
+        elif self.empty or after >= self.mock_Role.id:
+            return []
+        else:
+            return [self.mock_Role]
+    
+    def countRoles(self) -> int | str:
+        if self._evaluateFail():
+            return 'Error counting roles'
+        
+        return 0 if self.empty else 1
     
     def createRole(self, name: str) -> bool | str:
         return True if not self._evaluateFail() else 'Error creating rol'
     
     def getRoleById(self, id: int) -> Role | str:
-        return self.mock_user.roles[0] if not self._evaluateFail() else 'Error obtaining rol'
+        return self.mock_Role if not self._evaluateFail() else 'Error obtaining rol'
     
     def getRoleByName(self, name: str) -> Role | str:
-        return self.mock_user.roles[0] if not self._evaluateFail() else 'Error obtaining rol'
+        return self.mock_Role if not self._evaluateFail() else 'Error obtaining rol'
     
     def updateRole(self, role: Role) -> bool | str:
         return True if not self._evaluateFail() else 'Error updating rol'
@@ -127,9 +178,45 @@ class MockRepository(Repository):
     def getProviderByName(self, name: str) -> Provider | str:
         return self.mock_Provider if not self._evaluateFail() else 'the user couldn\'t be retrieved'
     
+    def getProvidersByIds(self, ids: list[int]) -> list[Provider] | str:
+        if self._evaluateFail():
+            return 'the users couldn\'t be retrieved'
+
+        return [self.mock_Provider] if self.mock_Provider.id in ids else []
+
+    def getProvidersByNames(self, names: list[str]) -> list[Provider] | str:
+        if self._evaluateFail():
+            return 'the users couldn\'t be retrieved'
+
+        stored_name = _collationKey(self.mock_Provider.name)
+        return [self.mock_Provider] if any(_collationKey(name) == stored_name for name in names) else []
+
+    def createProviders(self, providers: list[tuple[str,str,str]], *, chunk_size: int = 500) -> tuple[int,list[int]] | str:
+        if self._evaluateFail():
+            return 'Error creating providers'
+
+        # The unique name index rejects the stored name and the names of the earlier rows
+        taken = {_collationKey(self.mock_Provider.name)}
+        duplicates = []
+        for position, provider in enumerate(providers):
+            if _collationKey(provider[0]) in taken:
+                duplicates.append(position)
+            taken.add(_collationKey(provider[0]))
+
+        return (len(providers) - len(duplicates), duplicates)
+    
     def getAllProviders(self) -> list[Provider] | str:
         return [self.mock_Provider] if not self._evaluateFail() else 'the users couldn\'t be retrieved'
     
+    def streamProviders(self) -> Iterator[Provider] | str:
+        return iter([self.mock_Provider]) if not self._evaluateFail() else 'the users couldn\'t be retrieved'
+    
+    def getProvidersPage(self, after: int, limit: int) -> list[Provider] | str:
+        return [self.mock_Provider] if not self._evaluateFail() else 'the users couldn\'t be retrieved'
+    
+    def countProviders(self) -> int | str:
+        return 1 if not self._evaluateFail() else 'Error counting providers'
+    
     def updateProvider(self, provider: Provider) -> bool | str:
         return True if not self._evaluateFail() else 'Error updating provider'
     
@@ -139,6 +226,9 @@ class MockRepository(Repository):
     def createRisk(self, provider_id: int, name: str, description: str, probability: str, impact: str, user_id: int) -> bool | str:
         return True if not self._evaluateFail() else 'Error creating risk'
     
+    def createRisks(self, risks: list[tuple[int,str,str,str,str]], user_id: int) -> int | str:
+        return len(risks) if not self._evaluateFail() else 'Error creating risks'
+    
     def getRiskById(self, id: int) -> Risk | str:
         return self.mock_Risk if not self._evaluateFail() else 'Error obtaining risk'
     
@@ -163,6 +253,28 @@ class MockRepository(Repository):
     def getAllRisks(self) -> list[Risk] | str:
         return [self.mock_Risk] if not self._evaluateFail() else 'Error obtaining risks'
     
+    def streamRisks(self, filters: dict = None, *, with_country: bool = False) -> Iterator[Risk] | str:
+        if self._evaluateFail():
+            return 'Error obtaining risks'
+        elif self.empty:
+            return iter([])
+        else:
+            return iter([self.mock_Risk])
+    
+    def getRisksPage(self, after: int, limit: int) -> list[Risk] | str:
+        return [self.mock_Risk] if not self._evaluateFail() else 'Error obtaining risks'
+    
+    def countRisks(self, filters: dict = None) -> int | str:
+        return 1 if not self._evaluateFail() else 'Error counting risks'
+    
+    def queryRisks(self, filters: dict, *, after: int = None, limit: int = None) -> list[Risk] | str:
+        if self._evaluateFail():
+            return 'Error obtaining risks'
+        elif self.empty:
+            return []
+        else:
+            return [self.mock_Risk]
+    
     def getAllRisksWithUser(self) -> list[Risk] | str:
         return [self.mock_Risk] if not self._evaluateFail() else 'Error obtaining risks'
     
@@ -176,4 +288,28 @@ class MockRepository(Repository):
         return True if not self._evaluateFail() else 'Error relating risk with user'
     
     def unrelateRiskToUser(self, risk_id: int, user_id: int) -> bool | str:
-        return True if not self._evaluateFail() else 'Error unrelating risk with user'
\ No newline at end of file
+        return True if not self._evaluateFail() else 'Error unrelating risk with user'
+
+    def relateRisksToUsers(self, risk_id: int, user_ids: list[int]) -> int | str:
+        return len(user_ids) if not self._evaluateFail() else 'Error relating risk with users'
+
+    def unrelateRisksToUsers(self, risk_id: int, user_ids: list[int]) -> int | str:
+        return len(user_ids) if not self._evaluateFail() else 'Error unrelating risk with users'
+
+    def getFingerprint(self, resource: str) -> str | None:
+        return f'{resource}-1' if not self._evaluateFail() else None
+
+    def getRiskChanges(self, risks_since: datetime = None, providers_since: datetime = None, links_after: int = 0) -> dict | str:
+        if self._evaluateFail():
+            return 'Error obtaining the risk changes'
+
+        risks = [] if self.empty else [(self.mock_Risk.id, self.mock_Risk.provider_id, self.mock_Risk.probability, self.mock_Risk.impact, self.mock_Risk.updated_at)]
+        providers = [(self.mock_Provider.id, self.mock_Provider.country, self.mock_Provider.updated_at)]
+        links = [] if self.empty else [(index + 1, self.mock_Risk.id, user_id) for index, user_id in enumerate(self.mock_Risk.user_ids)]
+
+        return {
+            'risk': [row for row in risks if risks_since is None or row[4] >= risks_since],
+            'provider': [row for row in providers if providers_since is None or row[2] >= providers_since],
+            'risk_user': [row for row in links if row[0] > links_after],
+            'counts': {'risk': len(risks), 'provider': len(providers), 'risk_user': len(links)}
+        }
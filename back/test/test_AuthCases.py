@@ -24,11 +24,11 @@ class TestLoginUseCase:
 
     def test_user_not_found(self):
         # Arrange
-        email = 'test@test.com'
+        email = 'other@test.com'
         password = 'test'
 
         # Act
-        result = loginUseCase(MockRepository(fail=[True]), email, password)
+        result = loginUseCase(MockRepository(), email, password)
 
         # Assert
         assert result == 'User not found'
@@ -36,10 +36,10 @@ class TestLoginUseCase:
     def test_invalid_password(self):
         # Arrange
         email = 'test@test.com'
-        password = 'test'
+        password = 'wrong password'
 
         # Act
-        result = loginUseCase(MockRepository(fail=[False, True]), email, password)
+        result = loginUseCase(MockRepository(), email, password)
 
         # Assert
         assert result == 'The user cannot be validated'
@@ -53,7 +53,9 @@ class TestLoginUseCase:
         result = loginUseCase(MockRepository(), email, password)
 
         # Assert
-        assert result == True
+        assert isinstance(result, User)
+        assert result.email == email
+        assert result.roles == ['test']
 
 class TestRegisterUseCase:
     def test_invalid_email(self):
@@ -171,6 +173,26 @@ class TestGenerateJWTPairUseCase:
         assert jwt.decode(result[0], secrets["jwt"], algorithms=["HS256"])["email"] == payload["email"]
         assert jwt.decode(result[1], secrets["refresh"], algorithms=["HS256"])["email"] == payload["email"]
 
+    def test_refresh_claims(self):
+        # Arrange
+        secrets = {
+            "jwt": "secretforjwt",
+            "refresh": "secretforrefresh"
+        }
+        payload = {
+            "email": "test@test.com",
+            "roles": ["ADMIN"]
+        }
+
+        # Act
+        result = generateJWTPairUseCase(secrets, payload, refresh_claims=["email"])
+        refreshed = refreshUseCase(secrets, result[1])
+
+        # Assert
+        assert jwt.decode(result[0], secrets["jwt"], algorithms=["HS256"])["roles"] == ["ADMIN"]
+        assert "roles" not in jwt.decode(result[1], secrets["refresh"], algorithms=["HS256"])
+        assert "roles" not in jwt.decode(refreshed[0], secrets["jwt"], algorithms=["HS256"])
+
 class TestVerifyTokenUseCase:
     def test_invalid_token(self):
         # Arrange
@@ -202,6 +224,52 @@ class TestVerifyTokenUseCase:
         assert len(result) == 2
         assert result["email"] == payload["email"]
 
+    def test_cached_token(self):
+        # Arrange
+        cache = TokenCache()
+        payload = {
+            "email": "test@test.com",
+            "exp": datetime.now(tz=timezone.utc) + timedelta(minutes=5)
+        }
+        token = jwt.encode(payload, "secretforjwt", algorithm="HS256")
+
+        # Act
+        first = verifyTokenUseCase("secretforjwt", token, cache=cache)
+        second = verifyTokenUseCase("secretforjwt", token, cache=cache)
+
+        # Assert
+        assert first == second
+        assert cache.getStats()['hits'] == 1
+        assert cache.getStats()['misses'] == 1
+
+    def test_cache_expires_with_token(self):
+        # Arrange
+        cache = TokenCache()
+        token = jwt.encode({"email": "test@test.com"}, "secretforjwt", algorithm="HS256")
+
+        # Act
+        cache.put(token, {"email": "test@test.com", "exp": int(datetime.now(tz=timezone.utc).timestamp()) - 1}, 0.001)
+        result = cache.get(token)
+
+        # Assert
+        assert result is None
+        assert cache.getStats()['size'] == 0
+
+    def test_cache_evicts_least_recent(self):
+        # Arrange
+        cache = TokenCache(max_size=2)
+        exp = int((datetime.now(tz=timezone.utc) + timedelta(minutes=5)).timestamp())
+
+        # Act
+        cache.put("first", {"exp": exp}, 0.001)
+        cache.put("second", {"exp": exp}, 0.001)
+        cache.get("first")
+        cache.put("third", {"exp": exp}, 0.001)
+
+        # Assert
+        assert cache.get("first") is not None
+        assert cache.get("second") is None
+
 class TestRefreshUseCase:
     def test_invalid_parameters(self):
         # Arrange
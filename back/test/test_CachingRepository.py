@@ -0,0 +1,265 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.realpath(__name__))
+parent_dir = os.path.dirname(current_dir)
+
+sys.path.append(parent_dir)
+
+from src.gateways.CachingRepository import CachingRepository
+from src.gateways.CacheBackends import LRUCache, FileCache
+from src.gateways.GenerationCounter import GenerationCounter
+from src.entities.Role import Role
+from test.mockRepository import MockRepository
+
+class CountingRepository(MockRepository):
+    def __init__(self, fail: bool = None, empty: bool = False):
+        super().__init__(fail, empty)
+        self.calls = {}
+
+    def _count(self, name: str) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def getRoleById(self, id):
+        self._count('getRoleById')
+        return super().getRoleById(id)
+
+    def getAllProviders(self):
+        self._count('getAllProviders')
+        return super().getAllProviders()
+
+    def getUserByEmail(self, email):
+        self._count('getUserByEmail')
+        return super().getUserByEmail(email)
+
+    def getUserWithRoles(self, id):
+        self._count('getUserWithRoles')
+        return super().getUserWithRoles(id)
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        # Arrange
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+
+        # Act
+        cache.get('a')
+        cache.set('c', 3)
+
+        # Assert
+        assert cache.get('a') == (True, 1)
+        assert cache.get('b') == (False, None)
+        assert cache.getStats()['size'] == 2
+
+    def test_expires_entries(self):
+        # Arrange
+        cache = LRUCache(2, ttl=-1)
+
+        # Act
+        cache.set('a', 1)
+
+        # Assert
+        assert cache.get('a') == (False, None)
+
+class TestCachingRepository:
+    def test_caches_reads(self):
+        # Arrange
+        repository = CountingRepository()
+        caching = CachingRepository(repository)
+
+        # Act
+        first = caching.getRoleById(1)
+        second = caching.getRoleById(1)
+
+        # Assert
+        assert first == second == Role(1, 'test')
+        assert repository.calls['getRoleById'] == 1
+        assert caching.getStats()['roles_by_id']['hits'] == 1
+
+    def test_returns_copies(self):
+        # Arrange
+        repository = CountingRepository()
+        caching = CachingRepository(repository)
+
+        # Act
+        user = caching.getUserWithRoles(1)
+        user.name = 'changed'
+        user.roles.append('other')
+
+        # Assert
+        assert caching.getUserWithRoles(1).name != 'changed'
+        assert len(caching.getUserWithRoles(1).roles) == 1
+
+    def test_does_not_cache_errors(self):
+        # Arrange
+        repository = CountingRepository(fail=[True, False])
+        caching = CachingRepository(repository)
+
+        # Act
+        error = caching.getUserByEmail('test@test.com')
+        user = caching.getUserByEmail('test@test.com')
+
+        # Assert
+        assert error == 'Error obtaining user'
+        assert user.email == 'test@test.com'
+        assert repository.calls['getUserByEmail'] == 2
+
+    def test_user_writes_invalidate(self):
+        # Arrange
+        repository = CountingRepository()
+        caching = CachingRepository(repository)
+        user = caching.getUserByEmail('test@test.com')
+        caching.getUserWithRoles(user.id)
+
+        # Act
+        caching.updateUserData(user)
+        caching.getUserByEmail('test@test.com')
+        caching.getUserWithRoles(user.id)
+
+        # Assert
+        assert repository.calls['getUserByEmail'] == 2
+        assert repository.calls['getUserWithRoles'] == 2
+
+    def test_role_links_invalidate_only_the_users(self):
+        # Arrange
+        repository = CountingRepository()
+        caching = CachingRepository(repository)
+        caching.getUserWithRoles(1)
+        caching.getRoleById(1)
+
+        # Act
+        caching.linkRolesToUsers(1, [1])
+        caching.getUserWithRoles(1)
+        caching.getRoleById(1)
+
+        # Assert
+        assert repository.calls['getUserWithRoles'] == 2
+        assert repository.calls['getRoleById'] == 1
+
+    def test_provider_writes_invalidate(self):
+        # Arrange
+        repository = CountingRepository()
+        caching = CachingRepository(repository)
+        caching.getAllProviders()
+
+        # Act
+        caching.createProvider('new', 'description', 'COL')
+        caching.getAllProviders()
+
+        # Assert
+        assert repository.calls['getAllProviders'] == 2
+
+    def test_delegates_other_methods(self):
+        # Arrange
+        caching = CachingRepository(MockRepository())
+
+        # Act
+        risk = caching.getRiskById(1)
+
+        # Assert
+        assert risk.id == 1
+
+class TestFileCache:
+    def test_shared_between_instances(self, tmp_path):
+        # Arrange
+        path = str(tmp_path / 'cache.sqlite3')
+        writer = FileCache(path, 'roles', 10)
+        reader = FileCache(path, 'roles', 10)
+
+        # Act
+        writer.set(1, Role(1, 'test'))
+
+        # Assert
+        assert reader.get(1) == (True, Role(1, 'test'))
+        assert FileCache(path, 'providers', 10).get(1) == (False, None)
+
+    def test_evicts_oldest(self, tmp_path):
+        # Arrange
+        cache = FileCache(str(tmp_path / 'cache.sqlite3'), 'roles', 2)
+
+        # Act
+        for id in range(3):
+            cache.set(id, Role(id, 'test'))
+
+        # Assert
+        assert cache.get(0) == (False, None)
+        assert cache.getStats()['size'] == 2
+
+    def test_pop_where(self, tmp_path):
+        # Arrange
+        cache = FileCache(str(tmp_path / 'cache.sqlite3'), 'roles', 10)
+        cache.set('a', Role(1, 'a'))
+        cache.set('b', Role(2, 'b'))
+
+        # Act
+        cache.popWhere(lambda role: role.id == 1)
+
+        # Assert
+        assert cache.get('a') == (False, None)
+        assert cache.get('b')[0]
+
+    def test_private_files(self, tmp_path):
+        # Arrange
+        path = str(tmp_path / 'cache.sqlite3')
+        umask = os.umask(0o022)
+
+        # Act
+        try:
+            cache = FileCache(path, 'users_by_email', 10)
+            cache.set('test@test.com', Role(1, 'test'))
+        finally:
+            os.umask(umask)
+
+        # Assert
+        for file in [path, f'{path}-wal', f'{path}-shm']:
+            assert os.stat(file).st_mode & 0o777 == 0o600
+
+class TestGenerations:
+    def test_shared_between_instances(self, tmp_path):
+        # Arrange
+        path = str(tmp_path / 'generations')
+        writer = GenerationCounter(path, ['roles', 'users'])
+        reader = GenerationCounter(path, ['roles', 'users'])
+
+        # Act
+        writer.bump('roles')
+        writer.bump('roles', 'users')
+
+        # Assert
+        assert reader.getAll() == {'roles': 2, 'users': 1}
+
+    def test_bump_drops_other_workers_entries(self, tmp_path):
+        # Arrange
+        path = str(tmp_path / 'generations')
+        repository = CountingRepository()
+        worker = CachingRepository(repository, generations=GenerationCounter(path, ['users', 'roles']))
+        other = GenerationCounter(path, ['users', 'roles'])
+        worker.getRoleById(1)
+        worker.getUserWithRoles(1)
+
+        # Act
+        other.bump('roles')
+        worker.getRoleById(1)
+        worker.getUserWithRoles(1)
+        worker.getRoleById(1)
+
+        # Assert
+        assert repository.calls['getRoleById'] == 2
+        assert repository.calls['getUserWithRoles'] == 2
+
+    def test_shared_backend(self, tmp_path):
+        # Arrange
+        path = str(tmp_path / 'cache.sqlite3')
+        backend = lambda name, max_size, ttl: FileCache(path, name, max_size, ttl)
+        repository = CountingRepository()
+        first = CachingRepository(repository, backend=backend)
+        second = CachingRepository(repository, backend=backend)
+
+        # Act
+        first.getUserByEmail('test@test.com')
+        user = second.getUserByEmail('test@test.com')
+
+        # Assert
+        assert user.email == 'test@test.com'
+        assert repository.calls['getUserByEmail'] == 1
@@ -0,0 +1,297 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.realpath(__name__))
+parent_dir = os.path.dirname(current_dir)
+
+sys.path.append(parent_dir)
+
+from src.gateways.CountryAPI import CountryAPI
+from src.gateways.CircuitBreaker import CircuitBreaker
+from src.entities.Country import Country
+import json
+import threading
+import time
+
+# Nothing listens on this port, so any network call fails
+UNREACHABLE_URL = 'http://127.0.0.1:9'
+
+def _countryData(cca3: str, currency: str, language: str, capital: str, region: str, subregion: str) -> dict:
+    return {
+        'cca3': cca3,
+        'capital': [capital],
+        'region': region,
+        'subregion': subregion,
+        'population': 1000,
+        'name': {'common': cca3.title(), 'official': cca3},
+        'languages': {language[:3]: language},
+        'currencies': {currency: {'name': currency, 'symbol': '$'}},
+        'timezones': ['UTC-05:00']
+    }
+
+def _writeSnapshot(path) -> None:
+    with open(path, 'w') as f:
+        json.dump({
+            'fetched_at': 0,
+            'etag': '"test"',
+            'last_modified': None,
+            'countries': [
+                _countryData('COL', 'COP', 'Spanish', 'Bogotá', 'Americas', 'South America'),
+                _countryData('ARG', 'ARS', 'Spanish', 'Buenos Aires', 'Americas', 'South America'),
+                _countryData('FRA', 'EUR', 'French', 'Paris', 'Europe', 'Western Europe')
+            ]
+        }, f)
+
+class TestCountrySnapshot:
+    def test_lookup_from_snapshot(self, tmp_path):
+        # Arrange
+        path = tmp_path / 'countries.json'
+        _writeSnapshot(path)
+
+        # Act
+        api = CountryAPI(UNREACHABLE_URL, snapshot_path=str(path))
+        result = api.getCountryByCCA3('col')
+
+        # Assert
+        assert isinstance(result, Country)
+        assert result.cca3 == 'COL'
+        assert len(api.getAllCountries()) == 3
+
+    def test_unknown_code(self, tmp_path):
+        # Arrange
+        path = tmp_path / 'countries.json'
+        _writeSnapshot(path)
+
+        # Act
+        result = CountryAPI(UNREACHABLE_URL, snapshot_path=str(path)).getCountryByCCA3('xyz')
+
+        # Assert
+        assert result == 'Country Code not found'
+
+    def test_keeps_snapshot_when_refresh_fails(self, tmp_path):
+        # Arrange
+        path = tmp_path / 'countries.json'
+        _writeSnapshot(path)
+        api = CountryAPI(UNREACHABLE_URL, snapshot_path=str(path))
+
+        # Act
+        result = api.refreshSnapshot()
+
+        # Assert
+        assert isinstance(result, str)
+        assert api.getCountryByCCA3('FRA').cca3 == 'FRA'
+
+    def test_concurrent_snapshot_writes(self, tmp_path):
+        # Arrange
+        path = tmp_path / 'countries.json'
+        _writeSnapshot(path)
+        apis = [CountryAPI(UNREACHABLE_URL, snapshot_path=str(path)) for _ in range(4)]
+
+        # Act
+        threads = [threading.Thread(target=lambda api=api: [api._saveSnapshot() for _ in range(20)]) for api in apis]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        assert [file.name for file in tmp_path.iterdir()] == ['countries.json']
+        assert CountryAPI(UNREACHABLE_URL, snapshot_path=str(path)).getCountryByCCA3('COL').cca3 == 'COL'
+
+class TestCountryCatalog:
+    def test_lookups_without_network(self, tmp_path):
+        # Arrange
+        path = tmp_path / 'countries.json'
+        _writeSnapshot(path)
+        api = CountryAPI(UNREACHABLE_URL, snapshot_path=str(path))
+
+        # Act
+        by_currency = api.getCountriesByCurrency('cop')
+        by_language = api.getCountriesByLanguage('SPANISH')
+        by_capital = api.getCountriesByCapital('paris')
+        by_region = api.getCountriesByRegion('Americas')
+        by_subregion = api.getCountriesBySubregion('western europe')
+        by_list = api.getCountriesByListOfCCA3(['fra', 'col', 'xyz'])
+
+        # Assert
+        assert [country.cca3 for country in by_currency] == ['COL']
+        assert [country.cca3 for country in by_language] == ['COL', 'ARG']
+        assert [country.cca3 for country in by_capital] == ['FRA']
+        assert [country.cca3 for country in by_region] == ['COL', 'ARG']
+        assert [country.cca3 for country in by_subregion] == ['FRA']
+        assert [country.cca3 for country in by_list] == ['FRA', 'COL']
+
+    def test_no_matches(self, tmp_path):
+        # Arrange
+        path = tmp_path / 'countries.json'
+        _writeSnapshot(path)
+        api = CountryAPI(UNREACHABLE_URL, snapshot_path=str(path))
+
+        # Act
+        result = api.getCountriesByCurrency('xyz')
+
+        # Assert
+        assert result == []
+
+    def test_stable_etag(self, tmp_path):
+        # Arrange
+        path = tmp_path / 'countries.json'
+        _writeSnapshot(path)
+
+        # Act
+        first = CountryAPI(UNREACHABLE_URL, snapshot_path=str(path)).getCatalog().etag
+        second = CountryAPI(UNREACHABLE_URL, snapshot_path=str(path)).getCatalog().etag
+
+        # Assert
+        assert first == second
+
+    def test_country_codes_from_snapshot(self, tmp_path):
+        # Arrange
+        path = tmp_path / 'countries.json'
+        _writeSnapshot(path)
+
+        # Act
+        codes = CountryAPI(UNREACHABLE_URL, snapshot_path=str(path)).getCountryCodes()
+
+        # Assert
+        assert codes == {'COL', 'ARG', 'FRA'}
+
+    def test_country_codes_without_snapshot(self):
+        # Act
+        codes = CountryAPI(UNREACHABLE_URL).getCountryCodes()
+
+        # Assert
+        assert 'COL' in codes
+        assert 'SQL' not in codes
+
+class TestCircuitBreaker:
+    def test_opens_on_failure_rate(self):
+        # Arrange
+        breaker = CircuitBreaker(window=4, failure_rate=0.5, minimum_calls=4, open_seconds=60)
+
+        # Act
+        breaker.recordSuccess(0.01)
+        breaker.recordSuccess(0.01)
+        breaker.recordFailure()
+        breaker.recordFailure()
+
+        # Assert
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allowRequest()
+        assert breaker.getStats()['rejected'] == 1
+
+    def test_half_open_trial_closes(self):
+        # Arrange
+        breaker = CircuitBreaker(window=2, minimum_calls=1, open_seconds=0)
+        breaker.recordFailure()
+
+        # Act
+        first = breaker.allowRequest()
+        second = breaker.allowRequest()
+        breaker.recordSuccess(0.01)
+
+        # Assert
+        assert first and not second
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_unreachable_api_fails_fast(self):
+        # Arrange
+        breaker = CircuitBreaker(window=2, minimum_calls=2, open_seconds=60)
+        country_api = CountryAPI(UNREACHABLE_URL, retries=0, connect_timeout=0.5, breaker=breaker)
+
+        # Act
+        country_api.getCountryByCCA3('COL')
+        country_api.getCountryByCCA3('COL')
+        result = country_api.getCountryByCCA3('COL')
+
+        # Assert
+        assert result == 'The countries API is unavailable, try again later'
+        assert country_api.getStats()['breaker']['state'] == CircuitBreaker.OPEN
+
+    def test_unexpected_error_ends_trial(self):
+        # Arrange
+        breaker = CircuitBreaker(window=2, minimum_calls=1, open_seconds=0)
+        breaker.recordFailure()
+        country_api = CountryAPI(UNREACHABLE_URL, breaker=breaker)
+
+        def _failingGet(url, **kwargs):
+            raise TypeError('unexpected argument')
+
+        country_api._session.get = _failingGet
+
+        # Act
+        result = country_api.getCountryByCCA3('COL')
+
+        # Assert
+        assert result == 'Error connecting to the countries API: TypeError'
+        assert breaker.getStats()['failures'] == 2
+        # The trial failed and reopened the circuit, with open_seconds=0 the next trial is allowed at once
+        assert breaker.allowRequest()
+
+class TestCountryLookups:
+    def test_concurrent_lookups_share_request(self):
+        # Arrange
+        country_api = CountryAPI(UNREACHABLE_URL)
+        calls = []
+
+        def slowQuery(path, *, error_message=None):
+            calls.append(path)
+            time.sleep(0.2)
+            return [_countryData('COL', 'COP', 'Spanish', 'Bogotá', 'Americas', 'South America')]
+
+        country_api._queryAPI = slowQuery
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(country_api.getCountryByCCA3('col'))) for _ in range(5)]
+
+        # Act
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        assert calls == ['alpha/COL']
+        assert all(country.cca3 == 'COL' for country in results)
+        assert country_api.getStats()['lookups']['coalesced'] == 4
+
+    def test_remembers_not_found(self):
+        # Arrange
+        country_api = CountryAPI(UNREACHABLE_URL)
+        calls = []
+
+        def notFoundQuery(path, *, error_message=None):
+            calls.append(path)
+            return error_message
+
+        country_api._queryAPI = notFoundQuery
+
+        # Act
+        first = country_api.getCountryByCCA3('XYZ')
+        second = country_api.getCountryByCCA3('xyz')
+
+        # Assert
+        assert first == second == 'Country Code not found'
+        assert len(calls) == 1
+        assert country_api.getStats()['lookups']['negative_hits'] == 1
+
+    def test_does_not_remember_unreachable_api(self):
+        # Arrange
+        country_api = CountryAPI(UNREACHABLE_URL, retries=0)
+
+        # Act
+        country_api.getCountryByCCA3('COL')
+
+        # Assert
+        assert country_api.getStats()['lookups']['not_found_cached'] == 0
+
+    def test_not_found_expires(self):
+        # Arrange
+        country_api = CountryAPI(UNREACHABLE_URL, negative_ttl=0)
+        country_api._queryAPI = lambda path, *, error_message=None: error_message
+
+        # Act
+        country_api.getCountryByCCA3('XYZ')
+        country_api.getCountryByCCA3('XYZ')
+
+        # Assert
+        assert country_api.getStats()['lookups']['misses'] == 2
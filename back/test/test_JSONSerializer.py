@@ -0,0 +1,77 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.realpath(__name__))
+parent_dir = os.path.dirname(current_dir)
+
+sys.path.append(parent_dir)
+
+from src.gateways.JSONSerializer import JSONSerializer
+from src.entities.Risk import Risk
+from src.entities.User import User
+from src.entities.Role import Role
+from datetime import datetime, timezone, timedelta
+from werkzeug.http import http_date
+import src.gateways.JSONSerializer as serializer_module
+import json
+
+CREATED_AT = datetime(2023, 11, 2, 20, 2, 38)
+
+class TestJSONSerializer:
+    def test_same_as_asDict(self):
+        # Arrange
+        risks = [Risk(id, 1, f'risk {id}', 'description', 'HIGH', 'LOW', CREATED_AT, CREATED_AT + timedelta(days=id)) for id in range(3)]
+        serializer = JSONSerializer()
+
+        # Act
+        result = json.loads(serializer.dumps(risks))
+
+        # Assert
+        assert result == [json.loads(json.dumps(risk.asDict(), default=http_date)) for risk in risks]
+
+    def test_omits_private_fields(self):
+        # Arrange
+        user = User(1, 'test@test.com', 'hash', 'salt', 'test', password='test', roles=[Role(1, 'test')])
+        serializer = JSONSerializer()
+
+        # Act
+        result = json.loads(serializer.dumps(user))
+
+        # Assert
+        assert result == {'id': 1, 'email': 'test@test.com', 'name': 'test', 'roles': [{'id': 1, 'name': 'test'}]}
+
+    def test_http_dates(self):
+        # Arrange
+        aware = datetime(2023, 11, 2, 22, 2, 38, tzinfo=timezone(timedelta(hours=2)))
+        serializer = JSONSerializer()
+
+        # Act
+        result = json.loads(serializer.dumps({'naive': CREATED_AT, 'aware': aware}))
+
+        # Assert
+        assert result == {'naive': 'Thu, 02 Nov 2023 20:02:38 GMT', 'aware': 'Thu, 02 Nov 2023 20:02:38 GMT'}
+
+    def test_stdlib_fallback(self, monkeypatch):
+        # Arrange
+        payload = {'data': [Role(1, 'test', CREATED_AT)], 'next': None}
+        serializer = JSONSerializer()
+        fast = serializer.dumps(payload)
+
+        # Act
+        monkeypatch.setattr(serializer_module, 'orjson', None)
+        result = serializer.dumps(payload)
+
+        # Assert
+        assert result == b'{"data":[{"created_at":"Thu, 02 Nov 2023 20:02:38 GMT","id":1,"name":"test"}],"next":null}\n'
+        assert json.loads(result) == json.loads(fast)
+
+    def test_unserializable(self):
+        # Arrange
+        serializer = JSONSerializer()
+
+        # Act / Assert
+        try:
+            serializer.dumps({'value': object()})
+            assert False
+        except TypeError:
+            pass
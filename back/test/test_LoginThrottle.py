@@ -0,0 +1,62 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.realpath(__name__))
+parent_dir = os.path.dirname(current_dir)
+
+sys.path.append(parent_dir)
+
+from src.gateways.LoginThrottle import LoginThrottle, SlidingWindowCounter
+
+class TestLoginThrottle:
+    def test_throttles_email(self):
+        # Arrange
+        throttle = LoginThrottle(email_limit=2, ip_limit=10)
+
+        # Act
+        results = [throttle.allowAttempt('Test@test.com', f'10.0.0.{ip}') for ip in range(3)]
+
+        # Assert
+        assert results[:2] == [True, True]
+        assert results[2] == 'Too many login attempts for this user, try again later'
+        assert throttle.getStats()['throttled_email'] == 1
+
+    def test_throttles_ip(self):
+        # Arrange
+        throttle = LoginThrottle(email_limit=10, ip_limit=2)
+
+        # Act
+        results = [throttle.allowAttempt(f'user{id}@test.com', '10.0.0.1') for id in range(3)]
+
+        # Assert
+        assert results[2] == 'Too many login attempts from this address, try again later'
+        assert throttle.getStats()['throttled_ip'] == 1
+
+    def test_bounded_keys(self):
+        # Arrange
+        throttle = LoginThrottle(max_keys=100)
+
+        # Act
+        for id in range(1000):
+            throttle.allowAttempt(f'user{id}@test.com', f'10.0.{id // 256}.{id % 256}')
+
+        # Assert
+        stats = throttle.getStats()
+        assert stats['tracked_emails'] == 100
+        assert stats['tracked_ips'] == 100
+        assert stats['evicted'] == 1800
+
+class TestSlidingWindowCounter:
+    def test_previous_window_weight(self):
+        # Arrange
+        counter = SlidingWindowCounter(10, 60, 10)
+        for _ in range(4):
+            counter.add('key', 30)
+
+        # Act
+        halfway = counter.estimate('key', 90)
+        expired = counter.estimate('key', 150)
+
+        # Assert
+        assert halfway == 2
+        assert expired == 0
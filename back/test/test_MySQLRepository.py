@@ -0,0 +1,314 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.realpath(__name__))
+parent_dir = os.path.dirname(current_dir)
+
+sys.path.append(parent_dir)
+
+import json
+import mysql.connector.pooling
+from src.gateways.MySQLRepository import MySQLRepository
+from src.entities.Role import Role
+from src.gateways.PasswordHasher import BUSY_MESSAGE
+from src.gateways.JSONSerializer import JSONSerializer
+
+class FakeCursor:
+    def __init__(self, connection) -> None:
+        self.connection = connection
+        self.lastrowid = None
+        self.rowcount = 0
+        self._rows = []
+
+    def execute(self, query: str, params: tuple = None) -> None:
+        self.connection.pool.queries.append((query, params))
+
+        if self.connection.pool.fail_query is not None and self.connection.pool.fail_query in query:
+            raise Exception('Query failed')
+
+        if params and self.connection.pool.duplicate in params:
+            raise mysql.connector.errors.IntegrityError(msg='Duplicate entry', errno=mysql.connector.errorcode.ER_DUP_ENTRY)
+
+        self._rows = list(self.connection.pool.rows)
+        self.rowcount = self.connection.pool.rowcount
+
+    def executemany(self, query: str, rows: list[tuple]) -> None:
+        # Sent as one multi-row statement, a duplicate rejects all of it
+        self.connection.pool.queries.append((query, rows))
+
+        if any(self.connection.pool.duplicate in row for row in rows):
+            raise mysql.connector.errors.IntegrityError(msg='Duplicate entry', errno=mysql.connector.errorcode.ER_DUP_ENTRY)
+
+        self.rowcount = len(rows)
+
+    def fetchmany(self, size: int) -> list[tuple]:
+        self.connection.pool.fetches.append(size)
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def fetchall(self) -> list[tuple]:
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchone(self) -> tuple:
+        return self._rows[0] if self._rows else None
+
+class FakeConnection:
+    def __init__(self, pool) -> None:
+        self.pool = pool
+        self.consumed = False
+        self.closed = False
+        self.committed = False
+        self.rolled_back = False
+
+    def cursor(self, buffered: bool = None) -> FakeCursor:
+        return FakeCursor(self)
+
+    def start_transaction(self) -> None:
+        pass
+
+    def commit(self) -> None:
+        self.committed = True
+
+    def rollback(self) -> None:
+        self.rolled_back = True
+
+    def consume_results(self) -> None:
+        self.consumed = True
+
+    def close(self) -> None:
+        self.closed = True
+
+class FakePool:
+    def __init__(self, rows: list[tuple] = None, *, size: int = 5, fail_query: str = None, rowcount: int = 0, duplicate: str = None) -> None:
+        self.rows = rows or []
+        self.rowcount = rowcount
+        self.duplicate = duplicate
+        self.size = size
+        self.fail_query = fail_query
+        self.connections = []
+        self.queries = []
+        self.fetches = []
+
+    @property
+    def checked_out(self) -> int:
+        return sum(1 for connection in self.connections if not connection.closed)
+
+    def get_connection(self) -> FakeConnection:
+        if self.checked_out >= self.size:
+            raise mysql.connector.errors.PoolError('Failed getting connection; pool exhausted')
+
+        connection = FakeConnection(self)
+        self.connections.append(connection)
+        return connection
+
+def _repository(monkeypatch, pool: FakePool) -> MySQLRepository:
+    monkeypatch.setattr(mysql.connector.pooling, 'MySQLConnectionPool', lambda **config: pool)
+    return MySQLRepository({})
+
+class TestStreamDB:
+    def test_fetches_in_batches(self, monkeypatch):
+        pool = FakePool([(id, f'role {id}') for id in range(1, 6)])
+        repository = _repository(monkeypatch, pool)
+
+        stream = repository._streamDB('SELECT `id`, `name` FROM `role`', factory=Role, batch_size=2)
+        roles = list(stream)
+
+        assert [role.id for role in roles] == [1, 2, 3, 4, 5]
+        assert all(isinstance(role, Role) for role in roles)
+        assert pool.fetches == [2, 2, 2, 2]
+        assert pool.connections[0].closed
+
+    def test_connection_taken_when_started(self, monkeypatch):
+        pool = FakePool([(1, 'role')])
+        repository = _repository(monkeypatch, pool)
+
+        stream = repository._streamDB('SELECT `id`, `name` FROM `role`', factory=Role)
+
+        # The query already ran, the connection is held until the rows are consumed
+        assert len(pool.queries) == 1
+        assert pool.checked_out == 1
+
+        list(stream)
+        assert pool.checked_out == 0
+
+    def test_early_close_returns_connection(self, monkeypatch):
+        pool = FakePool([(id, f'role {id}') for id in range(1, 6)])
+        repository = _repository(monkeypatch, pool)
+
+        stream = repository._streamDB('SELECT `id`, `name` FROM `role`', factory=Role, batch_size=2)
+        assert next(stream).id == 1
+        stream.close()
+
+        assert pool.connections[0].consumed
+        assert pool.connections[0].closed
+
+    def test_abandoned_stream_returns_connection(self, monkeypatch):
+        pool = FakePool([(id, f'role {id}') for id in range(1, 6)])
+        repository = _repository(monkeypatch, pool)
+
+        stream = repository._streamDB('SELECT `id`, `name` FROM `role`', factory=Role, batch_size=2)
+        next(stream)
+        del stream
+
+        assert pool.connections[0].consumed
+        assert pool.checked_out == 0
+
+    def test_query_error(self, monkeypatch):
+        pool = FakePool(fail_query='SELECT')
+        repository = _repository(monkeypatch, pool)
+
+        result = repository._streamDB('SELECT `id`, `name` FROM `role`', factory=Role, error_message='Error obtaining roles')
+
+        assert result == 'Error obtaining roles'
+        assert pool.checked_out == 0
+
+class TestPoolExhaustion:
+    def test_streams_hold_connections(self, monkeypatch):
+        pool = FakePool([(1, 'role')], size=2)
+        repository = _repository(monkeypatch, pool)
+
+        streams = [repository._streamDB('SELECT `id`, `name` FROM `role`', factory=Role) for _ in range(2)]
+
+        assert repository._streamDB('SELECT `id`, `name` FROM `role`', factory=Role) == BUSY_MESSAGE
+        assert repository._queryDB('SELECT `id`, `name` FROM `role`', fetch_all=True) == BUSY_MESSAGE
+        assert repository._executeMany('INSERT INTO `role` (`name`) VALUES (%s)', [('role',)]) == BUSY_MESSAGE
+
+        # A finished stream gives its connection back
+        list(streams[0])
+        assert repository._queryDB('SELECT `id`, `name` FROM `role`', fetch_all=True) == [(1, 'role')]
+
+class TestCreateProviders:
+    PROVIDERS = [(f'provider {id}', 'test provider', 'COL') for id in range(5)]
+
+    def test_inserts_in_chunks(self, monkeypatch):
+        pool = FakePool()
+        repository = _repository(monkeypatch, pool)
+
+        result = repository.createProviders(self.PROVIDERS, chunk_size=2)
+
+        assert result == (5, [])
+        assert [len(rows) for _, rows in pool.queries] == [2, 2, 1]
+        assert pool.connections[0].committed
+
+    def test_reports_duplicates_per_row(self, monkeypatch):
+        pool = FakePool(rowcount=1, duplicate='provider 3')
+        repository = _repository(monkeypatch, pool)
+
+        result = repository.createProviders(self.PROVIDERS, chunk_size=2)
+
+        # Only the chunk with the taken name is sent again row by row
+        assert result == (4, [3])
+        assert [len(params) for _, params in pool.queries] == [2, 2, 3, 3, 1]
+        assert pool.connections[0].committed
+
+    def test_other_errors_roll_back(self, monkeypatch):
+        pool = FakePool(fail_query='INSERT')
+        repository = _repository(monkeypatch, pool)
+        monkeypatch.setattr(FakeCursor, 'executemany', FakeCursor.execute)
+
+        result = repository.createProviders(self.PROVIDERS)
+
+        assert result == 'Error creating providers'
+        assert pool.connections[0].rolled_back
+
+class TestCreateRisks:
+    RISKS = [(1, f'risk {id}', 'test risk', 'HIGH', 'LOW') for id in range(3)]
+
+    def test_links_the_batch_rows(self, monkeypatch):
+        pool = FakePool(rowcount=3)
+        repository = _repository(monkeypatch, pool)
+
+        result = repository.createRisks(self.RISKS, 7)
+
+        (insert, insert_params), (link, link_params) = pool.queries
+        batch = insert_params[5]
+        assert result == 3
+        assert len(batch) == 16
+        assert insert_params[5::6] == (batch,) * 3
+        # The links come from the rows tagged with the batch key, not from the returned ids
+        assert link == 'INSERT INTO `risk_user` (`risk_id`, `user_id`) SELECT `id`, %s FROM `risk` WHERE `batch` = %s'
+        assert link_params == (7, batch)
+        assert pool.connections[0].committed
+
+    def test_unique_batch_keys(self, monkeypatch):
+        pool = FakePool(rowcount=3)
+        repository = _repository(monkeypatch, pool)
+
+        repository.createRisks(self.RISKS, 7)
+        repository.createRisks(self.RISKS, 7)
+
+        assert pool.queries[1][1][1] != pool.queries[3][1][1]
+
+    def test_missing_links_roll_back(self, monkeypatch):
+        pool = FakePool(rowcount=2)
+        repository = _repository(monkeypatch, pool)
+
+        result = repository.createRisks(self.RISKS, 7)
+
+        assert result == 'Error creating risks'
+        assert pool.connections[0].rolled_back
+        assert not pool.connections[0].committed
+        assert pool.checked_out == 0
+
+class TestRisksSearch:
+    def test_substring_condition(self, monkeypatch):
+        repository = _repository(monkeypatch, FakePool())
+
+        condition, params, relevance = repository._compileSearch('sql')
+
+        # A substring match, so "MySQL outage" is still found, the index only ranks by word prefix
+        assert condition == '(`risk`.`name` LIKE %s OR `risk`.`description` LIKE %s)'
+        assert params == ['%sql%', '%sql%']
+        assert relevance == ('MATCH(`risk`.`name`, `risk`.`description`) AGAINST (%s IN BOOLEAN MODE)', '+sql*')
+
+    def test_short_words_not_ranked(self, monkeypatch):
+        repository = _repository(monkeypatch, FakePool())
+
+        condition, params, relevance = repository._compileSearch('db leak')
+
+        assert params == ['%db leak%', '%db leak%']
+        assert relevance is None
+
+    def test_ranked_search(self, monkeypatch):
+        pool = FakePool()
+        repository = _repository(monkeypatch, pool)
+
+        repository.getRisksByString('sql injection')
+
+        query, params = pool.queries[0]
+        assert 'WHERE (`risk`.`name` LIKE %s OR `risk`.`description` LIKE %s) ORDER BY MATCH' in query
+        assert params == ('%sql injection%', '%sql injection%', '+sql* +injection*')
+
+    def test_pages_keep_the_id_order(self, monkeypatch):
+        pool = FakePool()
+        repository = _repository(monkeypatch, pool)
+
+        repository.queryRisks({'string': 'sql'}, after=10, limit=5)
+
+        query, params = pool.queries[0]
+        assert 'MATCH' not in query
+        assert params == ('%sql%', '%sql%', 10, 5)
+
+class TestUserRoles:
+    ROWS = [
+        (1, 'test@test.com', 'hash', 'salt', 'test', None, None, 'ADMIN'),
+        (1, 'test@test.com', 'hash', 'salt', 'test', None, None, 'USER')
+    ]
+
+    def test_login_and_profile_roles_match(self, monkeypatch):
+        repository = _repository(monkeypatch, FakePool(self.ROWS))
+        monkeypatch.setattr(repository, '_checkPassword', lambda password, stored_hash: True)
+
+        verified = repository.verifyCredentials('test@test.com', 'test password')
+        loaded = repository.getUserWithRoles(1)
+
+        # The login claims and the /users/<id> response are built from the same role names
+        assert verified.roles == loaded.roles == ['ADMIN', 'USER']
+        assert json.loads(JSONSerializer().dumps(verified)) == json.loads(JSONSerializer().dumps(loaded))
+
+    def test_user_without_roles(self, monkeypatch):
+        repository = _repository(monkeypatch, FakePool([(*self.ROWS[0][:-1], None)]))
+        monkeypatch.setattr(repository, '_checkPassword', lambda password, stored_hash: True)
+
+        assert repository.verifyCredentials('test@test.com', 'test password').roles == []
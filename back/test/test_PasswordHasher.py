@@ -0,0 +1,87 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.realpath(__name__))
+parent_dir = os.path.dirname(current_dir)
+
+sys.path.append(parent_dir)
+
+from src.gateways.PasswordHasher import PasswordHasher, HashingError, HasherBusyError
+import threading
+import time
+import pytest
+
+class TestPasswordHasher:
+    def test_hash_and_check(self):
+        # Arrange
+        hasher = PasswordHasher(workers=1, cost=4)
+
+        # Act
+        hashed_password, salt = hasher.hash('test password')
+        valid = hasher.check('test password', hashed_password)
+        invalid = hasher.check('other password', hashed_password)
+        hasher.shutdown()
+
+        # Assert
+        assert hashed_password.startswith(salt)
+        assert valid and not invalid
+        assert hasher.getStats()['completed'] == 3
+
+    def test_empty_password(self):
+        # Arrange
+        hasher = PasswordHasher(workers=1, cost=4)
+
+        # Act / Assert
+        with pytest.raises(HashingError):
+            hasher.hash('')
+
+    def test_sheds_load_when_saturated(self):
+        # Arrange
+        hasher = PasswordHasher(workers=1, max_pending=0, cost=14)
+        worker = threading.Thread(target=hasher.hash, args=('test password',))
+        worker.start()
+        while hasher.getStats()['in_flight'] == 0:
+            time.sleep(0.01)
+
+        # Act
+        with pytest.raises(HasherBusyError):
+            hasher.check('test password', 'test hash')
+        worker.join()
+        hasher.shutdown()
+
+        # Assert
+        assert hasher.getStats()['rejected'] == 1
+
+    def test_timed_out_job_keeps_its_slot(self):
+        # Arrange
+        hasher = PasswordHasher(workers=1, max_pending=0, cost=4)
+        hasher.hash('warm up password')
+        hasher.cost = 14
+        hasher.timeout = 0.05
+
+        # Act
+        with pytest.raises(HasherBusyError):
+            hasher.hash('test password')
+        with pytest.raises(HasherBusyError):
+            hasher.check('test password', 'test hash')
+        stats = hasher.getStats()
+
+        # The slot is released once the slow bcrypt leaves the pool
+        deadline = time.monotonic() + 30
+        while hasher.getStats()['in_flight'] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        hasher.shutdown()
+
+        # Assert
+        assert stats['in_flight'] == 1
+        assert stats['rejected'] == 1
+        assert stats['timed_out'] == 1
+        assert stats['completed'] == 1
+        assert hasher.getStats()['in_flight'] == 0
+
+    def test_calibrated_cost_in_bounds(self):
+        # Act
+        cost = PasswordHasher.calibrateCost(0.001, min_cost=4, max_cost=6)
+
+        # Assert
+        assert 4 <= cost <= 6
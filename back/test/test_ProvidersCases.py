@@ -9,6 +9,7 @@ sys.path.append(parent_dir)
 from test.mockRepository import MockRepository
 from src.gateways.CountryAPI import CountryAPI
 from src.use_cases.ProvidersCases import *
+from test.test_CountryAPI import UNREACHABLE_URL, _writeSnapshot
 from dotenv import dotenv_values
 
 config = dotenv_values(".env")
@@ -74,6 +75,83 @@ class TestCreateProviderUseCase:
         # Assert
         assert result == True
 
+class TestCreateProvidersBulkUseCase:
+    def test_empty_upload(self):
+        # Act
+        result = createProvidersBulkUseCase(MockRepository(), CountryAPI(UNREACHABLE_URL), [])
+
+        # Assert
+        assert result == 'At least one provider must be provided'
+
+    def test_rows_errors(self, tmp_path):
+        # Arrange
+        path = tmp_path / 'countries.json'
+        _writeSnapshot(path)
+        repository = MockRepository()
+        repository.mock_Provider.name = 'stored provider'
+        rows = [
+            {'name': 'new provider', 'description': 'test provider', 'country': 'col'},
+            {'name': 'test', 'description': 'test provider', 'country': 'COL'},
+            {'name': 'new provider', 'description': 'test provider', 'country': 'ARG'},
+            {'name': 'other provider', 'description': 'test provider', 'country': 'XYZ'},
+            {'name': 'stored provider', 'description': 'test provider', 'country': 'FRA'},
+            'test'
+        ]
+
+        # Act
+        result = createProvidersBulkUseCase(repository, CountryAPI(UNREACHABLE_URL, snapshot_path=str(path)), rows)
+
+        # Assert
+        assert result == {
+            'created': 1,
+            'errors': [
+                {'row': 1, 'error': 'Name must have at least 5 characters'},
+                {'row': 2, 'error': 'Provider repeated in the upload'},
+                {'row': 3, 'error': 'Country Code not found'},
+                {'row': 4, 'error': 'Provider already registered'},
+                {'row': 5, 'error': 'Row must have a name, a description and a country'}
+            ]
+        }
+
+    def test_collation_duplicates(self, tmp_path):
+        # Arrange
+        path = tmp_path / 'countries.json'
+        _writeSnapshot(path)
+        repository = MockRepository()
+        repository.mock_Provider.name = 'Telefónica Colombia'
+        rows = [
+            {'name': 'Acme provider', 'description': 'test provider', 'country': 'COL'},
+            {'name': 'test', 'description': 'test provider', 'country': 'COL'},
+            {'name': 'ACME PROVIDER ', 'description': 'test provider', 'country': 'COL'},
+            {'name': 'telefonica colombia', 'description': 'test provider', 'country': 'ARG'},
+            {'name': ' Acme provider', 'description': 'test provider', 'country': 'FRA'}
+        ]
+
+        # Act
+        result = createProvidersBulkUseCase(repository, CountryAPI(UNREACHABLE_URL, snapshot_path=str(path)), rows)
+
+        # Assert
+        assert result == {
+            'created': 2,
+            'errors': [
+                {'row': 1, 'error': 'Name must have at least 5 characters'},
+                {'row': 2, 'error': 'Provider already registered'},
+                {'row': 3, 'error': 'Provider already registered'}
+            ]
+        }
+
+    def test_insert_error(self, tmp_path):
+        # Arrange
+        path = tmp_path / 'countries.json'
+        _writeSnapshot(path)
+        rows = [{'name': 'new provider', 'description': 'test provider', 'country': 'COL'}]
+
+        # Act
+        result = createProvidersBulkUseCase(MockRepository(fail=[False, True]), CountryAPI(UNREACHABLE_URL, snapshot_path=str(path)), rows)
+
+        # Assert
+        assert result == 'Error creating providers'
+
 class TestUpdateProviderUseCase:
     def test_invalid_name(self):
         # Arrange
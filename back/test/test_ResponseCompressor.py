@@ -0,0 +1,104 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.realpath(__name__))
+parent_dir = os.path.dirname(current_dir)
+
+sys.path.append(parent_dir)
+
+from flask import Flask, Response, jsonify
+from src.gateways.ResponseCompressor import ResponseCompressor
+import gzip
+
+def _app(min_size: int = 1024) -> Flask:
+    app = Flask(__name__)
+    ResponseCompressor(min_size=min_size).init_app(app)
+
+    @app.route('/large')
+    def large():
+        response = jsonify([{'id': id, 'description': 'a repeated description'} for id in range(200)])
+        response.set_etag('version')
+        return response
+
+    @app.route('/small')
+    def small():
+        return jsonify({'id': 1})
+
+    @app.route('/stream')
+    def stream():
+        return Response((f'{id},risk {id}\n' for id in range(1000)), mimetype='text/csv')
+
+    @app.route('/binary')
+    def binary():
+        return Response(b'\x00' * 4096, mimetype='application/vnd.apache.parquet')
+
+    return app
+
+class TestResponseCompressor:
+    def test_compresses_large_responses(self):
+        # Arrange
+        client = _app().test_client()
+
+        # Act
+        identity = client.get('/large')
+        compressed = client.get('/large', headers={'Accept-Encoding': 'gzip'})
+
+        # Assert
+        assert compressed.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in compressed.headers['Vary']
+        assert gzip.decompress(compressed.data) == identity.data
+        assert len(compressed.data) < len(identity.data)
+
+    def test_weakens_etag(self):
+        # Arrange
+        client = _app().test_client()
+
+        # Act
+        identity = client.get('/large')
+        compressed = client.get('/large', headers={'Accept-Encoding': 'gzip'})
+
+        # Assert
+        assert identity.headers['ETag'] == '"version"'
+        assert compressed.headers['ETag'] == 'W/"version"'
+
+    def test_skips_small_responses(self):
+        # Arrange
+        client = _app().test_client()
+
+        # Act
+        response = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+
+        # Assert
+        assert 'Content-Encoding' not in response.headers
+
+    def test_skips_unaccepted_encodings(self):
+        # Arrange
+        client = _app().test_client()
+
+        # Act
+        response = client.get('/large', headers={'Accept-Encoding': 'identity'})
+
+        # Assert
+        assert 'Content-Encoding' not in response.headers
+
+    def test_skips_binary_types(self):
+        # Arrange
+        client = _app().test_client()
+
+        # Act
+        response = client.get('/binary', headers={'Accept-Encoding': 'gzip'})
+
+        # Assert
+        assert 'Content-Encoding' not in response.headers
+
+    def test_compresses_streams(self):
+        # Arrange
+        client = _app().test_client()
+
+        # Act
+        response = client.get('/stream', headers={'Accept-Encoding': 'gzip'})
+
+        # Assert
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Content-Length' not in response.headers
+        assert gzip.decompress(response.data).decode('utf-8') == ''.join(f'{id},risk {id}\n' for id in range(1000))
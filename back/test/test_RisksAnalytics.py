@@ -0,0 +1,167 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.realpath(__name__))
+parent_dir = os.path.dirname(current_dir)
+
+sys.path.append(parent_dir)
+
+import pytest
+
+# The analytics are only available with numpy installed
+pytest.importorskip('numpy')
+
+from datetime import datetime, timedelta
+from src.entities.Repositories import Repository
+from src.gateways.RisksAnalytics import RisksAnalytics
+from src.use_cases.RisksCases import getRisksAnalyticsUseCase
+from test.mockRepository import MockRepository
+
+START = datetime(2023, 1, 1, 10)
+
+class TableRepository(MockRepository):
+    def __init__(self, fail: bool = None, empty: bool = False):
+        super().__init__(fail, empty)
+        self.risks = {
+            1: (1, 1, 'HIGH', 'LOW', START),
+            2: (2, 1, 'HIGH', 'LOW', START),
+            3: (3, 2, 'LOW', 'VERY_HIGH', START),
+            4: (4, None, 'MEDIUM', 'MEDIUM', START)
+        }
+        self.providers = {
+            1: (1, 'COL', START),
+            2: (2, 'ARG', START)
+        }
+        self.links = {
+            1: (1, 1, 10),
+            2: (2, 1, 10),
+            3: (3, 1, 20),
+            4: (4, 3, 20)
+        }
+        self.calls = []
+
+    def getRiskChanges(self, risks_since=None, providers_since=None, links_after=0):
+        self.calls.append((risks_since, providers_since, links_after))
+
+        return {
+            'risk': [row for row in self.risks.values() if risks_since is None or row[4] >= risks_since],
+            'provider': [row for row in self.providers.values() if providers_since is None or row[2] >= providers_since],
+            'risk_user': [row for row in self.links.values() if row[0] > links_after],
+            'counts': {'risk': len(self.risks), 'provider': len(self.providers), 'risk_user': len(self.links)}
+        }
+
+def _refreshed(repository: TableRepository, analytics: RisksAnalytics = None) -> RisksAnalytics:
+    analytics = analytics or RisksAnalytics(overlap=0)
+    assert analytics.refresh(repository.getRiskChanges) is True
+    return analytics
+
+class TestRisksAnalytics:
+    def test_groups_by_classification(self):
+        analytics = _refreshed(TableRepository())
+
+        result = analytics.groupBy(['probability', 'impact'])
+
+        assert result['total'] == 4
+        assert result['groups'] == [
+            {'probability': 'LOW', 'impact': 'VERY_HIGH', 'count': 1},
+            {'probability': 'MEDIUM', 'impact': 'MEDIUM', 'count': 1},
+            {'probability': 'HIGH', 'impact': 'LOW', 'count': 2}
+        ]
+
+    def test_groups_by_provider_and_country(self):
+        analytics = _refreshed(TableRepository())
+
+        assert analytics.groupBy(['provider'])['groups'] == [
+            {'provider': None, 'count': 1},
+            {'provider': 1, 'count': 2},
+            {'provider': 2, 'count': 1}
+        ]
+        assert analytics.groupBy(['country'])['groups'] == [
+            {'country': None, 'count': 1},
+            {'country': 'ARG', 'count': 1},
+            {'country': 'COL', 'count': 2}
+        ]
+
+    def test_groups_by_user_once_per_pair(self):
+        analytics = _refreshed(TableRepository())
+
+        result = analytics.groupBy(['user', 'probability'])
+
+        # The repeated link of the risk 1 counts once and the risks without users are left out
+        assert result['total'] == 3
+        assert result['groups'] == [
+            {'user': 10, 'probability': 'HIGH', 'count': 1},
+            {'user': 20, 'probability': 'LOW', 'count': 1},
+            {'user': 20, 'probability': 'HIGH', 'count': 1}
+        ]
+
+    def test_reads_only_the_changes(self):
+        repository = TableRepository()
+        analytics = _refreshed(repository)
+
+        repository.risks[2] = (2, 2, 'VERY_LOW', 'LOW', START + timedelta(minutes=1))
+        repository.risks[5] = (5, 2, 'VERY_LOW', 'LOW', START + timedelta(minutes=1))
+        repository.links[5] = (5, 5, 30)
+        _refreshed(repository, analytics)
+
+        assert repository.calls[-1] == (START, START, 4)
+        assert analytics.groupBy(['provider', 'probability'])['groups'] == [
+            {'provider': None, 'probability': 'MEDIUM', 'count': 1},
+            {'provider': 1, 'probability': 'HIGH', 'count': 1},
+            {'provider': 2, 'probability': 'VERY_LOW', 'count': 2},
+            {'provider': 2, 'probability': 'LOW', 'count': 1}
+        ]
+        assert analytics.groupBy(['user'])['groups'][-1] == {'user': 30, 'count': 1}
+
+    def test_reads_again_the_tables_with_deletions(self):
+        repository = TableRepository()
+        analytics = _refreshed(repository)
+
+        del repository.risks[1]
+        del repository.providers[2]
+        _refreshed(repository, analytics)
+
+        assert repository.calls[-1] == (None, None, 4)
+        assert analytics.getStats()['full_reads'] == 2
+
+        # The risks of the deleted provider have no provider anymore
+        assert analytics.groupBy(['country'])['groups'] == [
+            {'country': None, 'count': 2},
+            {'country': 'COL', 'count': 1}
+        ]
+
+    def test_same_version_is_not_read(self):
+        repository = TableRepository()
+        analytics = RisksAnalytics()
+
+        analytics.refresh(repository.getRiskChanges, 'v1')
+        analytics.refresh(repository.getRiskChanges, 'v1')
+
+        assert len(repository.calls) == 1
+
+class TestGetRisksAnalyticsUseCase:
+    def test_valid_group(self):
+        result = getRisksAnalyticsUseCase(MockRepository(), RisksAnalytics(), ['probability', 'impact'])
+
+        assert result == {'total': 1, 'groups': [{'probability': 'VERY_LOW', 'impact': 'VERY_HIGH', 'count': 1}]}
+
+    def test_invalid_dimension(self):
+        result = getRisksAnalyticsUseCase(MockRepository(), RisksAnalytics(), ['name'])
+
+        assert isinstance(result, str)
+
+    def test_repository_error(self):
+        result = getRisksAnalyticsUseCase(MockRepository(fail=[True]), RisksAnalytics(), ['user'])
+
+        assert result == 'Error obtaining the risk changes'
+
+    def test_unsupported_repository(self):
+        # Arrange
+        repository = MockRepository()
+        repository.getRiskChanges = lambda **since: Repository.getRiskChanges(repository, **since)
+
+        # Act
+        result = getRisksAnalyticsUseCase(repository, RisksAnalytics(), ['provider'])
+
+        # Assert
+        assert result == 'The repository does not support the risks analytics'
@@ -0,0 +1,250 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.realpath(__name__))
+parent_dir = os.path.dirname(current_dir)
+
+sys.path.append(parent_dir)
+
+from test.mockRepository import MockRepository
+from src.use_cases.RisksCases import *
+from src.use_cases.RisksCases import _joinRisksLists
+
+class TestGetFilteredRisksUseCase:
+    def test_invalid_filter(self):
+        # Arrange
+        repository = MockRepository()
+
+        # Act
+        result = getFilteredRisksUseCase(repository, {'test': 'test'})
+
+        # Assert
+        assert result == 'Filter must be in provider_id, user_id, string, probability, impact or country'
+
+    def test_provider_not_found(self):
+        # Arrange
+        repository = MockRepository(fail=[True])
+
+        # Act
+        result = getFilteredRisksUseCase(repository, {'provider_id': 2})
+
+        # Assert
+        assert result == 'the user couldn\'t be retrieved'
+
+    def test_invalid_probability(self):
+        # Arrange
+        repository = MockRepository()
+
+        # Act
+        result = getFilteredRisksUseCase(repository, {'probability': 'test'})
+
+        # Assert
+        assert result == 'Probability must be in VERY_LOW, LOW, MEDIUM, HIGH or VERY_HIGH'
+
+    def test_invalid_country(self):
+        # Arrange
+        repository = MockRepository()
+
+        # Act
+        result = getFilteredRisksUseCase(repository, {'country': 'test'})
+
+        # Assert
+        assert result == 'Country must have 3 characters'
+
+    def test_query_error(self):
+        # Arrange
+        repository = MockRepository(fail=[False, True])
+
+        # Act
+        result = getFilteredRisksUseCase(repository, {'provider_id': 1, 'impact': 'VERY_HIGH'})
+
+        # Assert
+        assert result == 'Error obtaining risks'
+
+    def test_no_risks(self):
+        # Arrange
+        repository = MockRepository(empty=True)
+
+        # Act
+        result = getFilteredRisksUseCase(repository, {'probability': 'VERY_LOW'})
+
+        # Assert
+        assert result == []
+
+    def test_valid_filters(self):
+        # Arrange
+        repository = MockRepository()
+
+        # Act
+        result = getFilteredRisksUseCase(repository, {'provider_id': 1, 'user_id': 1, 'string': 'test', 'probability': 'VERY_LOW', 'impact': 'VERY_HIGH', 'country': 'col'})
+
+        # Assert
+        assert len(result) == 1
+        assert result[0].id == 1
+
+    def test_invalid_limit(self):
+        # Arrange
+        repository = MockRepository()
+
+        # Act
+        result = getFilteredRisksUseCase(repository, {}, after=0, limit=0)
+
+        # Assert
+        assert result == 'Limit must be greater than 0'
+
+    def test_unfiltered_page(self):
+        # Arrange
+        repository = MockRepository()
+
+        # Act
+        result = getFilteredRisksUseCase(repository, {}, after=0, limit=10)
+
+        # Assert
+        assert len(result) == 1
+        assert result[0].id == 1
+
+    def test_single_filter_queries_fallback(self):
+        # Arrange
+        repository = MockRepository()
+        repository.queryRisks = lambda filters, after=None, limit=None: None
+
+        # Act
+        result = getFilteredRisksUseCase(repository, {'provider_id': 1, 'probability': 'VERY_LOW'})
+
+        # Assert
+        assert len(result) == 1
+        assert result[0].id == 1
+
+class TestJoinRisksLists:
+    def test_invalid_new_list(self):
+        # Arrange
+        placeholder = [Risk(1, 1, 'test', 'test', 'LOW', 'LOW')]
+
+        # Act
+        result = _joinRisksLists(placeholder, 'Error obtaining risks')
+
+        # Assert
+        assert result == []
+
+    def test_keeps_placeholder_order(self):
+        # Arrange
+        placeholder = [Risk(id, 1, 'test', 'test', 'LOW', 'LOW') for id in range(1, 6)]
+        new = [Risk(id, 1, 'test', 'test', 'LOW', 'LOW') for id in [5, 2, 4]]
+
+        # Act
+        result = _joinRisksLists(placeholder, new)
+
+        # Assert
+        assert [risk.id for risk in result] == [2, 4, 5]
+
+    def test_selects_risk_with_more_values(self):
+        # Arrange
+        placeholder = [Risk(1, 1, 'test', 'test', 'LOW', 'LOW')]
+        new = [Risk(1, 1, 'test', 'test', 'LOW', 'LOW', country='COL')]
+
+        # Act
+        result = _joinRisksLists(placeholder, new)
+
+        # Assert
+        assert result[0].country == 'COL'
+
+class TestCountFilteredRisksUseCase:
+    def test_invalid_filter(self):
+        # Arrange
+        repository = MockRepository()
+
+        # Act
+        result = countFilteredRisksUseCase(repository, {'test': 'test'})
+
+        # Assert
+        assert result == 'Filter must be in provider_id, user_id, string, probability, impact or country'
+
+    def test_count_error(self):
+        # Arrange
+        repository = MockRepository(fail=[True])
+
+        # Act
+        result = countFilteredRisksUseCase(repository, {'impact': 'LOW'})
+
+        # Assert
+        assert result == 'Error counting risks'
+
+    def test_valid_count(self):
+        # Arrange
+        repository = MockRepository()
+
+        # Act
+        result = countFilteredRisksUseCase(repository, {'impact': 'LOW'})
+
+        # Assert
+        assert result == 1
+
+class TestExportRisksUseCase:
+    def test_invalid_filter(self):
+        # Arrange
+        repository = MockRepository()
+
+        # Act
+        result = exportRisksUseCase(repository, {'id': 1})
+
+        # Assert
+        assert result == 'Filter must be in provider_id, user_id, string, probability, impact or country'
+
+    def test_stream_error(self):
+        # Arrange
+        repository = MockRepository(fail=[True])
+
+        # Act
+        result = exportRisksUseCase(repository, {'impact': 'LOW'})
+
+        # Assert
+        assert result == 'Error obtaining risks'
+
+    def test_valid_export(self):
+        # Arrange
+        repository = MockRepository()
+
+        # Act
+        result = list(exportRisksUseCase(repository, {'impact': 'LOW'}))
+
+        # Assert
+        assert len(result) == 1
+        assert result[0].id == 1
+
+class TestIngestRisksUseCase:
+    def _row(self, **overrides) -> dict:
+        return {'provider_id': 1, 'name': 'test risk name', 'description': 'test risk description', 'probability': 'LOW', 'impact': 'HIGH', **overrides}
+
+    def test_user_not_found(self):
+        # Arrange
+        repository = MockRepository(fail=[True])
+
+        # Act
+        result = ingestRisksUseCase(repository, [self._row()], 'test@test.com')
+
+        # Assert
+        assert result == 'Error obtaining user'
+
+    def test_rows_errors(self):
+        # Arrange
+        repository = MockRepository()
+        rows = [self._row(), None, self._row(probability='test'), self._row(provider_id=2), self._row(name='test'), self._row()]
+
+        # Act
+        result = ingestRisksUseCase(repository, iter(rows), 'test@test.com', chunk_size=2)
+
+        # Assert
+        assert result['created'] == 2
+        assert result['rejected'] == 4
+        assert sorted(error['row'] for error in result['errors']) == [1, 2, 3, 4]
+
+    def test_failed_chunk(self):
+        # Arrange
+        repository = MockRepository(fail=[False, False, True])
+
+        # Act
+        result = ingestRisksUseCase(repository, [self._row(), self._row(), self._row()], 'test@test.com', chunk_size=2)
+
+        # Assert
+        assert result['created'] == 1
+        assert result['errors'] == [{'row': 0, 'error': 'Error creating risks'}, {'row': 1, 'error': 'Error creating risks'}]
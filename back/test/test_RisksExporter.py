@@ -0,0 +1,118 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.realpath(__name__))
+parent_dir = os.path.dirname(current_dir)
+
+sys.path.append(parent_dir)
+
+import csv
+import io
+import json
+import pytest
+from datetime import datetime
+from src.entities.Risk import Risk
+from src.gateways.RisksExporter import RisksExporter, ExportError
+import src.gateways.RisksExporter as exporter_module
+
+CREATED_AT = datetime(2023, 1, 1, 10)
+
+def _risks(size: int) -> list[Risk]:
+    return [
+        Risk(id, id % 3 + 1, f'risk {id}', f'description {id}', 'HIGH', 'LOW', CREATED_AT, CREATED_AT, 'COL')
+        for id in range(1, size + 1)
+    ]
+
+class ClosingSource:
+    """
+    Iterator over the risks that records if it was closed, as the repository streams do
+    """
+    def __init__(self, risks: list[Risk]) -> None:
+        self._risks = iter(risks)
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> Risk:
+        return next(self._risks)
+
+    def close(self) -> None:
+        self.closed = True
+
+class TestRisksExporter:
+    def test_csv(self):
+        exporter = RisksExporter(chunk_size=2)
+
+        chunks = list(exporter.export(_risks(5), 'csv'))
+        rows = list(csv.reader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+
+        # The header and one chunk per 2 risks
+        assert len(chunks) == 4
+        assert rows[0] == RisksExporter.COLUMNS
+        assert rows[1] == ['1', '2', 'COL', 'risk 1', 'description 1', 'HIGH', 'LOW', '2023-01-01T10:00:00', '2023-01-01T10:00:00']
+        assert len(rows) == 6
+
+    def test_ndjson(self):
+        exporter = RisksExporter(chunk_size=2)
+
+        chunks = list(exporter.export(_risks(5), 'ndjson'))
+        lines = [json.loads(line) for line in b''.join(chunks).decode('utf-8').splitlines()]
+
+        assert len(chunks) == 3
+        assert len(lines) == 5
+        assert lines[4] == {
+            'id': 5, 'provider_id': 3, 'country': 'COL', 'name': 'risk 5', 'description': 'description 5',
+            'probability': 'HIGH', 'impact': 'LOW', 'created_at': '2023-01-01T10:00:00', 'updated_at': '2023-01-01T10:00:00'
+        }
+
+    def test_arrow(self):
+        pa = pytest.importorskip('pyarrow')
+        exporter = RisksExporter(chunk_size=2)
+
+        data = b''.join(exporter.export(_risks(5), 'arrow'))
+        table = pa.ipc.open_stream(data).read_all()
+
+        assert table.num_rows == 5
+        assert table.column_names == RisksExporter.COLUMNS
+        assert table.column('name').to_pylist()[0] == 'risk 1'
+        assert table.column('probability').to_pylist() == ['HIGH'] * 5
+
+    def test_parquet(self):
+        pytest.importorskip('pyarrow')
+        import pyarrow.parquet as pq
+        exporter = RisksExporter(chunk_size=2)
+
+        data = b''.join(exporter.export(_risks(5), 'parquet'))
+        parquet = pq.ParquetFile(io.BytesIO(data))
+
+        # Every chunk is a row group
+        assert parquet.metadata.num_row_groups == 3
+        assert parquet.read().column('id').to_pylist() == [1, 2, 3, 4, 5]
+
+    def test_unavailable_format(self, monkeypatch):
+        monkeypatch.setattr(exporter_module, 'pa', None)
+        exporter = RisksExporter()
+
+        assert exporter.isAvailable('csv')
+        assert not exporter.isAvailable('parquet')
+        with pytest.raises(ExportError):
+            exporter.export(_risks(1), 'parquet')
+
+    def test_closes_exhausted_source(self):
+        source = ClosingSource(_risks(3))
+
+        list(RisksExporter(chunk_size=2).export(source, 'ndjson'))
+
+        assert source.closed
+
+    def test_closes_source_on_disconnect(self):
+        source = ClosingSource(_risks(10))
+
+        # The client goes away after the header and the first chunk
+        stream = RisksExporter(chunk_size=2).export(source, 'csv')
+        next(stream)
+        next(stream)
+        stream.close()
+
+        assert source.closed
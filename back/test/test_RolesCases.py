@@ -242,4 +242,67 @@ class TestCreateRoleUseCase:
         result = createRoleUseCase(repository, 'test')
 
         # Assert
-        assert result == True
\ No newline at end of file
+        assert result == True
+
+class TestGetRolesPageUseCase:
+    def test_invalid_cursor(self):
+        # Arrange
+        repository = MockRepository()
+
+        # Act
+        result = getRolesPageUseCase(repository, -1, 10)
+
+        # Assert
+        assert result == 'Cursor must be greater or equal to 0'
+
+    def test_invalid_limit(self):
+        # Arrange
+        repository = MockRepository()
+
+        # Act
+        result = getRolesPageUseCase(repository, 0, 0)
+
+        # Assert
+        assert result == 'Limit must be greater than 0'
+
+    def test_first_page(self):
+        # Arrange
+        repository = MockRepository()
+
+        # Act
+        result = getRolesPageUseCase(repository, 0, 10)
+
+        # Assert
+        assert len(result) == 1
+        assert result[0].id == 1
+
+    def test_last_page(self):
+        # Arrange
+        repository = MockRepository()
+
+        # Act
+        result = getRolesPageUseCase(repository, 1, 10)
+
+        # Assert
+        assert result == []
+
+class TestGetRolesVersionUseCase:
+    def test_version(self):
+        # Arrange
+        repository = MockRepository()
+
+        # Act
+        result = getRolesVersionUseCase(repository)
+
+        # Assert
+        assert result == 'roles-1'
+
+    def test_unknown_version(self):
+        # Arrange
+        repository = MockRepository(fail=[True])
+
+        # Act
+        result = getRolesVersionUseCase(repository)
+
+        # Assert
+        assert result is None
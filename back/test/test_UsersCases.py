@@ -0,0 +1,128 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.realpath(__name__))
+parent_dir = os.path.dirname(current_dir)
+
+sys.path.append(parent_dir)
+
+from test.mockRepository import MockRepository
+from src.use_cases.UsersCases import *
+
+class TestAddUsersToRoleUseCase:
+    def test_invalid_user_ids(self):
+        # Arrange
+        repository = MockRepository()
+
+        # Act
+        result = addUsersToRoleUseCase(repository, 1, [1, 0])
+
+        # Assert
+        assert result == 'User ids must be integers greater than 0'
+
+    def test_role_not_found(self):
+        # Arrange
+        repository = MockRepository(fail=[True])
+
+        # Act
+        result = addUsersToRoleUseCase(repository, 1, [1])
+
+        # Assert
+        assert result == 'Role not found'
+
+    def test_users_not_found(self):
+        # Arrange
+        repository = MockRepository()
+
+        # Act
+        result = addUsersToRoleUseCase(repository, 1, [1, 2, 3])
+
+        # Assert
+        assert result == 'Users not found: 2, 3'
+
+    def test_valid_users(self):
+        # Arrange
+        repository = MockRepository()
+
+        # Act
+        result = addUsersToRoleUseCase(repository, 1, [1, 1])
+
+        # Assert
+        assert result == 1
+
+    def test_unknown_role(self):
+        # Arrange
+        repository = MockRepository()
+        repository.getRoleById = lambda id: None
+
+        # Act
+        result = addUsersToRoleUseCase(repository, 99, [1])
+
+        # Assert
+        assert result == 'Role not found'
+
+class TestRemoveUsersFromRoleUseCase:
+    def test_unknown_role(self):
+        # Arrange
+        repository = MockRepository()
+        repository.getRoleById = lambda id: None
+
+        # Act
+        result = removeUsersFromRoleUseCase(repository, 99, [1])
+
+        # Assert
+        assert result == 'Role not found'
+
+class TestAddUsersToRiskUseCase:
+    def test_empty_user_ids(self):
+        # Arrange
+        repository = MockRepository()
+
+        # Act
+        result = addUsersToRiskUseCase(repository, 1, [])
+
+        # Assert
+        assert result == 'At least one user id must be provided'
+
+    def test_link_error(self):
+        # Arrange
+        repository = MockRepository(fail=[False, False, True])
+
+        # Act
+        result = addUsersToRiskUseCase(repository, 1, [1])
+
+        # Assert
+        assert result == 'Error relating risk with users'
+
+    def test_unknown_risk(self):
+        # Arrange
+        repository = MockRepository()
+        repository.getRiskById = lambda id: None
+
+        # Act
+        result = addUsersToRiskUseCase(repository, 99, [1])
+
+        # Assert
+        assert result == 'Risk not found'
+
+class TestRemoveUsersFromRiskUseCase:
+    def test_valid_users(self):
+        # Arrange
+        repository = MockRepository()
+
+        # Act
+        result = removeUsersFromRiskUseCase(repository, 1, [1])
+
+        # Assert
+        assert result == 1
+
+    def test_unknown_risk(self):
+        # Arrange
+        repository = MockRepository()
+        repository.getRiskById = lambda id: None
+
+        # Act
+        result = removeUsersFromRiskUseCase(repository, 99, [1])
+
+        # Assert
+        assert result == 'Risk not found'